@@ -36,7 +36,7 @@ warnings.filterwarnings("ignore")
 from src.utils.logging_config import setup_logging
 from src.app.config import DataKeys
 from src.core.analytics.filter import filter_dataframe
-from src.core.database.loader import get_verified_data
+from src.core.database.loader import get_verified_data, share_boot_data
 from src.ui.components.styles import init_page_config, apply_custom_css
 from src.ui.segments.dashboard import render_dashboard_ui
 from src.ui.segments.sidebar import render_sidebar
@@ -88,7 +88,8 @@ def main():
     # 4. Керування логікою завантаження (Boot Sequence)
     # Використовує Session State для уникнення повторних анімацій при кожній взаємодії.
     if "booted" not in st.session_state:
-        boot_data = show_boot_sequence()
+        # Результат бута стає спільним знімком процесу — сесія тримає лише view
+        boot_data = share_boot_data(show_boot_sequence())
         st.session_state.update({
             "boot_data": boot_data,
             "booted": True
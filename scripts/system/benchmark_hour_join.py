@@ -0,0 +1,89 @@
+"""
+БЕНЧМАРК ПОГОДИННОГО З'ЄДНАННЯ З ПОГОДОЮ (Hour Join Benchmark)
+==============================================================
+Порівнює з'єднання LoadMeasurements ⨝ WeatherReports через
+DATE_TRUNC('hour', ...) = DATE_TRUNC('hour', ...) з з'єднанням по
+збереженій індексованій колонці ts_hour на засіяній (90 днів) базі.
+Забезпечує:
+1. Plan Audit: тип з'єднання та вузли сканування з EXPLAIN (ANALYZE, BUFFERS).
+2. Latency Profiling: медіанний Execution Time за N повторів.
+3. Parity Check: однакова кількість рядків результату.
+
+Запуск: python scripts/system/benchmark_hour_join.py [--repeat 5] [--days 90]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+# Додаємо корінь проєкту до шляху пошуку модулів
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.database import get_db_cursor
+
+_BASE = """
+    SELECT s.substation_name, {bucket} AS ts, AVG(lm.actual_load_mw) AS load_mw, AVG(wr.temperature) AS air_temp
+    FROM LoadMeasurements lm
+    JOIN Substations s ON lm.substation_id = s.substation_id
+    LEFT JOIN WeatherReports wr ON {join} AND wr.region_id = s.region_id
+    WHERE lm.timestamp >= (SELECT MAX(timestamp) FROM LoadMeasurements) - make_interval(days => %(days)s)
+    GROUP BY 1, 2
+"""
+
+QUERIES = {
+    "DATE_TRUNC join": _BASE.format(
+        bucket="DATE_TRUNC('hour', lm.timestamp)",
+        join="DATE_TRUNC('hour', wr.timestamp) = DATE_TRUNC('hour', lm.timestamp)",
+    ),
+    "ts_hour join": _BASE.format(bucket="lm.ts_hour", join="wr.ts_hour = lm.ts_hour"),
+}
+
+
+def _plan_nodes(node, acc):
+    """Збирає типи вузлів плану (з'єднання та сканування) рекурсивно."""
+    kind = node.get("Node Type", "")
+    if "Join" in kind or "Nested Loop" in kind or "Scan" in kind:
+        label = kind
+        if node.get("Relation Name"):
+            label += f"({node['Relation Name']})"
+        if node.get("Index Name"):
+            label += f"[{node['Index Name']}]"
+        acc.append(label)
+    for child in node.get("Plans", []):
+        _plan_nodes(child, acc)
+    return acc
+
+
+def run_benchmark(repeat: int = 5, days: int = 90):
+    with get_db_cursor() as (_, cursor):
+        print(f"{'QUERY':<18} | {'ROWS':>7} | {'median, ms':>10} | {'buffers':>9} | PLAN")
+        print("-" * 110)
+        rows_seen = {}
+        for name, sql in QUERIES.items():
+            timings, buffers, plan_desc, rows = [], 0, [], 0
+            for _ in range(repeat):
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", {"days": days})
+                raw = cursor.fetchone()[0]
+                report = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+                timings.append(report["Execution Time"])
+                plan = report["Plan"]
+                rows = plan.get("Actual Rows", 0)
+                buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+                plan_desc = _plan_nodes(plan, [])
+            rows_seen[name] = rows
+            print(
+                f"{name:<18} | {rows:>7} | {statistics.median(timings):>10.1f} | {buffers:>9} | "
+                f"{' > '.join(plan_desc)[:60]}"
+            )
+
+    parity = "OK" if len(set(rows_seen.values())) == 1 else f"DIFF {rows_seen}"
+    print(f"\nParity: {parity}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DATE_TRUNC vs ts_hour weather join")
+    parser.add_argument("--repeat", type=int, default=5, help="Кількість повторів на запит")
+    parser.add_argument("--days", type=int, default=90, help="Глибина вибірки в днях")
+    args = parser.parse_args()
+    run_benchmark(args.repeat, args.days)
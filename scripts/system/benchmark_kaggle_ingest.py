@@ -0,0 +1,74 @@
+"""
+БЕНЧМАРК ПАРАЛЕЛЬНОГО ІНЖЕСТУ KAGGLE (Kaggle Ingest Benchmark)
+=============================================================
+Порівнює послідовний та паралельний (пул процесів) розбір архіву
+data/*_hourly.csv у Parquet-кеш на вбудованих даних.
+Забезпечує:
+1. Cold Ingest: розбір усіх CSV з нуля (force) — послідовно та у пулі з N процесів.
+2. Warm Load: load_kaggle_data з готового кешу (повна історія та 48-годинне вікно регіону).
+3. Parity Check: однакова кількість рядків у кешах обох режимів.
+
+Запуск: python scripts/system/benchmark_kaggle_ingest.py [--repeat 3] [--workers 4]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Додаємо корінь проєкту до шляху пошуку модулів
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.core import kaggle_loader as kl
+
+
+def _cold_ingest(csv_paths, parallel: bool, workers: int, repeat: int):
+    timings, rows = [], 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            started = time.perf_counter()
+            built = kl.ingest_kaggle_files(csv_paths, cache_dir, parallel=parallel, workers=workers, force=True)
+            timings.append(time.perf_counter() - started)
+            rows = sum(pq.ParquetFile(p).metadata.num_rows for p in built.values() if p)
+    return statistics.median(timings), rows
+
+
+def run_benchmark(repeat: int = 3, workers: int = 4):
+    csv_paths = sorted(glob.glob(os.path.join(kl.DATA_DIR, "*_hourly.csv")))
+    size_mb = sum(os.path.getsize(p) for p in csv_paths) / 1048576
+    print(f"Файлів: {len(csv_paths)} ({size_mb:.1f} MB), CPU: {os.cpu_count()}, повторів: {repeat}\n")
+
+    print(f"{'MODE':<22} | {'ROWS':>8} | {'median, s':>9} | SPEEDUP")
+    print("-" * 60)
+    seq_time, seq_rows = _cold_ingest(csv_paths, False, 1, repeat)
+    print(f"{'sequential':<22} | {seq_rows:>8} | {seq_time:>9.2f} | 1.00x")
+    par_time, par_rows = _cold_ingest(csv_paths, True, workers, repeat)
+    print(f"{f'process pool ({workers})':<22} | {par_rows:>8} | {par_time:>9.2f} | {seq_time / par_time:.2f}x")
+
+    kl.ingest_kaggle_files(csv_paths)  # Робочий кеш для warm-замірів
+    kl.load_kaggle_data(tail_rows=1)  # Прогрів імпортів
+    started = time.perf_counter()
+    full = kl.load_kaggle_data()
+    full_s = time.perf_counter() - started
+    region = kl.kaggle_regions()[-1]
+    _, last_ts = kl.kaggle_time_bounds([region])
+    started = time.perf_counter()
+    window = kl.load_kaggle_data([region], start=last_ts - pd.Timedelta(hours=48))
+    window_s = time.perf_counter() - started
+
+    print(f"\nWarm load (повна історія): {len(full)} рядків за {full_s * 1000:.0f} ms")
+    print(f"Warm load (48 год, 1 регіон): {len(window)} рядків за {window_s * 1000:.1f} ms")
+    print(f"Parity: {'OK' if seq_rows == par_rows == len(full) else f'DIFF {seq_rows}/{par_rows}/{len(full)}'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequential vs process-pool Kaggle ingest")
+    parser.add_argument("--repeat", type=int, default=3, help="Кількість повторів на режим")
+    parser.add_argument("--workers", type=int, default=max(2, min(4, os.cpu_count() or 2)), help="Процесів у пулі")
+    args = parser.parse_args()
+    run_benchmark(args.repeat, args.workers)
@@ -0,0 +1,106 @@
+"""
+БЕНЧМАРК РЕКУРЕНТНОЇ РОЗГОРТКИ ONNX (ONNX Rollout Microbenchmark)
+================================================================
+Порівнює попередню розгортку (np.append + reshape/astype на кожному кроці)
+з кільцевим буфером та IO binding у src/ml/predict_v2.py на реальних моделях.
+Забезпечує:
+1. Steps/sec: кроки горизонту за секунду для кожної версії моделі (V1-V3).
+2. Batch Scaling: одне вікно та пакет із N вікон (сітка підстанцій).
+3. Parity Check: максимальна розбіжність прогнозів між реалізаціями.
+
+Запуск: python scripts/system/benchmark_onnx_rollout.py [--horizon 168] [--batch 12] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Додаємо корінь проєкту до шляху пошуку модулів
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+import pandas as pd
+
+from src.ml.model_loader import load_resources
+from src.ml.predict_v2 import _future_trig_features, _run_onnx_inference_batch
+
+FEATURES = {"v1": 1, "v2": 5, "v3": 9}
+
+
+def _legacy_rollout(model, windows, hours_ahead, future_ts, temps, healths):
+    """Попередня реалізація: окремий model.run на вікно, np.append на кожному кроці."""
+    input_name = model.get_inputs()[0].name
+    out = []
+    for w, fts, temp, health in zip(windows, future_ts, temps, healths):
+        window_size, n_features = w.shape
+        trig = _future_trig_features([fts])[0] if n_features >= 9 else None
+        current_window, preds = w.copy(), []
+        for i in range(hours_ahead):
+            x_input = current_window.reshape(1, window_size, n_features).astype(np.float32)
+            pred_s = model.run(None, {input_name: x_input})[0][0]
+            pred_s[0] = np.clip(pred_s[0], 0, 1.1)
+            preds.append(pred_s)
+            new_row = current_window[-1].copy()
+            new_row[0] = pred_s[0]
+            if n_features > 4 and temp is not None:
+                new_row[4] = temp
+                if health is not None:
+                    new_row[3] = health
+            if trig is not None:
+                new_row[5:9] = trig[i]
+            current_window = np.append(current_window[1:], [new_row], axis=0)
+        out.append(np.array(preds))
+    return np.stack(out)
+
+
+def _median_time(fn, repeat):
+    fn()  # Прогрів сесії
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def run_benchmark(horizon: int = 168, batch: int = 12, repeat: int = 5):
+    rng = np.random.default_rng(42)
+    print(f"Горизонт: {horizon} год, пакет: {batch}, повторів: {repeat}\n")
+    print(f"{'MODEL':<6} | {'N':>3} | {'legacy steps/s':>14} | {'ring steps/s':>12} | SPEEDUP | MAX DIFF")
+    print("-" * 72)
+
+    for version, n_features in FEATURES.items():
+        model, _ = load_resources(version)
+        if model is None:
+            print(f"{version:<6} | модель недоступна")
+            continue
+        window_size = int(model.get_inputs()[0].shape[1] or 48)
+
+        for n in (1, batch):
+            windows = rng.random((n, window_size, n_features))
+            start = pd.Timestamp("2024-01-01")
+            future_ts = [[start + pd.Timedelta(hours=j + i + 1) for i in range(horizon)] for j in range(n)]
+            temps = [0.5] * n
+            healths = [0.8] * n
+
+            legacy_s, legacy = _median_time(
+                lambda: _legacy_rollout(model, windows, horizon, future_ts, temps, healths), repeat
+            )
+            ring_s, ring = _median_time(
+                lambda: _run_onnx_inference_batch(model, windows, horizon, future_ts, temps, healths), repeat
+            )
+            steps = n * horizon
+            print(
+                f"{version:<6} | {n:>3} | {steps / legacy_s:>14,.0f} | {steps / ring_s:>12,.0f} | "
+                f"{legacy_s / ring_s:>6.2f}x | {np.abs(legacy - ring).max():.1e}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Legacy vs ring-buffer ONNX rollout")
+    parser.add_argument("--horizon", type=int, default=168, help="Кроків горизонту")
+    parser.add_argument("--batch", type=int, default=12, help="Вікон у пакеті")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторів на вимір")
+    args = parser.parse_args()
+    run_benchmark(args.horizon, args.batch, args.repeat)
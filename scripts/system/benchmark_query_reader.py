@@ -0,0 +1,106 @@
+"""
+БЕНЧМАРК ШЛЯХІВ ЧИТАННЯ ЗАПИТІВ (Query Reader Benchmark)
+========================================================
+Порівнює стандартний шлях run_query (fetchmany по 5000 рядків + план типів DtypePlan)
+з bulk-шляхом COPY TO STDOUT + Arrow на засіяній базі даних.
+Забезпечує:
+1. Latency Profiling: медіанний час виконання кожного шляху за N повторів.
+2. Peak Memory Audit: піковий приріст RSS процесу під час читання.
+3. Parity Check: перевірка ідентичності колонок, dtypes, кількості рядків та значень.
+
+Запуск: python scripts/system/benchmark_query_reader.py [--repeat 5]
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import threading
+import time
+
+import pandas as pd
+import psutil
+
+# Додаємо корінь проєкту до шляху пошуку модулів
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core import queries as q
+from src.core.database import DTYPE_PLANS, _read_planned, get_engine
+from src.core.database.copy_reader import read_sql_copy
+
+QUERIES = {
+    "QUERY_LOAD_WEATHER": q.QUERY_LOAD_WEATHER,
+    "QUERY_GENERATION": q.QUERY_GENERATION,
+    "QUERY_FINANCE": q.QUERY_FINANCE,
+    "QUERY_LINES": q.QUERY_LINES,
+}
+
+
+def _read_chunked(conn, sql):
+    return _read_planned(conn, sql, None)
+
+
+def _read_copy(conn, sql):
+    return read_sql_copy(sql, None, conn.connection.dbapi_connection, DTYPE_PLANS)
+
+
+def _measure(fn, *args):
+    """Повертає (результат, секунди, піковий приріст RSS у МБ)."""
+    proc = psutil.Process(os.getpid())
+    gc.collect()
+    base = proc.memory_info().rss
+    peak = [base]
+    stop = threading.Event()
+
+    def sampler():
+        while not stop.is_set():
+            peak[0] = max(peak[0], proc.memory_info().rss)
+            time.sleep(0.005)
+
+    t = threading.Thread(target=sampler, daemon=True)
+    t.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    t.join()
+    return result, elapsed, (peak[0] - base) / (1024 * 1024)
+
+
+def run_benchmark(repeat: int = 5):
+    engine = get_engine()
+    print(f"{'QUERY':<20} | {'ROWS':>8} | {'chunked, s':>11} | {'COPY, s':>9} | {'x':>5} | {'RAM chunked':>12} | {'RAM COPY':>9} | PARITY")
+    print("-" * 105)
+
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            t_old, t_new, m_old, m_new = [], [], [], []
+            df_old = df_new = None
+            for _ in range(repeat):
+                df_old, t, m = _measure(_read_chunked, conn, sql)
+                t_old.append(t); m_old.append(m)
+                df_new, t, m = _measure(_read_copy, conn, sql)
+                t_new.append(t); m_new.append(m)
+
+            try:
+                pd.testing.assert_frame_equal(
+                    df_old.reset_index(drop=True), df_new.reset_index(drop=True),
+                    check_categorical=False, check_exact=False, rtol=1e-5,
+                )
+                parity = "OK"
+            except AssertionError as e:
+                parity = f"DIFF ({str(e).splitlines()[0][:40]})"
+
+            med_old, med_new = statistics.median(t_old), statistics.median(t_new)
+            speedup = med_old / med_new if med_new > 0 else float("inf")
+            print(
+                f"{name:<20} | {len(df_old):>8} | {med_old:>11.3f} | {med_new:>9.3f} | {speedup:>5.1f} | "
+                f"{max(m_old):>9.1f} MB | {max(m_new):>6.1f} MB | {parity}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="run_query: chunked fetch vs COPY + Arrow")
+    parser.add_argument("--repeat", type=int, default=5, help="Кількість повторів на запит")
+    args = parser.parse_args()
+    run_benchmark(args.repeat)
@@ -1,3 +1,4 @@
+DROP TABLE IF EXISTS Forecasts CASCADE;
 DROP TABLE IF EXISTS EnergyPricing CASCADE;
 DROP TABLE IF EXISTS MaintenanceEvents CASCADE;
 DROP TABLE IF EXISTS Alerts CASCADE;
@@ -68,8 +69,12 @@ CREATE INDEX idx_gen_substation_id ON Generators(substation_id);
 -- MODULE 2: ЖУРНАЛИ ВИМІРЮВАНЬ (TIME-SERIES DATA)
 -- =========================================================
 
+-- Таблиці вимірювань партиціоновані по місяцях (RANGE по timestamp).
+-- Місячні партиції створює та прибирає src/core/database/partitions.py;
+-- DEFAULT-партиція підхоплює рядки поза створеними діапазонами.
+
 CREATE TABLE LoadMeasurements (
-    measurement_id BIGINT PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+    measurement_id BIGSERIAL,
     timestamp TIMESTAMPTZ NOT NULL,
     actual_load_mw DECIMAL(10, 2) NOT NULL,
     substation_id INT,
@@ -79,28 +84,82 @@ CREATE TABLE LoadMeasurements (
     h2_ppm DECIMAL(10, 2),
     health_score DECIMAL(10, 2),
     sensor_status VARCHAR(50),
+    -- Ключ погодинного з'єднання з погодою (UTC-година; immutable для GENERATED)
+    ts_hour TIMESTAMPTZ GENERATED ALWAYS AS (date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') STORED,
+    PRIMARY KEY (measurement_id, timestamp),
     FOREIGN KEY (substation_id) REFERENCES Substations(substation_id) ON DELETE CASCADE
-);
+) PARTITION BY RANGE (timestamp);
+CREATE TABLE loadmeasurements_default PARTITION OF LoadMeasurements DEFAULT;
 -- Композитний індекс для швидкого пошуку графіків по підстанції
 CREATE INDEX idx_load_ts_sub ON LoadMeasurements (substation_id, timestamp);
+-- BRIN для діапазонних запитів по часу (дані вставляються в хронологічному порядку)
+CREATE INDEX idx_load_ts_brin ON LoadMeasurements USING BRIN (timestamp);
+CREATE INDEX idx_load_sub_hour ON LoadMeasurements (substation_id, ts_hour);
 
 CREATE TABLE LineMeasurements (
-    line_measurement_id BIGINT PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+    line_measurement_id BIGSERIAL,
     timestamp TIMESTAMPTZ NOT NULL,
     actual_load_mw DECIMAL(10, 2) NOT NULL,
     line_id INT,
+    PRIMARY KEY (line_measurement_id, timestamp),
     FOREIGN KEY (line_id) REFERENCES PowerLines(line_id) ON DELETE CASCADE
-);
-CREATE INDEX idx_line_ts_id ON LineMeasurements(line_id, timestamp);
+) PARTITION BY RANGE (timestamp);
+CREATE TABLE linemeasurements_default PARTITION OF LineMeasurements DEFAULT;
+CREATE INDEX idx_line_ts_id ON LineMeasurements (line_id, timestamp);
+CREATE INDEX idx_line_ts_brin ON LineMeasurements USING BRIN (timestamp);
 
 CREATE TABLE GenerationMeasurements (
-    gen_measurement_id BIGINT PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+    gen_measurement_id BIGSERIAL,
     timestamp TIMESTAMPTZ NOT NULL,
     actual_generation_mw DECIMAL(10, 2) NOT NULL,
     generator_id INT,
+    PRIMARY KEY (gen_measurement_id, timestamp),
     FOREIGN KEY (generator_id) REFERENCES Generators(generator_id) ON DELETE CASCADE
+) PARTITION BY RANGE (timestamp);
+CREATE TABLE generationmeasurements_default PARTITION OF GenerationMeasurements DEFAULT;
+CREATE INDEX idx_gen_ts_id ON GenerationMeasurements (generator_id, timestamp);
+CREATE INDEX idx_gen_ts_brin ON GenerationMeasurements USING BRIN (timestamp);
+
+-- Погодинний rollup навантаження (підтримується src/core/database/rollup.py)
+CREATE TABLE LoadHourly (
+    substation_id INT NOT NULL,
+    ts_hour TIMESTAMPTZ NOT NULL,
+    samples INT NOT NULL,
+    load_sum_mw DECIMAL(14, 2),
+    load_avg_mw DECIMAL(10, 2),
+    load_min_mw DECIMAL(10, 2),
+    load_max_mw DECIMAL(10, 2),
+    oil_temp_avg DECIMAL(10, 2),
+    h2_ppm_avg DECIMAL(10, 2),
+    health_avg DECIMAL(10, 2),
+    air_temp DECIMAL(5, 2),
+    PRIMARY KEY (substation_id, ts_hour),
+    FOREIGN KEY (substation_id) REFERENCES Substations(substation_id) ON DELETE CASCADE
+);
+CREATE INDEX idx_load_hourly_ts ON LoadHourly (ts_hour);
+
+-- Водяні знаки інкрементальних rollup-оновлень
+CREATE TABLE RollupWatermarks (
+    rollup_name VARCHAR(50) PRIMARY KEY,
+    last_hour TIMESTAMPTZ NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Готові прогнози фонового воркера (src/ml/forecast_worker.py); horizon_h 0 — стартова фактична точка,
+-- source_hour — година LoadHourly, від якої виданий прогін (завершеність по парах підстанція × версія)
+CREATE TABLE Forecasts (
+    substation_id INT NOT NULL,
+    version VARCHAR(10) NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL,
+    horizon_h SMALLINT NOT NULL,
+    predicted_load_mw DECIMAL(10, 2) NOT NULL,
+    lower DECIMAL(10, 2),
+    upper DECIMAL(10, 2),
+    predicted_health_score DECIMAL(5, 2),
+    source_hour TIMESTAMPTZ,
+    PRIMARY KEY (substation_id, version, timestamp),
+    FOREIGN KEY (substation_id) REFERENCES Substations(substation_id) ON DELETE CASCADE
 );
-CREATE INDEX idx_gen_ts_id ON GenerationMeasurements(generator_id, timestamp);
 
 -- =========================================================
 -- MODULE 3: АНАЛІТИКА ТА ПОДІЇ (EVENTS & ANALYTICS)
@@ -111,10 +170,12 @@ CREATE TABLE WeatherReports (
     region_id INT NOT NULL,
     temperature DECIMAL(5, 2),
     conditions VARCHAR(50),
+    ts_hour TIMESTAMPTZ GENERATED ALWAYS AS (date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') STORED,
     -- Композитний первинний ключ (в одному регіоні в один час одна погода)
     PRIMARY KEY (timestamp, region_id),
     FOREIGN KEY (region_id) REFERENCES Regions(region_id) ON DELETE CASCADE
 );
+CREATE INDEX idx_weather_region_hour ON WeatherReports (region_id, ts_hour);
 
 CREATE TABLE Alerts (
     alert_id INT PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
@@ -65,26 +65,26 @@ def get_history_live(substation_name: str | None) -> pd.DataFrame:
         if is_global:
             # Case 1: Global Aggregation (All Substations)
             sql = """
-                SELECT timestamp, SUM(actual_load_mw) AS actual_load_mw, 
-                AVG(temperature_c) AS temperature_c, AVG(health_score) AS health_score
-                FROM LoadMeasurements
-                WHERE timestamp >= (SELECT MAX(timestamp) FROM LoadMeasurements) - INTERVAL '72 hours'
-                GROUP BY timestamp
-                ORDER BY timestamp ASC
+                SELECT ts_hour AS timestamp, SUM(load_avg_mw) AS actual_load_mw, 
+                AVG(oil_temp_avg) AS temperature_c, AVG(health_avg) AS health_score
+                FROM LoadHourly
+                WHERE ts_hour >= (SELECT MAX(ts_hour) FROM LoadHourly) - INTERVAL '72 hours'
+                GROUP BY ts_hour
+                ORDER BY ts_hour ASC
             """
             return run_query(sql)
         else:
             # Case 2: Specific Substation or Group of Substations
             sub_filter = substation_name if isinstance(substation_name, list) else [substation_name]
             sql = """
-                SELECT m.timestamp, SUM(m.actual_load_mw) AS actual_load_mw, 
-                       AVG(m.temperature_c) AS temperature_c, AVG(m.health_score) AS health_score
-                FROM LoadMeasurements m
+                SELECT m.ts_hour AS timestamp, SUM(m.load_avg_mw) AS actual_load_mw, 
+                       AVG(m.oil_temp_avg) AS temperature_c, AVG(m.health_avg) AS health_score
+                FROM LoadHourly m
                 JOIN Substations s ON m.substation_id = s.substation_id
                 WHERE s.substation_name = ANY(:sub)
-                  AND m.timestamp >= (SELECT MAX(timestamp) FROM LoadMeasurements) - INTERVAL '72 hours'
-                GROUP BY m.timestamp
-                ORDER BY m.timestamp ASC
+                  AND m.ts_hour >= (SELECT MAX(ts_hour) FROM LoadHourly) - INTERVAL '72 hours'
+                GROUP BY m.ts_hour
+                ORDER BY m.ts_hour ASC
             """
             return run_query(sql, {"sub": sub_filter})
     except Exception as exc:
@@ -96,20 +96,22 @@ def get_history_csv(substation_name: str | None = None) -> pd.DataFrame:
     Зчитує історичні покази за останні 48 годин з еталонного датасету (Kaggle).
     """
     try:
-        from src.core.kaggle_loader import load_kaggle_data
-        df = load_kaggle_data()
+        from src.core.kaggle_loader import kaggle_time_bounds, load_kaggle_data
 
         all_objs = ["Усі підстанції", "Всі", "All", "Усі"]
-        if substation_name and substation_name not in all_objs:
-            df = df[df["substation_name"] == substation_name]
-        else:
+        single = bool(substation_name and substation_name not in all_objs)
+        regions = [substation_name] if single else None
+
+        # Вікно 48 годин від останньої мітки вибірки — читаються лише ці row group
+        _, max_ts = kaggle_time_bounds(regions)
+        if max_ts is None:
+            return pd.DataFrame(columns=["timestamp", "actual_load_mw"])
+        df = load_kaggle_data(regions, start=max_ts - pd.Timedelta(hours=48))
+
+        if not single:
             # Aggregate across all stations
             df = df.groupby("timestamp")["actual_load_mw"].sum().reset_index()
 
-        if not df.empty:
-            max_ts = df["timestamp"].max()
-            df = df[df["timestamp"] >= max_ts - pd.Timedelta(hours=48)]
-
         return df.sort_values("timestamp")
     except Exception as exc:
         return pd.DataFrame({"error": [str(exc)], "actual_load_mw": [0], "timestamp": [pd.Timestamp.now()]})
@@ -7,10 +7,15 @@
 - 🛡️ Secure Validation: Багатошарова перевірка вхідних параметрів на предмет ін'єкцій та аномалій.
 - 📐 Multi-dimensional Slicing: Підтримка складних зрізів за часом, регіонами та ієрархією об'єктів.
 - ⚡ Vectorized Masking: Використання швидких булевих масок Pandas для збереження швидкодії.
+- 🔎 Indexed Time Slicing: Для відсортованих за часом кадрів діапазон знаходиться бінарним пошуком (searchsorted) по int64-мітках — O(log n + k) без копії всього кадру.
+- 🏷️ Category Code Masks: Регіон/підстанція порівнюються за кодами Category через таблицю відповідності, а не рядками.
 - 🧩 Adaptive Logic: Контекстно-залежна фільтрація для різних типів датасетів (Load vs Alerts).
 """
-from typing import Optional, Union, List, Tuple
+import threading
+import weakref
+from typing import Dict, Optional, Union, List, Tuple
 from datetime import date
+import numpy as np
 import pandas as pd
 import logging
 
@@ -24,6 +29,100 @@ from src.utils.validators import (
 
 logger = logging.getLogger(__name__)
 
+# Напрям сортування незмінних (read-only) масивів часу спільного знімка: id → (weakref, напрям)
+_ORDER_CACHE: Dict[int, Tuple[weakref.ref, int]] = {}
+_ORDER_LOCK = threading.Lock()
+
+
+def _time_values(ts: pd.Series) -> Optional[np.ndarray]:
+    """int64-мітки колонки часу (у її власній одиниці) або None для не-datetime колонок."""
+    if not pd.api.types.is_datetime64_any_dtype(ts.dtype):
+        return None
+    return ts.array._ndarray.view("i8")
+
+
+def _sort_direction(values: np.ndarray) -> int:
+    """1 — зростання, -1 — спадання, 0 — не відсортовано (або є NaT)."""
+    if len(values) < 2:
+        return 1
+    diffs = values[1:] >= values[:-1]
+    if diffs.all():
+        return 1 if values[0] != np.iinfo(np.int64).min else 0
+    if not diffs.any() or (values[1:] <= values[:-1]).all():
+        return -1 if values[-1] != np.iinfo(np.int64).min else 0
+    return 0
+
+
+def _cached_direction(ts: pd.Series, values: np.ndarray) -> int:
+    """
+    Напрям сортування; для read-only масивів (знімки shared_store, що не
+    змінюються) кешується, тож повторні фільтрації фрагментів не сканують кадр.
+    """
+    base = ts.array._ndarray
+    if base.flags.writeable:
+        return _sort_direction(values)
+    key = id(base)
+    with _ORDER_LOCK:
+        hit = _ORDER_CACHE.get(key)
+        if hit is not None and hit[0]() is base:
+            return hit[1]
+    direction = _sort_direction(values)
+    try:
+        ref = weakref.ref(base, lambda _, k=key: _ORDER_CACHE.pop(k, None))
+    except TypeError:
+        return direction
+    with _ORDER_LOCK:
+        _ORDER_CACHE[key] = (ref, direction)
+    return direction
+
+
+def _day_bounds(ts: pd.Series, start_date: date, end_date: date) -> Tuple[int, int]:
+    """
+    Межі [start_date 00:00, end_date+1 00:00) у int64-одиницях колонки — те саме,
+    що start_date <= ts.dt.date <= end_date (дата в часовому поясі колонки).
+    """
+    tz = getattr(ts.dt, "tz", None)
+    step = pd.Timedelta(1, unit=np.datetime_data(ts.array._ndarray.dtype)[0]).value
+    bounds = []
+    for day in (start_date, end_date + pd.Timedelta(days=1)):
+        edge = pd.Timestamp(day)
+        if tz is not None:
+            edge = edge.tz_localize(tz, ambiguous=True, nonexistent="shift_forward")
+        bounds.append(-(-edge.value // step))  # ceil: перша мітка, не менша за межу
+    return bounds[0], bounds[1]
+
+
+def _time_window(ts: pd.Series, dates: Tuple[date, date]) -> Union[slice, np.ndarray, None]:
+    """
+    Рядки в діапазоні дат: slice для відсортованих кадрів (бінарний пошук),
+    булева маска по int64 для решти, None — колонка не є datetime.
+    """
+    values = _time_values(ts)
+    if values is None:
+        return None
+    lo, hi = _day_bounds(ts, *dates)
+    direction = _cached_direction(ts, values)
+    if direction == 1:
+        return slice(int(np.searchsorted(values, lo, "left")), int(np.searchsorted(values, hi, "left")))
+    if direction == -1:
+        rev = values[::-1]  # view: спадний масив як зростаючий
+        n = len(values)
+        return slice(n - int(np.searchsorted(rev, hi, "left")), n - int(np.searchsorted(rev, lo, "left")))
+    return (values >= lo) & (values < hi)  # NaT (мін. int64) відсіюється автоматично
+
+
+def _value_mask(col: pd.Series, wanted: List[str]) -> np.ndarray:
+    """Маска входження значень: для Category — таблиця відповідності кодів, інакше isin."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        codes = col.array.codes
+        lut = np.zeros(len(col.dtype.categories) + 1, dtype=bool)  # Останній елемент — для NaN (код -1)
+        found = col.dtype.categories.get_indexer(wanted)
+        lut[found[found >= 0]] = True
+        return lut[codes]
+    if len(wanted) == 1:
+        return (col == wanted[0]).to_numpy(dtype=bool)
+    return col.isin(wanted).to_numpy(dtype=bool)
+
 
 def filter_dataframe(
     df: pd.DataFrame,
@@ -35,6 +134,10 @@ def filter_dataframe(
     """
     Фільтрує вхідний DataFrame на основі обраних критеріїв (з валідацією вводу).
 
+    Спершу відбирається часове вікно (для відсортованих кадрів — бінарним
+    пошуком, без сканування), потім маски регіону/підстанції будуються лише
+    для рядків вікна. Результат завжди є власною копією відібраних рядків.
+
     Args:
         df: Вхідний DataFrame.
         region: Обраний регіон для аналізу (valided vs whitelist).
@@ -66,37 +169,45 @@ def filter_dataframe(
         logger.debug("Empty DataFrame provided, returning as-is")
         return df
 
-    df_filtered = df.copy()
+    df_filtered = df
+    mask = None
+
+    # 1. Логіка дати (Виняток для alerts) — першою, щоб решта масок рахувалась лише для вікна
+    if (
+        dataset_name != "alerts"
+        and "timestamp" in df.columns
+        and isinstance(dates, tuple)
+        and len(dates) == 2
+    ):
+        window = _time_window(df["timestamp"], dates)
+        if window is None:
+            ts_dates = df["timestamp"].dt.date
+            mask = ((ts_dates >= dates[0]) & (ts_dates <= dates[1])).to_numpy(dtype=bool)
+        elif isinstance(window, slice):
+            df_filtered = df.iloc[window]  # view, без копіювання
+        else:
+            mask = window
+
+    def _narrow(condition: np.ndarray) -> None:
+        nonlocal mask
+        mask = condition if mask is None else mask & condition
 
-    # 1. Логіка регіону
+    # 2. Логіка регіону
     if (
         region != DataKeys.ALL_REGIONS
         and region != "США (PJM Interconnection)"
         and "region_name" in df_filtered.columns
     ):
-        df_filtered = df_filtered[df_filtered["region_name"] == region]
+        _narrow(_value_mask(df_filtered["region_name"], [region]))
 
-    # 2. Логіка підстанції
+    # 3. Логіка підстанції
     if "substation_name" in df_filtered.columns:
         if isinstance(substation, list) and substation:
             if "Усі підстанції" not in substation:
-                df_filtered = df_filtered[
-                    df_filtered["substation_name"].isin(substation)
-                ]
+                _narrow(_value_mask(df_filtered["substation_name"], list(substation)))
         elif isinstance(substation, str) and substation != "Усі підстанції":
-            df_filtered = df_filtered[df_filtered["substation_name"] == substation]
-
-    # 3. Логіка дати (Виняток для alerts)
-    if dataset_name != "alerts":
-        if (
-            "timestamp" in df_filtered.columns
-            and isinstance(dates, tuple)
-            and len(dates) == 2
-        ):
-            start_date, end_date = dates
-            mask = (df_filtered["timestamp"].dt.date >= start_date) & (
-                df_filtered["timestamp"].dt.date <= end_date
-            )
-            df_filtered = df_filtered.loc[mask]
-
-    return df_filtered
+            _narrow(_value_mask(df_filtered["substation_name"], [substation]))
+
+    if mask is not None:
+        return df_filtered[mask]  # Булева вибірка створює новий кадр
+    return df_filtered.copy()
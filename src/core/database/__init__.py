@@ -7,36 +7,47 @@
 Архітектурні особливості:
 - 🔌 Hybrid Connection: Динамічне перемикання між локальним сервером та Neon Cloud Cluster.
 - 🧬 Memory Diet Protocol: Агресивна оптимізація RAM через типи Pandas (економія до 70%).
+- 📐 Dtype Plans: Цільові типи колонок визначаються з каталогу один раз на запит і однаково застосовуються до кожного chunk.
 - 🛡️ Neon Resilience: Система інтелектуальних ретраїв для подолання "холодного старту" хмари.
-- 📦 Parquet Fallback: Автономний режим роботи через локальне кешування запитів.
+- 📦 Result Cache: Дворівневий кеш (RAM LRU + Parquet) з інвалідацією за версією даних; офлайн-режим при збоях.
 - 🔒 Atomic Transactions: Контекстні менеджери для гарантування цілісності ACID-операцій.
+- 🚀 Bulk COPY Reader: Читання великих вибірок через COPY TO STDOUT + Arrow замість построкового pd.read_sql.
+- 🧮 Connection Pool: Спільний обмежений пул psycopg2-з'єднань замість нового рукостискання на кожен виклик.
+- 🧊 Hourly Rollup: Погодинна таблиця фактів LoadHourly з інкрементальним оновленням за водяним знаком (rollup.py).
+- 🗂️ Time Partitions: Щомісячні партиції таблиць вимірювань, BRIN по timestamp та retention (partitions.py).
+- 🩺 Query Profiler: Латентність, рядки, байти та плани повільних запитів за відбитком SQL (profiler.py).
 """
 import os
-import hashlib
+import time
 from contextlib import contextmanager
 from typing import Optional
 
 import pandas as pd
-import psycopg2
 import streamlit as st
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
 from src.core.config import DB_CONFIG
+from src.core.database.copy_reader import read_sql_copy, session_timezone
+from src.core.database.dtype_plan import DtypePlan, PlanRegistry
+from src.core.database.pool import get_pool, get_pool_stats
+from src.core.database.profiler import DUMP_PATH, QueryProfiler
+from src.core.database.result_cache import (
+    DB_IDENTITY_KEY, DataVersionTracker, ResultCache, is_time_relative, query_key, referenced_tables,
+)
 from src.core.logger import setup_logger
 
-import numpy as np
-
 load_dotenv()
 
 log = setup_logger(__name__)
 
 
-# Колонки з малою кількістю унікальних значень — конвертуємо у Category
-_KNOWN_CATEGORICAL_COLS = {
-    "region_name", "substation_name", "alert_type", "status",
-    "conditions", "generator_type", "day_type", "source_type",
-}
+# Розмір порції при построковому читанні результату
+QUERY_CHUNK_ROWS = 5000
+
+# Плани типів для кожного тексту запиту (визначаються один раз на процес)
+DTYPE_PLANS = PlanRegistry()
+
 
 def memory_diet(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -46,37 +57,42 @@ def memory_diet(df: pd.DataFrame) -> pd.DataFrame:
     3. object → Category   (економія ~80% для рядкових повторюваних значень)
     4. datetime64[ns] → datetime64[s]  (нам мікросекунди не потрібні)
     5. bool залишається bool (вже оптимально)
+
+    Усі перетворення виконуються одним astype за планом, виведеним з dtypes
+    (див. DtypePlan.from_frame).
     """
     if df.empty:
         return df
 
-    for col in df.columns:
-        col_type = df[col].dtype
-
-        if col_type == np.float64:
-            df[col] = df[col].astype(np.float32)
+    plan = DtypePlan.from_frame(df)
+    return plan.finalize(plan.apply(df))
 
-        elif col_type == np.int64:
-            col_min, col_max = df[col].min(), df[col].max()
-            if col_min >= np.iinfo(np.int16).min and col_max <= np.iinfo(np.int16).max:
-                df[col] = df[col].astype(np.int16)
-            elif col_min >= np.iinfo(np.int32).min and col_max <= np.iinfo(np.int32).max:
-                df[col] = df[col].astype(np.int32)
 
-        elif col_type == object:
-            # ⚠️ Category ТІЛЬКИ для відомих статичних колонок з whitelist!
-            # НЕ використовуємо unique_ratio — це ламає код, що присвоює нові значення.
-            if col in _KNOWN_CATEGORICAL_COLS:
-                df[col] = df[col].astype("category")
-
-        elif hasattr(col_type, 'tz') or str(col_type).startswith("datetime64"):
-            # Знижуємо точність з ns до s (економить 4x пам'яті для часових рядів)
-            try:
-                df[col] = df[col].astype("datetime64[s]")
-            except Exception:
-                pass  # Не критично якщо не вдалося
+def _read_planned(conn, query_text: str, params: Optional[dict]) -> pd.DataFrame:
+    """
+    Построкове читання порціями з єдиним планом типів для всіх chunk.
 
-    return df
+    План береться з cursor.description першого виконання запиту і далі
+    перевикористовується, тому pd.concat не виконує жодних апкастів.
+    """
+    result = conn.execute(text(query_text), params or {})
+    if not result.returns_rows:
+        return pd.DataFrame()
+
+    dbapi_conn = conn.connection.dbapi_connection
+    plan = DTYPE_PLANS.get_or_create(
+        query_key(query_text), result.cursor.description, session_timezone(dbapi_conn)
+    )
+    columns = list(result.keys())
+
+    chunks = []
+    while True:
+        rows = result.fetchmany(QUERY_CHUNK_ROWS)
+        if not rows:
+            break
+        chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        chunks.append(plan.apply(chunk))
+    return plan.concat(chunks)
 
 
 @st.cache_resource
@@ -111,49 +127,31 @@ def get_engine():
 
 @contextmanager
 def get_db_cursor():
-    """Контекстний менеджер для безпечної роботи з базою даних через psycopg2 з ретраями."""
+    """
+    Контекстний менеджер для безпечної роботи з базою даних через psycopg2.
+
+    З'єднання береться зі спільного пулу процесу (окремого для local/cloud) і
+    повертається туди після commit/rollback, тож повторні виклики не платять за
+    TCP+TLS рукостискання. Ретраї холодного старту виконує сам пул.
+    """
     db_mode = st.session_state.get("db_mode", "local")
-    
-    if db_mode == "cloud":
-        config = {
-            "dbname": os.getenv("CLOUD_DB_NAME"),
-            "user": os.getenv("CLOUD_DB_USER"),
-            "password": os.getenv("CLOUD_DB_PASSWORD"),
-            "host": os.getenv("CLOUD_DB_HOST"),
-            "port": os.getenv("CLOUD_DB_PORT", "5432"),
-            "sslmode": os.getenv("CLOUD_DB_SSL", "require")
-        }
-    else:
-        config = {
-            "dbname": os.getenv("DB_NAME"),
-            "user": os.getenv("DB_USER"),
-            "password": os.getenv("DB_PASSWORD"),
-            "host": os.getenv("DB_HOST", "localhost"),
-            "port": os.getenv("DB_PORT", "5432"),
-            "sslmode": os.getenv("DB_SSL", "prefer")
-        }
-
-    conn = None
-    retries = 3
-    for i in range(retries):
+    pool = get_pool(db_mode)
+
+    conn = pool.getconn()
+    discard = False
+    try:
+        with conn.cursor() as cursor:
+            yield conn, cursor
+        conn.commit()
+    except Exception as e:
+        log.error(f"Database operation failed: {e}")
         try:
-            conn = psycopg2.connect(**config)
-            yield conn, conn.cursor()
-            conn.commit()
-            break
-        except Exception as e:
-            if i < retries - 1:
-                log.warning(f"🔄 Спроба підключення до БД {i+1}/{retries} (база прокидається)...")
-                import time
-                time.sleep(3)
-                continue
-            log.error(f"Database operation failed: {e}")
-            if conn:
-                conn.rollback()
-            raise e
-        finally:
-            if conn:
-                conn.close()
+            conn.rollback()
+        except Exception:
+            discard = True  # З'єднання зламане — не повертаємо його в пул
+        raise e
+    finally:
+        pool.putconn(conn, discard=discard or bool(conn.closed))
 
 
 def execute_sql_file(cursor, filename):
@@ -170,13 +168,101 @@ def execute_sql_file(cursor, filename):
 
 
 # --- 3. SQLALCHEMY CORE (For Streamlit App) ---
-def run_query(query_text: str, params: Optional[dict] = None) -> pd.DataFrame:
+def _probe_table_versions(tables: tuple) -> dict:
+    """
+    Лічильники записів (ins+upd+del) з pg_stat_user_tables — дешевий маркер "нових рядків".
+
+    Для партиційованих таблиць (LoadMeasurements тощо) PostgreSQL рахує записи
+    на листових партиціях, а не на батьківській, тому лічильники сумуються по
+    pg_partition_tree (для звичайної таблиці дерево — вона сама).
+
+    Додатково під DB_IDENTITY_KEY повертається ідентичність БД: після рестарту
+    сервера, скидання статистики чи перемикання на іншу базу лічильники
+    починаються заново, і версія не має збігтися зі старою.
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT p.relname, s.n_tup_ins + s.n_tup_upd + s.n_tup_del "
+                "FROM pg_class p "
+                "CROSS JOIN LATERAL pg_partition_tree(p.oid) tree "
+                "JOIN pg_stat_user_tables s ON s.relid = tree.relid "
+                "WHERE p.relname = ANY(:t) AND p.relkind IN ('r', 'p') AND pg_table_is_visible(p.oid)"
+            ),
+            {"t": list(tables)},
+        ).fetchall()
+        identity = conn.execute(
+            text(
+                "SELECT current_database(), COALESCE(host(inet_server_addr()), 'socket'), "
+                "inet_server_port(), pg_postmaster_start_time(), "
+                "(SELECT stats_reset FROM pg_stat_database WHERE datname = current_database())"
+            )
+        ).one()
+    versions = {}
+    for name, writes in rows:
+        versions[name] = versions.get(name, 0) + int(writes or 0)
+    versions[DB_IDENTITY_KEY] = ":".join(str(part) for part in identity)
+    return versions
+
+
+# Спільні для всіх сесій процесу: RAM LRU + Parquet на диску
+RESULT_CACHE = ResultCache()
+DATA_VERSIONS = DataVersionTracker(
+    _probe_table_versions, scope_fn=lambda: st.session_state.get("db_mode", "local")
+)
+PROFILER = QueryProfiler()
+
+
+def _frame_nbytes(df: pd.DataFrame) -> int:
+    """Розмір результату в пам'яті (без глибокого обходу object-колонок)."""
+    try:
+        return int(df.memory_usage(index=True, deep=False).sum())
+    except Exception:
+        return 0
+
+
+def _capture_plan(fp: str, query_text: str, params: Optional[dict]) -> None:
+    """Знімає EXPLAIN (ANALYZE, BUFFERS) повільного SELECT (запит виконується повторно)."""
+    try:
+        with get_engine().connect() as conn:
+            started = time.perf_counter()
+            plan = conn.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query_text.strip().rstrip(';')}"),
+                params or {},
+            ).scalar()
+            PROFILER.store_plan(fp, plan, time.perf_counter() - started)
+            conn.rollback()
+        log.info(f"🐢 План повільного запиту {fp} збережено.")
+    except Exception as e:
+        log.debug(f"EXPLAIN capture failed for {fp}: {e}")
+
+
+def run_query(query_text: str, params: Optional[dict] = None, bulk: bool = False, cache: bool = True) -> pd.DataFrame:
     """
     Виконує SELECT запит з ретраями для холодного старту Neon DB.
+
+    Args:
+        query_text: SQL з `:named` параметрами.
+        params: Параметри запиту.
+        bulk: Читати результат через `COPY ... TO STDOUT` + Arrow (для великих вибірок).
+        cache: Використовувати кеш результатів. False — для запитів, що читають
+            за водяним знаком (дельти): їхній сенс — побачити рядки, яких ще не було.
     """
-    query_id = hashlib.md5(f"{query_text}_{params}".encode()).hexdigest()
-    cache_path = os.path.join("data", "fallback", f"query_{query_id}.parquet")
-    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    started = time.perf_counter()
+    query_id = query_key(query_text, params)
+    version = None
+    if cache:
+        tables = referenced_tables(query_text)
+        version = DATA_VERSIONS.version(tables, time_bucket_s=3600 if is_time_relative(query_text) else None)
+
+    cached = RESULT_CACHE.get(query_id, version) if cache else None
+    if cached is not None:
+        PROFILER.record(
+            query_text, time.perf_counter() - started,
+            rows=len(cached), nbytes=_frame_nbytes(cached), cache="hit",
+        )
+        return cached
 
     db_mode = st.session_state.get("db_mode", "cloud")
     retries = 3 if db_mode == "cloud" else 1
@@ -185,20 +271,24 @@ def run_query(query_text: str, params: Optional[dict] = None) -> pd.DataFrame:
         try:
             engine = get_engine()
             with engine.connect() as conn:
-                chunks = []
-                for chunk in pd.read_sql(text(query_text), conn, params=params, chunksize=5000):
-                    chunks.append(memory_diet(chunk))
-
-                if not chunks:
-                    return pd.DataFrame()
-
-                df = pd.concat(chunks, ignore_index=True)
-                del chunks          # Явне звільнення chunks з пам'яті
-                import gc; gc.collect()
-
-                if not df.empty:
-                    df.to_parquet(cache_path, index=False)
+                if bulk:
+                    df = read_sql_copy(query_text, params, conn.connection.dbapi_connection, DTYPE_PLANS)
+                else:
+                    df = _read_planned(conn, query_text, params)
+
+            elapsed = time.perf_counter() - started
+            fp = PROFILER.record(
+                query_text, elapsed,
+                rows=len(df), nbytes=_frame_nbytes(df), cache="miss", retries=i,
+            )
+            if PROFILER.should_explain(fp, elapsed):
+                _capture_plan(fp, query_text, params)
+
+            if (df.empty and not len(df.columns)) or not cache:
                 return df
+
+            RESULT_CACHE.put(query_id, version, df)
+            return df
                 
         except (st.runtime.scriptrunner.StopException, st.errors.StreamlitAPIException):
             from src.utils.helpers import RerunException
@@ -219,34 +309,58 @@ def run_query(query_text: str, params: Optional[dict] = None) -> pd.DataFrame:
             if is_recoverable and i < retries - 1:
                 wait_time = 2  # Швидкий ретрай (2 сек) замість довгих зависань
                 log.warning(f"🔌 [{err_type}] БД прокидається... Спроба {i+1}/{retries}. Чекаємо {wait_time}с.")
-                import time
                 time.sleep(wait_time)
                 continue
                 
             log.error(f"❌ КРИТИЧНА ПОМИЛКА БАЗИ [{err_type}]: {e}")
             
             log.warning(f"⚠️ Активуємо Офлайн-режим (локальний кеш).")
-            if os.path.exists(cache_path):
-                return pd.read_parquet(cache_path)
+            stale = RESULT_CACHE.get_stale(query_id) if cache else None
+            PROFILER.record(
+                query_text, time.perf_counter() - started,
+                rows=len(stale) if stale is not None else 0, cache="miss", retries=i, error=True,
+            )
+            if stale is not None:
+                return stale
             
             return pd.DataFrame()
 
 
 def execute_update(query_text: str, params: Optional[dict] = None) -> bool:
     """Виконує INSERT/UPDATE/DELETE з ретраями."""
+    started = time.perf_counter()
     retries = 2
     for i in range(retries):
         try:
             engine = get_engine()
             with engine.begin() as conn:
-                conn.execute(text(query_text), params or {})
+                result = conn.execute(text(query_text), params or {})
+            DATA_VERSIONS.bump(referenced_tables(query_text))
+            PROFILER.record(
+                query_text, time.perf_counter() - started,
+                kind="update", rows=max(result.rowcount or 0, 0), retries=i,
+            )
             return True
         except Exception as e:
             from src.utils.helpers import StopException, RerunException
             if isinstance(e, (StopException, RerunException)): raise e
             if i < retries - 1:
-                import time
                 time.sleep(2)
                 continue
             log.error(f"Помилка запису: {e}")
+            PROFILER.record(query_text, time.perf_counter() - started, kind="update", retries=i, error=True)
             return False
+
+
+def get_query_profile(limit: Optional[int] = None) -> dict:
+    """Знімок профілю запитів разом зі станом пулу та кешу результатів."""
+    return {
+        "queries": PROFILER.snapshot(limit),
+        "pool": get_pool_stats(),
+        "result_cache": RESULT_CACHE.stats(),
+    }
+
+
+def dump_query_profile(path: Optional[str] = DUMP_PATH) -> str:
+    """Зберігає профіль запитів у JSON (за замовчуванням logs/query_profile.json)."""
+    return PROFILER.dump_json(path, extra={"pool": get_pool_stats(), "result_cache": RESULT_CACHE.stats()})
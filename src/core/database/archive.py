@@ -6,29 +6,30 @@
 
 Ключові можливості:
 - 📅 Archive Bounds Discovery: Автоматичне визначення часових меж доступної статистики.
-- 🔗 Multidimensional Join: Об'єднання метрик навантаження, стану активів та метеоданих.
+- 🔗 Multidimensional Join: Об'єднання метрик навантаження, стану активів та метеоданих (з погодинного rollup LoadHourly).
 - 🥁 Rhythm Slicing: Аналіз циклічності споживання за годинами та днями тижня (DOW).
 - ⚡ Intelligent Caching: Мінімізація навантаження на БД через агресивне кешування.
+- 🧵 Parallel Fetch: Архів та ритм-профіль завантажуються одночасно (load_archive_bundle).
 """
 import datetime
 import pandas as pd
 
 import streamlit as st
 from src.core.database import run_query
+from src.core.database.executor import QuerySpec, run_queries_concurrently
 
 
 @st.cache_data(ttl=3600)
 def get_archive_bounds():
     """Отримує часові межі даних з бази."""
     return run_query(
-        "SELECT MIN(timestamp)::date AS ts_min, MAX(timestamp)::date AS ts_max "
-        "FROM LoadMeasurements"
+        "SELECT MIN(ts_hour)::date AS ts_min, MAX(ts_hour)::date AS ts_max "
+        "FROM LoadHourly"
     )
 
 
-@st.cache_data(ttl=600)
-def load_archive_data(start: datetime.date, end: datetime.date, region: str):
-    """Агрегує погодинні дані: завантаження + погода + стан залiза."""
+def _region_filter(start: datetime.date, end: datetime.date, region) -> tuple:
+    """Спільні параметри періоду та фільтр за регіоном/підстанціями."""
     filter_clause = ""
     params = {
         "start": start.isoformat(),
@@ -43,60 +44,74 @@ def load_archive_data(start: datetime.date, end: datetime.date, region: str):
                 "AND (s.substation_name = :region OR r.region_name = :region)"
             )
             params["region"] = region
+    return filter_clause, params
 
+
+def _archive_query(start: datetime.date, end: datetime.date, region) -> QuerySpec:
+    filter_clause, params = _region_filter(start, end, region)
     sql = f"""
         SELECT
-            lm.timestamp                      AS ts,
+            lh.ts_hour                        AS ts,
             s.substation_name                 AS substation,
-            lm.actual_load_mw                 AS load_mw,
-            lm.temperature_c                  AS oil_temp,
-            lm.h2_ppm                         AS h2_ppm,
-            lm.health_score                   AS health,
-            wr.temperature                    AS air_temp
-        FROM LoadMeasurements lm
-        JOIN Substations   s  ON lm.substation_id = s.substation_id
+            lh.load_avg_mw                    AS load_mw,
+            lh.oil_temp_avg                   AS oil_temp,
+            lh.h2_ppm_avg                     AS h2_ppm,
+            lh.health_avg                     AS health,
+            lh.air_temp                       AS air_temp
+        FROM LoadHourly lh
+        JOIN Substations   s  ON lh.substation_id = s.substation_id
         JOIN Regions       r  ON s.region_id      = r.region_id
-        LEFT JOIN WeatherReports wr
-               ON DATE_TRUNC('hour', wr.timestamp) = DATE_TRUNC('hour', lm.timestamp)
-               AND wr.region_id = r.region_id
-        WHERE lm.timestamp >= :start
-          AND lm.timestamp <  :end
+        WHERE lh.ts_hour >= :start
+          AND lh.ts_hour <  :end
           {filter_clause}
         ORDER BY ts ASC, s.substation_name ASC
     """
-    return run_query(sql, params)
-
+    return QuerySpec(sql, params)
 
-@st.cache_data(ttl=600)
-def load_rhythm_data(start: datetime.date, end: datetime.date, region: str):
-    """Середнє навантаження по годині доби для кожного дня тижня."""
-    filter_clause = ""
-    params = {
-        "start": start.isoformat(),
-        "end": (end + datetime.timedelta(days=1)).isoformat(),
-    }
-    if region:
-        if isinstance(region, list):
-            filter_clause = "AND s.substation_name IN :region"
-            params["region"] = tuple(region)
-        elif region not in ("Всі регіони", "Усі підстанції", "AEP Region", ""):
-            filter_clause = (
-                "AND (s.substation_name = :region OR r.region_name = :region)"
-            )
-            params["region"] = region
 
+def _rhythm_query(start: datetime.date, end: datetime.date, region) -> QuerySpec:
+    filter_clause, params = _region_filter(start, end, region)
     sql = f"""
         SELECT
-            EXTRACT(ISODOW FROM lm.timestamp)  AS dow,
-            EXTRACT(HOUR   FROM lm.timestamp)  AS hour_of_day,
-            AVG(lm.actual_load_mw)             AS avg_load
-        FROM LoadMeasurements lm
-        JOIN Substations s ON lm.substation_id = s.substation_id
+            EXTRACT(ISODOW FROM lh.ts_hour)    AS dow,
+            EXTRACT(HOUR   FROM lh.ts_hour)    AS hour_of_day,
+            SUM(lh.load_sum_mw) / NULLIF(SUM(lh.samples), 0) AS avg_load
+        FROM LoadHourly lh
+        JOIN Substations s ON lh.substation_id = s.substation_id
         JOIN Regions     r ON s.region_id      = r.region_id
-        WHERE lm.timestamp >= :start
-          AND lm.timestamp <  :end
+        WHERE lh.ts_hour >= :start
+          AND lh.ts_hour <  :end
           {filter_clause}
         GROUP BY dow, hour_of_day
         ORDER BY hour_of_day ASC
     """
-    return run_query(sql, params)
+    return QuerySpec(sql, params)
+
+
+@st.cache_data(ttl=600)
+def load_archive_data(start: datetime.date, end: datetime.date, region: str):
+    """Агрегує погодинні дані: завантаження + погода + стан залiза."""
+    spec = _archive_query(start, end, region)
+    return run_query(spec.sql, spec.params)
+
+
+@st.cache_data(ttl=600)
+def load_rhythm_data(start: datetime.date, end: datetime.date, region: str):
+    """Середнє навантаження по годині доби для кожного дня тижня."""
+    spec = _rhythm_query(start, end, region)
+    return run_query(spec.sql, spec.params)
+
+
+@st.cache_data(ttl=600)
+def load_archive_bundle(start: datetime.date, end: datetime.date, region: str):
+    """
+    Паралельно завантажує погодинний архів та ритм-профіль для вкладки архіву.
+
+    Returns:
+        (df_archive, df_rhythm) — ті самі DataFrame, що й окремі load_* функції.
+    """
+    batch = run_queries_concurrently({
+        "archive": _archive_query(start, end, region),
+        "rhythm": _rhythm_query(start, end, region),
+    })
+    return batch.frames["archive"], batch.frames["rhythm"]
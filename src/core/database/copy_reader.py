@@ -0,0 +1,196 @@
+# ATLAS_PASSPORT: docs/system/map/copy_reader.md
+"""
+🚀 BULK COPY READER (Columnar Result Streaming).
+Модуль: copy_reader.py | Версія: 1.0.0
+Призначення: Альтернативний шлях читання великих вибірок через `COPY (query) TO STDOUT` замість построкової матеріалізації pd.read_sql.
+
+Ключові можливості:
+- 📤 Server-side COPY: PostgreSQL серіалізує результат у CSV одним потоком, без Python-об'єкта на кожну клітинку.
+- 📐 Catalog Types: Типи колонок Arrow задаються з OID cursor.description, а не вгадуються по значеннях ("007" лишається рядком).
+- 🚰 Streaming Parse: CSV розбирається порціями з pipe, поки COPY ще пише, без буфера на весь результат.
+- 🧬 Shared Dtype Plan: Кожна порція проходить той самий DtypePlan, що й chunked-шлях run_query.
+- 🔒 Safe Binding: Параметри підставляються драйвером (mogrify), а не форматуванням рядків.
+"""
+import os
+import threading
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from psycopg2.extensions import encodings
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import psycopg2 as pg_dialect
+
+from src.core.database.dtype_plan import DtypePlan, PlanRegistry
+from src.core.database.result_cache import query_key
+
+_DIALECT = pg_dialect.dialect()
+
+# OID типів PostgreSQL (pg_type) → тип Arrow при розборі CSV; решта колонок — рядки
+_PG_ARROW_TYPES = {
+    16: pa.bool_(),                       # bool
+    20: pa.int64(),                       # int8
+    21: pa.int16(),                       # int2
+    23: pa.int32(),                       # int4
+    700: pa.float64(),                    # float4
+    701: pa.float64(),                    # float8
+    1700: pa.float64(),                   # numeric
+    1082: pa.date32(),                    # date
+    1114: pa.timestamp("us"),             # timestamp
+    1184: pa.timestamp("ns", tz="UTC"),   # timestamptz (як у pd.to_datetime(utc=True))
+}
+
+# Розмір порції розбору; COPY та Arrow працюють паралельно через pipe
+COPY_BLOCK_BYTES = 4 << 20
+
+
+def arrow_column_types(description: Sequence) -> Dict[str, pa.DataType]:
+    """Типи колонок Arrow з DB-API cursor.description (name, type_code, ...)."""
+    return {column[0]: _PG_ARROW_TYPES.get(column[1], pa.string()) for column in description}
+
+
+def _convert_options(column_types: Optional[Dict[str, pa.DataType]] = None) -> pa_csv.ConvertOptions:
+    # NULL у CSV-виводі PostgreSQL — порожнє поле без лапок; "" — порожній рядок
+    return pa_csv.ConvertOptions(
+        column_types=column_types or {},
+        true_values=["t"],
+        false_values=["f"],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+    )
+
+
+def render_sql(cursor, query_text: str, params: Optional[dict] = None) -> str:
+    """
+    Перетворює SQLAlchemy-запит з `:named` параметрами у готовий SQL для COPY.
+
+    Параметри екрануються самим psycopg2 (cursor.mogrify), тому tuple/list
+    адаптуються так само, як і при звичайному виконанні через run_query.
+    """
+    compiled = str(text(query_text).compile(dialect=_DIALECT))
+    sql = cursor.mogrify(compiled, params or {})
+    if isinstance(sql, bytes):
+        sql = sql.decode(encodings.get(cursor.connection.encoding, "utf-8"))
+    return sql.strip().rstrip(";")
+
+
+def csv_to_frame(
+    source,
+    session_tz: Optional[str] = None,
+    description: Optional[Sequence] = None,
+    plan: Optional[DtypePlan] = None,
+) -> pd.DataFrame:
+    """
+    Порційно розбирає CSV-вивід COPY у DataFrame через Arrow.
+
+    Args:
+        source: Файлоподібний об'єкт з CSV (FORMAT csv, HEADER true).
+        session_tz: TimeZone сесії PostgreSQL для tz-aware колонок.
+        description: cursor.description запиту — типи колонок беруться з каталогу
+            (без нього Arrow виводить типи сам).
+        plan: План типів, що застосовується до кожної порції (див. DtypePlan).
+
+    Returns:
+        DataFrame з типізованими колонками (float/int/datetime/object/category).
+    """
+    column_types = arrow_column_types(description) if description is not None else None
+    reader = pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(block_size=COPY_BLOCK_BYTES),
+        convert_options=_convert_options(column_types),
+    )
+
+    chunks = []
+    for batch in reader:
+        chunk = pa.Table.from_batches([batch]).to_pandas(split_blocks=True, self_destruct=True)
+        del batch
+        chunks.append(plan.apply(chunk) if plan is not None else chunk)
+
+    if plan is not None:
+        return plan.concat(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, copy=False)
+
+    if session_tz:
+        for col in df.columns:
+            col_type = df[col].dtype
+            if isinstance(col_type, pd.DatetimeTZDtype):
+                try:
+                    df[col] = df[col].dt.tz_convert(session_tz)
+                except Exception:
+                    pass  # Невідома назва зони — лишаємо UTC
+    return df
+
+
+def session_timezone(dbapi_conn) -> Optional[str]:
+    """TimeZone поточної сесії PostgreSQL (None, якщо драйвер його не повідомляє)."""
+    try:
+        return dbapi_conn.info.parameter_status("TimeZone")
+    except Exception:
+        return None
+
+
+def describe_query(cursor, sql: str) -> Sequence:
+    """cursor.description запиту без читання рядків (LIMIT 0)."""
+    cursor.execute(f"SELECT * FROM ({sql}) AS copy_src LIMIT 0")
+    return cursor.description
+
+
+def read_sql_copy(
+    query_text: str,
+    params: Optional[dict],
+    dbapi_conn,
+    plans: Optional[PlanRegistry] = None,
+) -> pd.DataFrame:
+    """
+    Виконує SELECT через `COPY (query) TO STDOUT` та повертає DataFrame.
+
+    COPY пише у pipe з окремого потоку, а Arrow розбирає його порціями з
+    типами з каталогу, тож результат ніколи не буферизується цілком.
+
+    Args:
+        query_text: SQL у форматі SQLAlchemy text() (`:name` параметри).
+        params: Параметри запиту.
+        dbapi_conn: Сире psycopg2-з'єднання (наприклад, conn.connection.dbapi_connection).
+        plans: Реєстр планів типів (спільний з chunked-шляхом; None — разовий план).
+    """
+    session_tz = session_timezone(dbapi_conn)
+    with dbapi_conn.cursor() as cursor:
+        sql = render_sql(cursor, query_text, params)
+        description = describe_query(cursor, sql)
+        if not description:
+            return pd.DataFrame()
+        if plans is not None:
+            plan = plans.get_or_create(query_key(query_text), description, session_tz)
+        else:
+            plan = DtypePlan.from_description(description, session_tz)
+
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def _copy():
+            with os.fdopen(write_fd, "wb") as sink:
+                try:
+                    cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)", sink)
+                except Exception as e:
+                    errors.append(e)
+
+        writer = threading.Thread(target=_copy, name="copy-reader", daemon=True)
+        writer.start()
+        try:
+            with os.fdopen(read_fd, "rb") as source:
+                # Закриття читача при помилці розбору обриває COPY (BrokenPipe), а не блокує його
+                df = csv_to_frame(source, session_tz, description, plan)
+        except Exception:
+            writer.join()
+            # Обірваний потік — наслідок помилки COPY: піднімаємо саму помилку БД
+            if errors and not isinstance(errors[0], BrokenPipeError):
+                raise errors[0]
+            raise
+        writer.join()
+
+    if errors:
+        raise errors[0]
+    return df
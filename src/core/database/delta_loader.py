@@ -0,0 +1,214 @@
+# ATLAS_PASSPORT: docs/system/map/delta_loader.md
+"""
+🔁 INCREMENTAL DELTA LOADER (Watermark-based Dashboard Refresh).
+Модуль: delta_loader.py | Версія: 1.0.0
+Призначення: Оновлення набору даних дашборду (load/gen/fin/lines) довантаженням лише нових рядків замість повного перечитування вікна.
+
+Ключові можливості:
+- 🔖 Per-dataset Watermark: Для кожного набору зберігається останній побачений timestamp; запит повертає лише новіші рядки.
+- ✂️ Window Trim: Після дописування старий край обрізається (30 днів для load, 50k рядків для gen/fin/lines).
+- 🧩 Category Alignment: Категорії дельти об'єднуються з кешованими, тому склеювання не деградує до object.
+- ♻️ Periodic Reconcile: Повне перечитування раз на DELTA_FULL_REFRESH_S або коли дельта досягла ліміту.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from src.core import queries as q
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+# TTL кешу fetch_database_data: вартість оновлення тепер O(нових рядків)
+DELTA_REFRESH_TTL_S = int(os.getenv("DELTA_REFRESH_TTL_S", "15"))
+# Повне перечитування для узгодження (заднім числом вставлені/змінені рядки)
+DELTA_FULL_REFRESH_S = int(os.getenv("DELTA_FULL_REFRESH_S", "1800"))
+# Максимум рядків дельти; більше — дешевше перечитати вікно повністю
+DELTA_MAX_ROWS = int(os.getenv("DELTA_MAX_ROWS", "20000"))
+
+
+@dataclass(frozen=True)
+class DeltaDataset:
+    """
+    Опис набору даних з інкрементальним довантаженням.
+
+    Рівно одне з window / max_rows задає обрізання старого краю.
+    ascending — порядок рядків у кешованому кадрі (як у повному запиті).
+    """
+    key: str
+    full_sql: str
+    delta_sql: str
+    ascending: bool
+    window: Optional[pd.Timedelta] = None
+    max_rows: Optional[int] = None
+    bulk: bool = True
+    ts_col: str = "timestamp"
+
+
+DATASETS = (
+    DeltaDataset("load", q.QUERY_LOAD_WEATHER, q.QUERY_LOAD_WEATHER_DELTA, ascending=True, window=pd.Timedelta(days=30)),
+    DeltaDataset("gen", q.QUERY_GENERATION, q.QUERY_GENERATION_DELTA, ascending=False, max_rows=50000),
+    DeltaDataset("fin", q.QUERY_FINANCE, q.QUERY_FINANCE_DELTA, ascending=False, max_rows=50000),
+    DeltaDataset("lines", q.QUERY_LINES, q.QUERY_LINES_DELTA, ascending=False, max_rows=50000),
+)
+
+
+def concat_aligned(base: pd.DataFrame, delta: pd.DataFrame, delta_first: bool = False) -> pd.DataFrame:
+    """
+    Склеює кешований кадр і дельту без деградації Category до object:
+    обидві частини отримують об'єднаний набір категорій.
+    """
+    if delta.empty:
+        return base
+    if base.empty:
+        return delta
+
+    delta = delta.reindex(columns=base.columns)
+    base_casts, delta_casts = {}, {}
+    for name, dtype in base.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            extra = pd.Index(delta[name].dropna().unique()).difference(dtype.categories)
+            merged = pd.CategoricalDtype(dtype.categories.append(extra)) if len(extra) else dtype
+            if merged is not dtype:
+                base_casts[name] = merged
+            delta_casts[name] = merged
+    if base_casts:
+        base = base.astype(base_casts, copy=False)
+    if delta_casts:
+        delta = delta.astype(delta_casts, copy=False)
+
+    parts = [delta, base] if delta_first else [base, delta]
+    return pd.concat(parts, ignore_index=True, copy=False)
+
+
+def _trim(spec: DeltaDataset, df: pd.DataFrame) -> pd.DataFrame:
+    """Обрізає старий край кадру до вікна набору."""
+    if spec.max_rows is not None and len(df) > spec.max_rows:
+        # Кадр відсортований за спаданням — найстаріші рядки в хвості
+        return df.iloc[:spec.max_rows].reset_index(drop=True)
+    if spec.window is not None and spec.ts_col in df.columns and not df.empty:
+        ts = df[spec.ts_col]
+        tz = getattr(ts.dt, "tz", None)
+        cutoff = pd.Timestamp.now(tz=tz) - spec.window if tz else pd.Timestamp.now() - spec.window
+        # Кадр відсортований за зростанням — відсікаємо префікс бінарним пошуком
+        start = int(ts.searchsorted(cutoff, side="left"))
+        if start:
+            return df.iloc[start:].reset_index(drop=True)
+    return df
+
+
+@dataclass
+class _DatasetState:
+    frame: pd.DataFrame = field(default_factory=pd.DataFrame)
+    watermark: Optional[pd.Timestamp] = None
+    full_loaded_at: float = 0.0
+
+
+class DeltaStore:
+    """
+    Кешовані кадри дашборду з водяними знаками для одного режиму БД.
+
+    Args:
+        fetch: Функція виконання запиту з сигнатурою run_query(sql, params, bulk=..., cache=...).
+        datasets: Набори з інкрементальним довантаженням.
+        full_refresh_s: Період повного перечитування.
+        max_delta_rows: Ліміт рядків дельти.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., pd.DataFrame],
+        datasets=DATASETS,
+        full_refresh_s: float = DELTA_FULL_REFRESH_S,
+        max_delta_rows: int = DELTA_MAX_ROWS,
+    ):
+        self._fetch = fetch
+        self._datasets = {spec.key: spec for spec in datasets}
+        self._full_refresh_s = full_refresh_s
+        self._max_delta_rows = max_delta_rows
+        self._lock = threading.Lock()
+        self._state: Dict[str, _DatasetState] = {key: _DatasetState() for key in self._datasets}
+
+    def _full_load(self, spec: DeltaDataset, state: _DatasetState) -> int:
+        df = self._fetch(spec.full_sql, None, bulk=spec.bulk)
+        state.frame = df
+        state.watermark = df[spec.ts_col].max() if spec.ts_col in df.columns and not df.empty else None
+        state.full_loaded_at = time.monotonic()
+        return len(df)
+
+    def _delta_load(self, spec: DeltaDataset, state: _DatasetState) -> Optional[int]:
+        """Довантажує нові рядки; None — потрібне повне перечитування."""
+        since = state.watermark.to_pydatetime() if hasattr(state.watermark, "to_pydatetime") else state.watermark
+        # Повз кеш результатів: при незмінному since ключ запиту той самий, і порожня дельта закешувалася б
+        delta = self._fetch(spec.delta_sql, {"since": since, "cap": self._max_delta_rows}, bulk=spec.bulk, cache=False)
+        if len(delta) >= self._max_delta_rows:
+            return None
+        if delta.empty:
+            return 0
+        state.frame = _trim(spec, concat_aligned(state.frame, delta, delta_first=not spec.ascending))
+        state.watermark = max(state.watermark, delta[spec.ts_col].max())
+        return len(delta)
+
+    def refresh(self) -> Dict[str, pd.DataFrame]:
+        """
+        Оновлює всі набори (дельтою або повністю) та повертає актуальні кадри.
+
+        Кадри не копіюються — викликач (st.cache_data) серіалізує їх сам.
+        """
+        with self._lock:
+            stats = {}
+            for key, spec in self._datasets.items():
+                state = self._state[key]
+                stale = time.monotonic() - state.full_loaded_at >= self._full_refresh_s
+                fetched = None
+                if state.watermark is not None and not stale:
+                    fetched = self._delta_load(spec, state)
+                if fetched is None:
+                    stats[key] = f"full:{self._full_load(spec, state)}"
+                else:
+                    stats[key] = f"+{fetched}"
+            log.debug(f"🔁 Delta refresh: {stats}")
+            return {key: state.frame for key, state in self._state.items()}
+
+    def seed(self, frames: Dict[str, pd.DataFrame], watermarks: Dict[str, Optional[pd.Timestamp]]) -> None:
+        """Ініціалізує стан з теплого знімка: наступне оновлення — дельта від його водяних знаків."""
+        with self._lock:
+            for key, frame in frames.items():
+                if key in self._state and watermarks.get(key) is not None:
+                    self._state[key] = _DatasetState(frame, watermarks[key], time.monotonic())
+
+    def reset(self) -> None:
+        """Скидає водяні знаки: наступне оновлення перечитає всі набори повністю."""
+        with self._lock:
+            self._state = {key: _DatasetState() for key in self._datasets}
+
+    def watermarks(self) -> Dict[str, Optional[pd.Timestamp]]:
+        with self._lock:
+            return {key: state.watermark for key, state in self._state.items()}
+
+
+_STORES: Dict[str, DeltaStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_delta_store(db_mode: str) -> DeltaStore:
+    """Спільне для процесу сховище дельт окремо для кожного режиму БД."""
+    with _STORES_LOCK:
+        store = _STORES.get(db_mode)
+        if store is None:
+            from src.core.database import run_query
+            store = DeltaStore(run_query)
+            _STORES[db_mode] = store
+        return store
+
+
+def reset_delta_stores() -> None:
+    """Скидає всі сховища (перегенерація БД, примусове оновлення)."""
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    for store in stores:
+        store.reset()
@@ -0,0 +1,202 @@
+# ATLAS_PASSPORT: docs/system/map/dtype_plan.md
+"""
+🧬 DTYPE PLAN (Schema-driven Memory Diet).
+Модуль: dtype_plan.py | Версія: 1.0.0
+Призначення: Визначення цільових типів колонок один раз на запит (з каталогу PostgreSQL) та їх застосування до кожного chunk одним векторизованим проходом.
+
+Ключові можливості:
+- 📐 Catalog Types: Типи беруться з cursor.description (OID PostgreSQL), а не вгадуються по значеннях кожного chunk.
+- ⚡ Single-pass Cast: Один виклик DataFrame.astype(dict) на chunk замість циклу по колонках.
+- 🧩 Zero-upcast Concat: Усі chunk мають ідентичні dtypes; Category та звуження int64 — один раз після конкатенації.
+- 🗂️ Plan Registry: План кешується на процес за текстом запиту та уточнюється, якщо в колонці з'явився NULL.
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Колонки з малою кількістю унікальних значень — конвертуємо у Category
+KNOWN_CATEGORICAL_COLS = frozenset({
+    "region_name", "substation_name", "alert_type", "status",
+    "conditions", "generator_type", "day_type", "source_type",
+})
+
+# OID типів PostgreSQL (pg_type) → цільовий dtype chunk
+_PG_CASTS = {
+    21: "int16",        # int2
+    23: "int32",        # int4
+    20: "int64",        # int8 — звужується за діапазоном після конкатенації
+    700: "float32",     # float4
+    701: "float32",     # float8
+    1700: "float32",    # numeric
+    1114: "datetime64[s]",  # timestamp
+    16: "bool",
+}
+_PG_TIMESTAMPTZ = 1184
+_PG_TEXT = {19, 25, 1042, 1043}  # name, text, bpchar, varchar
+
+# Якщо в колонці трапився NULL, numpy-тип її не вмістить — план переходить на ці типи
+_NULLABLE_FALLBACK = {
+    "int16": "float32",
+    "int32": "float32",
+    "int64": "float64",
+    "bool": "object",
+}
+
+
+@dataclass
+class DtypePlan:
+    """
+    Цільова схема результату запиту.
+
+    casts застосовується до кожного chunk; categorical, tz_columns та
+    downcast_ints — лише один раз до фінального DataFrame.
+    """
+    casts: Dict[str, str] = field(default_factory=dict)
+    categorical: Tuple[str, ...] = ()
+    tz_columns: Tuple[str, ...] = ()
+    downcast_ints: Tuple[str, ...] = ()
+    session_tz: Optional[str] = None
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    # --- Побудова ---
+
+    @classmethod
+    def from_description(
+        cls,
+        description: Sequence,
+        session_tz: Optional[str] = None,
+        categorical_cols: Iterable[str] = KNOWN_CATEGORICAL_COLS,
+    ) -> "DtypePlan":
+        """
+        План з DB-API cursor.description (name, type_code, ...).
+
+        Args:
+            description: Опис колонок результату psycopg2.
+            session_tz: TimeZone сесії для TIMESTAMPTZ-колонок.
+            categorical_cols: Текстові колонки, що стають Category.
+        """
+        categorical_cols = set(categorical_cols)
+        casts, categorical, tz_columns, downcast = {}, [], [], []
+        for column in description:
+            name, type_code = column[0], column[1]
+            if type_code in _PG_CASTS:
+                casts[name] = _PG_CASTS[type_code]
+                if type_code == 20:
+                    downcast.append(name)
+            elif type_code == _PG_TIMESTAMPTZ:
+                tz_columns.append(name)
+            elif type_code in _PG_TEXT and name in categorical_cols:
+                categorical.append(name)
+        return cls(casts, tuple(categorical), tuple(tz_columns), tuple(downcast), session_tz)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        categorical_cols: Iterable[str] = KNOWN_CATEGORICAL_COLS,
+    ) -> "DtypePlan":
+        """План, виведений з dtypes готового DataFrame (CSV, Arrow, довільні джерела)."""
+        categorical_cols = set(categorical_cols)
+        casts, categorical, downcast = {}, [], []
+        for name, dtype in df.dtypes.items():
+            if dtype == np.float64:
+                casts[name] = "float32"
+            elif dtype == np.int64:
+                downcast.append(name)
+            elif dtype == object:
+                # ⚠️ Category ТІЛЬКИ для відомих статичних колонок з whitelist!
+                # НЕ використовуємо unique_ratio — це ламає код, що присвоює нові значення.
+                if name in categorical_cols:
+                    categorical.append(name)
+            elif dtype.kind == "M" and not isinstance(dtype, pd.DatetimeTZDtype):
+                casts[name] = "datetime64[s]"
+        return cls(casts, tuple(categorical), (), tuple(downcast))
+
+    # --- Застосування ---
+
+    def _demote_nullable(self, chunk: pd.DataFrame) -> None:
+        """Колонки з NULL, які не вміщує цільовий numpy-тип, назавжди переводяться на fallback."""
+        for name, target in list(self.casts.items()):
+            fallback = _NULLABLE_FALLBACK.get(target)
+            if fallback and name in chunk.columns and chunk[name].isna().any():
+                with self._lock:
+                    self.casts[name] = fallback
+                if name in self.downcast_ints:
+                    self.downcast_ints = tuple(c for c in self.downcast_ints if c != name)
+
+    def apply(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Приводить один chunk до цільових типів одним викликом astype."""
+        if chunk.empty and not len(chunk.columns):
+            return chunk
+        self._demote_nullable(chunk)
+        with self._lock:
+            casts = {c: t for c, t in self.casts.items() if c in chunk.columns and chunk[c].dtype != t}
+        return chunk.astype(casts, copy=False) if casts else chunk
+
+    def concat(self, chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Склеює chunk без апкастів та виконує фінальні перетворення.
+
+        Chunk, оброблені до того, як план уточнився (NULL у пізнішому chunk),
+        доводяться до актуальних типів перед конкатенацією.
+        """
+        if not chunks:
+            return pd.DataFrame()
+        chunks = [self.apply(c) for c in chunks]
+        df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, copy=False)
+        return self.finalize(df)
+
+    def finalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Разові перетворення повного результату: TIMESTAMPTZ, Category, звуження int64."""
+        if df.empty:
+            return df
+
+        for name in self.tz_columns:
+            if name in df.columns:
+                col = pd.to_datetime(df[name], utc=True)
+                if self.session_tz:
+                    try:
+                        col = col.dt.tz_convert(self.session_tz)
+                    except Exception:
+                        pass  # Невідома назва зони — лишаємо UTC
+                df[name] = col
+
+        final = {c: "category" for c in self.categorical if c in df.columns}
+        ints = [c for c in self.downcast_ints if c in df.columns and df[c].dtype == np.int64]
+        if ints:
+            bounds = df[ints].agg(["min", "max"])
+            for name in ints:
+                lo, hi = bounds.at["min", name], bounds.at["max", name]
+                if lo >= np.iinfo(np.int16).min and hi <= np.iinfo(np.int16).max:
+                    final[name] = "int16"
+                elif lo >= np.iinfo(np.int32).min and hi <= np.iinfo(np.int32).max:
+                    final[name] = "int32"
+        return df.astype(final, copy=False) if final else df
+
+
+class PlanRegistry:
+    """Кеш планів на процес: ключ — текст запиту (схема не залежить від параметрів)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plans: Dict[str, DtypePlan] = {}
+
+    def get_or_create(self, key: str, description: Sequence, session_tz: Optional[str] = None) -> DtypePlan:
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                plan = DtypePlan.from_description(description, session_tz)
+                self._plans[key] = plan
+            return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
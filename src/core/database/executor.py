@@ -0,0 +1,156 @@
+# ATLAS_PASSPORT: docs/system/map/executor.md
+"""
+⚡ CONCURRENT QUERY EXECUTOR (Parallel Data Fetch).
+Модуль: executor.py | Версія: 1.0.0
+Призначення: Паралельне виконання кількох незалежних запитів до БД, щоб час холодного старту визначався найповільнішим запитом, а не сумою.
+
+Ключові можливості:
+- 🧵 Shared Worker Pool: Один ThreadPoolExecutor на процес обмежує кількість одночасних запитів від усіх сесій.
+- 🏷️ Named Queries: Вхід — словник {ім'я: SQL | QuerySpec}, вихід — словник DataFrame з тими ж ключами.
+- ⏱️ Per-query Timings: Час виконання кожного запиту та загальний wall-time пакета.
+- 📡 Streamlit Context: Робочі потоки успадковують ScriptRunContext, тому st.session_state (db_mode) доступний.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+DEFAULT_MAX_WORKERS = int(os.getenv("DB_QUERY_WORKERS", "6"))
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """Опис одного запиту в пакеті."""
+    sql: str
+    params: Optional[dict] = None
+    bulk: bool = False
+
+
+@dataclass
+class QueryBatchResult:
+    """Результат пакетного виконання."""
+    frames: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Спільний для процесу пул робочих потоків."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="atlas-db")
+        return _EXECUTOR
+
+
+def _bind_script_context(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Прокидає ScriptRunContext Streamlit у робочий потік (якщо ми всередині сесії)."""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:
+        return fn
+    if ctx is None:
+        return fn
+
+    def wrapped():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn()
+
+    return wrapped
+
+
+def submit_with_context(fn: Callable[[], Any], executor: Optional[ThreadPoolExecutor] = None) -> Future:
+    """
+    Запускає задачу без аргументів у пулі, зберігаючи ScriptRunContext сесії.
+
+    Args:
+        fn: Функція без аргументів.
+        executor: Власний пул (за замовчуванням — спільний пул процесу).
+    """
+    return (executor or get_executor()).submit(_bind_script_context(fn))
+
+
+def iter_concurrent(
+    tasks: Dict[str, Callable[[], Any]],
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> Iterator[Tuple[str, Any, float, Optional[BaseException]]]:
+    """
+    Запускає незалежні задачі паралельно та віддає результати в порядку завершення.
+
+    Args:
+        tasks: {ім'я: функція без аргументів}.
+        executor: Власний пул (за замовчуванням — спільний пул процесу).
+
+    Yields:
+        (ім'я, результат або None, секунди, виняток або None).
+    """
+    pool = executor or get_executor()
+
+    def timed(fn):
+        started = time.perf_counter()
+        try:
+            return fn(), time.perf_counter() - started, None
+        except BaseException as e:  # Передаємо викликачу, а не губимо в потоці
+            return None, time.perf_counter() - started, e
+
+    futures = {pool.submit(timed, _bind_script_context(fn)): name for name, fn in tasks.items()}
+    for future in as_completed(futures):
+        result, elapsed, error = future.result()
+        yield futures[future], result, elapsed, error
+
+
+def run_queries_concurrently(
+    queries: Dict[str, Union[str, QuerySpec]],
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> QueryBatchResult:
+    """
+    Виконує іменовані SELECT-запити паралельно через run_query.
+
+    Args:
+        queries: {ім'я: SQL-рядок або QuerySpec}.
+        executor: Власний пул потоків (опційно).
+
+    Returns:
+        QueryBatchResult з DataFrame, часом кожного запиту та помилками.
+    """
+    from src.core.database import run_query
+
+    tasks = {}
+    for name, spec in queries.items():
+        if isinstance(spec, str):
+            spec = QuerySpec(spec)
+        tasks[name] = (lambda s=spec: run_query(s.sql, s.params, bulk=s.bulk))
+
+    batch = QueryBatchResult()
+    started = time.perf_counter()
+    for name, df, elapsed, error in iter_concurrent(tasks, executor):
+        batch.timings[name] = round(elapsed, 4)
+        if error is not None:
+            from src.utils.helpers import StopException, RerunException
+            if isinstance(error, (StopException, RerunException)):
+                raise error
+            log.error(f"❌ Паралельний запит '{name}' завершився помилкою: {error}")
+            batch.errors[name] = f"{type(error).__name__}: {error}"
+            batch.frames[name] = pd.DataFrame()
+        else:
+            batch.frames[name] = df if df is not None else pd.DataFrame()
+    batch.wall_time = round(time.perf_counter() - started, 4)
+
+    log.info(
+        f"⚡ Паралельний пакет з {len(queries)} запитів: {batch.wall_time:.2f}s "
+        f"(сума {sum(batch.timings.values()):.2f}s)"
+    )
+    return batch
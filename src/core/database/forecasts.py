@@ -0,0 +1,32 @@
+# ATLAS_PASSPORT: docs/system/map/forecasts.md
+"""
+🛰️ FORECASTS SCHEMA (Precomputed Forecast Storage).
+Модуль: forecasts.py | Версія: 1.0.0
+Призначення: Схема таблиці Forecasts, у яку фоновий воркер прогнозів (src/ml/forecast_worker.py) пише готові прогони після кожної нової години LoadHourly.
+
+Ключові можливості:
+- 🛰️ Forecasts Table: Прогін (substation_id, version) — рядки horizon_h 0..N, де 0 — стартова фактична точка.
+- 🔖 Per-run Source Hour: source_hour фіксує годину rollup, від якої виданий прогін, — завершеність обліковується окремо для кожної пари (підстанція, версія).
+- ♻️ Idempotent DDL: CREATE/ALTER ... IF NOT EXISTS для наявних інсталяцій (нові отримують те саме з sql/01_create_schema.sql).
+"""
+
+# DDL для наявних інсталяцій (нові отримують те саме з sql/01_create_schema.sql)
+FORECASTS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS Forecasts (
+        substation_id INT NOT NULL,
+        version VARCHAR(10) NOT NULL,
+        timestamp TIMESTAMPTZ NOT NULL,
+        horizon_h SMALLINT NOT NULL,
+        predicted_load_mw DECIMAL(10, 2) NOT NULL,
+        lower DECIMAL(10, 2),
+        upper DECIMAL(10, 2),
+        predicted_health_score DECIMAL(5, 2),
+        source_hour TIMESTAMPTZ,
+        PRIMARY KEY (substation_id, version, timestamp),
+        FOREIGN KEY (substation_id) REFERENCES Substations(substation_id) ON DELETE CASCADE
+    );
+    """,
+    # Таблиці, створені до обліку завершеності по парах: старі прогони (NULL) вважаються незавершеними
+    "ALTER TABLE Forecasts ADD COLUMN IF NOT EXISTS source_hour TIMESTAMPTZ;",
+]
@@ -5,13 +5,17 @@ py | Версія: 2.3.0
 Призначення: Центральний вузол управління життєвим циклом даних: від ініціалізації з'єднань до інтелектуального завантаження аналітичних зрізів.
 
 Ключові можливості:
-- 🏗️ Active Boot Sequencing: Поетапне завантаження компонентів з візуальною індикацією прогресу.
+- 🏗️ Active Boot Sequencing: Паралельне завантаження незалежних компонентів з індикацією прогресу по мірі завершення.
 - ⚡ Multi-level Caching: Дворівнева оптимізація доступу (RAM Cache + Session Fallback).
+- 🔁 Delta Refresh: Інкрементальне довантаження нових рядків за водяним знаком (delta_loader.py).
+- 🫙 Shared Snapshots: Один незмінний знімок кадрів на процес для всіх сесій (shared_store.py).
+- 🔥 Warm Start: Знімок набору даних на диску (Parquet + маніфест) для миттєвого старту після рестарту (warm_start.py).
 - 🦥 Lazy Loading: Завантаження великих архівів (Kaggle) виключно за запитом (Just-in-Time).
 - 🛡️ Robust Recovery: Автоматичне відновлення даних та Seeder-інтеграція при порожній БД.
 """
 import gc
 import logging
+import threading
 import time
 from typing import Dict, Generator, Optional, Tuple, Any
 
@@ -20,6 +24,9 @@ import streamlit as st
 
 from src.core import database as db
 from src.core import queries as q
+from src.core.database.delta_loader import DELTA_REFRESH_TTL_S, get_delta_store, reset_delta_stores
+from src.core.database.shared_store import get_shared_store, invalidate_shared_stores
+from src.core.database.warm_start import clear_snapshots, load_snapshot, maybe_save_snapshot
 from src.services.data.db_services import get_latest_measurements
 from src.utils.error_handlers import robust_database_handler, ErrorContext
 from src.utils.validators import validate_step_key, ValidationError
@@ -61,15 +68,15 @@ def fetch_granular_data(step_key: str) -> Dict[str, pd.DataFrame]:
     try:
         with ErrorContext(f"Fetch step: {step_key}"):
             if step_key == "sql_load":
-                return {"load": db.run_query(q.QUERY_LOAD_WEATHER)}
+                return {"load": db.run_query(q.QUERY_LOAD_WEATHER, bulk=True)}
             elif step_key == "sql_gen":
-                return {"gen": db.run_query(q.QUERY_GENERATION)}
+                return {"gen": db.run_query(q.QUERY_GENERATION, bulk=True)}
             elif step_key == "sql_fin":
-                return {"fin": db.run_query(q.QUERY_FINANCE)}
+                return {"fin": db.run_query(q.QUERY_FINANCE, bulk=True)}
             elif step_key == "sql_alerts":
                 return {"alerts": db.run_query(q.QUERY_ALERTS)}
             elif step_key == "sql_lines":
-                return {"lines": db.run_query(q.QUERY_LINES)}
+                return {"lines": db.run_query(q.QUERY_LINES, bulk=True)}
             elif step_key == "telemetry":
                 return {"telemetry": get_latest_measurements()}
             else:
@@ -117,6 +124,31 @@ def load_kaggle_lazy() -> pd.DataFrame:
         return pd.DataFrame()
 
 
+# Незалежні етапи завантаження: ключ fetch_granular_data → повідомлення бут-логу
+BOOT_STEPS = {
+    "sql_load":   "> 🔌 [CHANNEL 0] Connecting to Neon Cloud Cluster...",
+    "sql_gen":    "> 🧬 Synchronizing Neural Historical Data...",
+    "sql_fin":    "> ⚡ Calibrating Asset Capacity Buffers...",
+    "sql_alerts": "> 🛡️ Pulling Strategic Alert Matrices (SAM)...",
+    "sql_lines":  "> ⚖️ Validating Grid Topology & Line Vectors...",
+    "telemetry":  "> 🌌 Establishing Real-time Telemetry Stream...",
+}
+# Ключ у словнику даних, який повертає кожен етап
+BOOT_STEP_DATASETS = {
+    "sql_load": "load", "sql_gen": "gen", "sql_fin": "fin",
+    "sql_alerts": "alerts", "sql_lines": "lines", "telemetry": "telemetry",
+}
+# Прогрес після N-го завершеного етапу (порядок завершення довільний)
+_BOOT_PROGRESS = (20, 35, 50, 62, 74, 87)
+
+
+def _log_boot_message(msg: str) -> None:
+    clean_msg = msg.replace(">", "").strip()
+    if clean_msg not in LOGGED_BOOT_MESSAGES:
+        logger.info(clean_msg)
+        LOGGED_BOOT_MESSAGES.add(clean_msg)
+
+
 def get_active_boot_data_generator():
     """
     Generator: yields (message, progress_pct, data_chunk).
@@ -124,27 +156,45 @@ def get_active_boot_data_generator():
     [ОПТИМІЗОВАНО v2]: Kaggle ВИДАЛЕНО з boot sequence.
     Завантажується ~100 MB менше при старті.
     Kaggle дані — lazy через load_kaggle_lazy().
+
+    [ОПТИМІЗОВАНО v3]: Етапи незалежні, тому виконуються паралельно у спільному
+    пулі executor; повідомлення віддається в момент завершення кожного етапу.
+    Час старту ≈ найповільніший запит, а не сума всіх.
+
+    [ОПТИМІЗОВАНО v4]: Набори, що вже є у спільному знімку (теплий старт з диска
+    або завантаження іншою сесією), беруться з нього без запитів до БД.
     """
-    steps = [
-        ("> Initializing Kernel & Handshake protocol...",         10,  None),
-        ("> 🔌 [CHANNEL 0] Connecting to Neon Cloud Cluster...",  20,  "sql_load"),
-        ("> 🧬 Synchronizing Neural Historical Data...",          35,  "sql_gen"),
-        ("> ⚡ Calibrating Asset Capacity Buffers...",             50,  "sql_fin"),
-        ("> 🛡️ Pulling Strategic Alert Matrices (SAM)...",        62,  "sql_alerts"),
-        ("> ⚖️ Validating Grid Topology & Line Vectors...",       74,  "sql_lines"),
-        ("> 🌌 Establishing Real-time Telemetry Stream...",        87,  "telemetry"),
-        ("> 🎯 ENERGY CORE ONLINE. WELCOME, OPERATOR.",           100, None),
-    ]
+    from src.core.database.executor import iter_concurrent
 
     final_data = {}
 
-    for msg, p, key in steps:
+    msg = "> Initializing Kernel & Handshake protocol..."
+    _log_boot_message(msg)
+    yield msg, 10, final_data
+
+    # Наявний спільний знімок (теплий старт з диска або інша сесія) — ці етапи не запитуються
+    snapshot = _dashboard_store().current
+    warm = snapshot.view() if snapshot is not None else {}
+    done = 0
+    for key, dataset in BOOT_STEP_DATASETS.items():
+        if dataset in warm:
+            final_data[dataset] = warm[dataset]
+            _log_boot_message(BOOT_STEPS[key])
+            yield BOOT_STEPS[key], _BOOT_PROGRESS[done], final_data
+            done += 1
+
+    started = time.perf_counter()
+    tasks = {
+        key: (lambda k=key: fetch_granular_data(k))
+        for key in BOOT_STEPS if BOOT_STEP_DATASETS[key] not in warm
+    }
+    for done, (key, chunk, elapsed, error) in enumerate(iter_concurrent(tasks), start=done):
+        msg = BOOT_STEPS[key]
         try:
-            if key:
-                chunk = fetch_granular_data(key)
-                if isinstance(chunk, dict):
-                    final_data.update(chunk)
-                gc.collect()
+            if error is not None:
+                raise error
+            if isinstance(chunk, dict):
+                final_data.update(chunk)
         except (st.runtime.scriptrunner.StopException, st.errors.StreamlitAPIException):
             raise
         except (ConnectionError, TimeoutError) as e:
@@ -158,38 +208,132 @@ def get_active_boot_data_generator():
             logger.critical(f"🔴 Memory error on step '{msg}': {e}")
             raise
         except Exception as e:
+            from src.utils.helpers import RerunException
+            if isinstance(e, RerunException): raise e
             # Unexpected errors - log with traceback
             logger.exception(f"⚠️ Unexpected error on step '{msg}': {e}")
 
-        clean_msg = msg.replace(">", "").strip()
-        if clean_msg not in LOGGED_BOOT_MESSAGES:
-            logger.info(clean_msg)
-            LOGGED_BOOT_MESSAGES.add(clean_msg)
+        logger.debug(f"Boot step '{key}' finished in {elapsed:.2f}s")
+        _log_boot_message(msg)
+        yield msg, _BOOT_PROGRESS[min(done, len(_BOOT_PROGRESS) - 1)], final_data
+
+    logger.info(f"⚡ Boot sequence: {len(tasks)} запитів за {time.perf_counter() - started:.2f}s")
+    msg = "> 🎯 ENERGY CORE ONLINE. WELCOME, OPERATOR."
+    _log_boot_message(msg)
+    yield msg, 100, final_data
+
+
+# Невеликі набори, що можуть змінюватися заднім числом (статус алертів) — перечитуються повністю
+FULL_RELOAD_STEPS = ("sql_alerts", "telemetry")
+
+# Теплий старт зі знімка на диску пробується один раз на процес для кожного режиму БД
+_WARM_LOCK = threading.Lock()
+_WARM_ATTEMPTED = set()
+
+
+def _load_dashboard_frames(db_mode: str) -> dict:
+    """
+    Свіжий набір кадрів дашборду для режиму БД.
+
+    load/gen/fin/lines довантажуються дельтою від водяного знака (delta_loader),
+    тому оновлення коштує O(нових рядків). Алерти та телеметрія — повністю (малі набори).
+    """
+    data = dict(get_delta_store(db_mode).refresh())
+    for key in FULL_RELOAD_STEPS:
+        chunk = fetch_granular_data(key)
+        if isinstance(chunk, dict):
+            data.update(chunk)
+    maybe_save_snapshot(data, db_mode)
+    return data
+
 
-        yield msg, p, final_data
+def _dashboard_store():
+    db_mode = st.session_state.get("db_mode", "cloud")
+    store = get_shared_store(db_mode, lambda: _load_dashboard_frames(db_mode), DELTA_REFRESH_TTL_S)
+    if store.current is None:
+        _warm_start(store, db_mode)
+    return store
 
 
-@st.cache_data(show_spinner=False, max_entries=1, ttl=1800)  # [ОПТ]
-def fetch_database_data():
+def _warm_start(store, db_mode: str) -> bool:
     """
-    Повне завантаження даних (резервний варіант).
-    max_entries=1 — зберігає тільки 1 версію кешу (було 5).
+    Публікує знімок з диска (один раз на процес і режим БД), засіває водяні знаки
+    дельт і запускає довантаження новіших рядків з БД у фоні.
     """
-    generator = get_active_boot_data_generator()
-    last_data = {}
-    for _, _, chunk in generator:
-        last_data = chunk
+    with _WARM_LOCK:
+        if db_mode in _WARM_ATTEMPTED or store.current is not None:
+            return False
+        _WARM_ATTEMPTED.add(db_mode)
+        snapshot = load_snapshot(db_mode)
+        if snapshot is None:
+            return False
+        frames, watermarks, manifest = snapshot
+        get_delta_store(db_mode).seed(frames, watermarks)
+        store.publish(frames)
+
+    logger.info(f"🔥 Теплий старт зі знімка v{manifest['version']} ({db_mode}); довантаження у фоні.")
+    from src.core.database.executor import submit_with_context
+    store.invalidate()
+    submit_with_context(store.refresh)
+    return True
+
+
+def fetch_database_data() -> dict:
+    """
+    Оновлення даних дашборду.
+
+    [ОПТИМІЗОВАНО v3]: Замість st.cache_data (копія результату на кожен виклик)
+    усі сесії читають один незмінний знімок процесного SharedDataStore. Сесія
+    тримає оренду знімка в session_state і отримує поверхневі view без копіювання
+    даних; TTL оновлення — секунди (DELTA_REFRESH_TTL_S), оновлює один потік.
+    """
+    lease = _dashboard_store().acquire()
+    previous = st.session_state.get("data_lease")
+    st.session_state["data_lease"] = lease
+    if previous is not None and previous is not lease:
+        previous.release()
+    return lease.snapshot.view()
+
 
-    gc.collect()
-    return last_data
+def share_boot_data(boot_data: dict) -> dict:
+    """
+    Публікує результат бут-послідовності у спільне сховище (якщо воно ще порожнє)
+    і повертає view спільного знімка, щоб сесія не тримала власну копію кадрів.
+    """
+    store = _dashboard_store()
+    if store.current is None:
+        if not boot_data or boot_data.get("load") is None or boot_data["load"].empty:
+            return boot_data
+        db_mode = st.session_state.get("db_mode", "cloud")
+        watermarks = {
+            key: df["timestamp"].max() for key, df in boot_data.items()
+            if isinstance(df, pd.DataFrame) and "timestamp" in df.columns and not df.empty
+        }
+        get_delta_store(db_mode).seed(boot_data, watermarks)
+        store.publish(boot_data)
+        maybe_save_snapshot(boot_data, db_mode)
+    return fetch_database_data()
+
+
+def invalidate_dashboard_data(full: bool = False) -> None:
+    """
+    Позначає спільні знімки застарілими (зміни з UI).
+
+    Args:
+        full: Також скинути водяні знаки дельт (перегенерація БД, примусове оновлення).
+    """
+    if full:
+        reset_delta_stores()
+        clear_snapshots()
+    invalidate_shared_stores()
 
 
 def get_verified_data() -> dict:
     """
     Головна точка входу для отримання даних з валідацією та відновленням.
     
-    [ОПТИМІЗОВАНО v2]: session_state зберігає дані тільки при бутстрапі.
-    Після першого завантаження — дані читаються з @st.cache_data (спільний кеш).
+    [ОПТИМІЗОВАНО v3]: Після бутстрапу дані читаються зі спільного для всіх
+    сесій знімка (SharedDataStore) без копіювання.
     """
     from src.services.data.db_seeder import generate_professional_data
 
@@ -212,6 +356,7 @@ def get_verified_data() -> dict:
         if st.button("🚀 Згенерувати тестові дані", type="primary"):
             with st.spinner("⏳ Генерація..."):
                 generate_professional_data()
+                invalidate_dashboard_data(full=True)
                 st.cache_data.clear()
                 st.rerun()
         st.stop()
@@ -0,0 +1,339 @@
+# ATLAS_PASSPORT: docs/system/map/partitions.md
+"""
+🗂️ PARTITION MANAGER (Time-partitioned Measurements).
+Модуль: partitions.py | Версія: 1.0.0
+Призначення: Обслуговування щомісячних RANGE-партицій таблиць вимірювань (Load/Line/GenerationMeasurements) та політики зберігання.
+
+Ключові можливості:
+- 📅 Monthly Partitions: Партиції <table>_pYYYYMM створюються наперед на PARTITION_MONTHS_AHEAD місяців.
+- 🧹 Retention: Партиції, старші за PARTITION_RETENTION_MONTHS, від'єднуються (detach) або видаляються (drop).
+- 📦 Default Rescue: Рядки, що потрапили в DEFAULT-партицію, переносяться у щойно створену місячну.
+- 🔄 Legacy Conversion: Перетворення наявних heap-таблиць у партиційовані без втрати даних (migrate_db).
+"""
+import datetime
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# 0 — зберігати все (retention вимкнено)
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "0"))
+PARTITION_RETENTION_MODE = os.getenv("PARTITION_RETENTION_MODE", "detach")  # detach | drop
+
+_PARTITION_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+# Партиційовані таблиці: DDL батьківської таблиці, індекси та колонки для перенесення даних.
+# Має збігатися з sql/01_create_schema.sql.
+PARTITIONED_TABLES: Dict[str, dict] = {
+    "loadmeasurements": {
+        "ddl": """
+            CREATE TABLE LoadMeasurements (
+                measurement_id BIGSERIAL,
+                timestamp TIMESTAMPTZ NOT NULL,
+                actual_load_mw DECIMAL(10, 2) NOT NULL,
+                substation_id INT,
+                voltage_kv DECIMAL(10, 2),
+                frequency_hz DECIMAL(10, 2),
+                temperature_c DECIMAL(10, 2),
+                h2_ppm DECIMAL(10, 2),
+                health_score DECIMAL(10, 2),
+                sensor_status VARCHAR(50),
+                ts_hour TIMESTAMPTZ GENERATED ALWAYS AS (date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') STORED,
+                PRIMARY KEY (measurement_id, timestamp),
+                FOREIGN KEY (substation_id) REFERENCES Substations(substation_id) ON DELETE CASCADE
+            ) PARTITION BY RANGE (timestamp);
+        """,
+        "indexes": [
+            "CREATE INDEX idx_load_ts_sub ON LoadMeasurements (substation_id, timestamp);",
+            "CREATE INDEX idx_load_ts_brin ON LoadMeasurements USING BRIN (timestamp);",
+            "CREATE INDEX idx_load_sub_hour ON LoadMeasurements (substation_id, ts_hour);",
+        ],
+        "id_column": "measurement_id",
+        "columns": [
+            "measurement_id", "timestamp", "actual_load_mw", "substation_id", "voltage_kv",
+            "frequency_hz", "temperature_c", "h2_ppm", "health_score", "sensor_status",
+        ],
+    },
+    "linemeasurements": {
+        "ddl": """
+            CREATE TABLE LineMeasurements (
+                line_measurement_id BIGSERIAL,
+                timestamp TIMESTAMPTZ NOT NULL,
+                actual_load_mw DECIMAL(10, 2) NOT NULL,
+                line_id INT,
+                PRIMARY KEY (line_measurement_id, timestamp),
+                FOREIGN KEY (line_id) REFERENCES PowerLines(line_id) ON DELETE CASCADE
+            ) PARTITION BY RANGE (timestamp);
+        """,
+        "indexes": [
+            "CREATE INDEX idx_line_ts_id ON LineMeasurements (line_id, timestamp);",
+            "CREATE INDEX idx_line_ts_brin ON LineMeasurements USING BRIN (timestamp);",
+        ],
+        "id_column": "line_measurement_id",
+        "columns": ["line_measurement_id", "timestamp", "actual_load_mw", "line_id"],
+    },
+    "generationmeasurements": {
+        "ddl": """
+            CREATE TABLE GenerationMeasurements (
+                gen_measurement_id BIGSERIAL,
+                timestamp TIMESTAMPTZ NOT NULL,
+                actual_generation_mw DECIMAL(10, 2) NOT NULL,
+                generator_id INT,
+                PRIMARY KEY (gen_measurement_id, timestamp),
+                FOREIGN KEY (generator_id) REFERENCES Generators(generator_id) ON DELETE CASCADE
+            ) PARTITION BY RANGE (timestamp);
+        """,
+        "indexes": [
+            "CREATE INDEX idx_gen_ts_id ON GenerationMeasurements (generator_id, timestamp);",
+            "CREATE INDEX idx_gen_ts_brin ON GenerationMeasurements USING BRIN (timestamp);",
+        ],
+        "id_column": "gen_measurement_id",
+        "columns": ["gen_measurement_id", "timestamp", "actual_generation_mw", "generator_id"],
+    },
+}
+
+
+# --- Календарні хелпери ---
+
+def month_start(value: datetime.date) -> datetime.date:
+    """Перше число місяця для дати/часу."""
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(value: datetime.date, months: int) -> datetime.date:
+    """Зсув першого числа місяця на N місяців (N може бути від'ємним)."""
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime.date) -> str:
+    """Назва місячної партиції: loadmeasurements_p202405."""
+    return f"{table.lower()}_p{month.year:04d}{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime.date]:
+    """Місяць партиції з її назви (None для DEFAULT та сторонніх таблиць)."""
+    match = _PARTITION_RE.search(name)
+    if not match:
+        return None
+    return datetime.date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def expired_partitions(names: List[str], today: datetime.date, retention_months: int) -> List[str]:
+    """
+    Партиції, що повністю старші за вікно зберігання.
+
+    Партиція місяця M прострочена, якщо M + 1 місяць <= (поточний місяць - retention).
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(today), -retention_months)
+    return sorted(
+        name for name in names
+        if (month := partition_month(name)) is not None and add_months(month, 1) <= cutoff
+    )
+
+
+# --- Робота з каталогом ---
+
+def is_partitioned(cursor, table: str) -> bool:
+    """Чи є таблиця вже партиційованою (relkind = 'p')."""
+    cursor.execute(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table.lower(),)
+    )
+    row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(cursor, table: str) -> List[str]:
+    """Імена всіх приєднаних партицій таблиці."""
+    cursor.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+        """,
+        (table.lower(),),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(cursor, table: str, month: datetime.date) -> bool:
+    """
+    Створює місячну партицію, якщо її ще немає.
+
+    Якщо DEFAULT-партиція вже містить рядки цього місяця, PostgreSQL не дасть
+    створити партицію напряму — тоді рядки переносяться в нову таблицю, і вона
+    приєднується через ATTACH PARTITION.
+
+    Returns:
+        True, якщо партицію створено.
+    """
+    table = table.lower()
+    name = partition_name(table, month)
+    existing = list_partitions(cursor, table)
+    if name in existing:
+        return False
+
+    lo, hi = month.isoformat(), add_months(month, 1).isoformat()
+    default = f"{table}_default"
+    has_stray_rows = False
+    if default in existing:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE timestamp >= %s AND timestamp < %s)",
+            (lo, hi),
+        )
+        has_stray_rows = bool(cursor.fetchone()[0])
+
+    if not has_stray_rows:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+            (lo, hi),
+        )
+    else:
+        # Згенеровані колонки (ts_hour) обчислюються заново — переносимо лише фізичні
+        columns = ", ".join(PARTITIONED_TABLES[table]["columns"])
+        cursor.execute(
+            f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+        )
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {default} WHERE timestamp >= %s AND timestamp < %s RETURNING *
+            )
+            INSERT INTO {name} ({columns}) SELECT {columns} FROM moved
+            """,
+            (lo, hi),
+        )
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", (lo, hi))
+        log.info(f"📦 {name}: рядки перенесено з DEFAULT-партиції.")
+    return True
+
+
+def ensure_partitions(
+    cursor,
+    start: Optional[datetime.date] = None,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    today: Optional[datetime.date] = None,
+) -> int:
+    """
+    Створює місячні партиції від start (за замовчуванням — поточний місяць) до
+    поточного місяця + months_ahead для всіх партиційованих таблиць.
+
+    Returns:
+        Кількість створених партицій.
+    """
+    today = today or datetime.date.today()
+    first = month_start(start or today)
+    last = add_months(month_start(today), months_ahead)
+
+    created = 0
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(cursor, table):
+            continue
+        month = first
+        while month <= last:
+            created += int(create_partition(cursor, table, month))
+            month = add_months(month, 1)
+    if created:
+        log.info(f"🗂️ Створено {created} місячних партицій ({first} → {last}).")
+    return created
+
+
+def apply_retention(
+    cursor,
+    retention_months: int = PARTITION_RETENTION_MONTHS,
+    mode: str = PARTITION_RETENTION_MODE,
+    today: Optional[datetime.date] = None,
+) -> List[str]:
+    """
+    Від'єднує (detach) або видаляє (drop) прострочені партиції.
+
+    Від'єднані таблиці лишаються в схемі як архів і більше не скануються запитами.
+    """
+    today = today or datetime.date.today()
+    removed = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(cursor, table):
+            continue
+        for name in expired_partitions(list_partitions(cursor, table), today, retention_months):
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            if mode == "drop":
+                cursor.execute(f"DROP TABLE {name}")
+            removed.append(name)
+    if removed:
+        log.info(f"🧹 Retention ({mode}, {retention_months} міс.): {', '.join(removed)}")
+    return removed
+
+
+def maintain_partitions(cursor=None) -> Tuple[int, List[str]]:
+    """Повний цикл обслуговування: майбутні партиції + retention."""
+    if cursor is None:
+        from src.core.database import get_db_cursor
+        with get_db_cursor() as (_, own_cursor):
+            return maintain_partitions(own_cursor)
+    return ensure_partitions(cursor), apply_retention(cursor)
+
+
+def convert_to_partitioned(cursor, table: str, months_ahead: int = PARTITION_MONTHS_AHEAD) -> bool:
+    """
+    Перетворює наявну heap-таблицю вимірювань на партиційовану.
+
+    Стара таблиця перейменовується у <table>_legacy, створюється нова партиційована
+    з DEFAULT та місячними партиціями на весь діапазон даних, рядки копіюються,
+    послідовність id вирівнюється, після чого legacy-таблиця видаляється.
+    Виконується в транзакції викликача.
+
+    Returns:
+        True, якщо таблицю конвертовано (False — вже партиційована).
+    """
+    table = table.lower()
+    spec = PARTITIONED_TABLES[table]
+    if is_partitioned(cursor, table):
+        return False
+
+    legacy = f"{table}_legacy"
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    # Індекси — окремі relation в схемі: звільняємо їхні імена для нової таблиці
+    cursor.execute(f"ALTER INDEX IF EXISTS {table}_pkey RENAME TO {legacy}_pkey")
+    for index_sql in spec["indexes"]:
+        index_name = index_sql.split()[2]
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    cursor.execute(spec["ddl"])
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    for index_sql in spec["indexes"]:
+        cursor.execute(index_sql)
+
+    cursor.execute(f"SELECT MIN(timestamp) FROM {legacy}")
+    oldest = cursor.fetchone()[0]
+    today = datetime.date.today()
+    first = month_start(oldest.date() if oldest else today)
+    month, last = first, add_months(month_start(today), months_ahead)
+    while month <= last:
+        create_partition(cursor, table, month)
+        month = add_months(month, 1)
+
+    columns = ", ".join(spec["columns"])
+    cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}")
+    moved = cursor.rowcount
+
+    id_column = spec["id_column"]
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE((SELECT MAX({id_column}) FROM {table}), 0) + 1, false)",
+        (table, id_column),
+    )
+    cursor.execute(f"DROP TABLE {legacy}")
+    log.info(f"🔄 {table}: конвертовано у партиційовану таблицю ({moved} рядків).")
+    return True
+
+
+if __name__ == "__main__":
+    created, removed = maintain_partitions()
+    print(f"Partitions created: {created}; retired: {len(removed)}")
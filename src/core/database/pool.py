@@ -0,0 +1,270 @@
+# ATLAS_PASSPORT: docs/system/map/pool.md
+"""
+🔌 CONNECTION POOL (Process-wide psycopg2 Pool).
+Модуль: pool.py | Версія: 1.0.0
+Призначення: Обмежений потокобезпечний пул з'єднань psycopg2, спільний для всіх сесій Streamlit у межах процесу.
+
+Ключові можливості:
+- 🧮 Bounded Pool: Не більше max_size з'єднань на кожен db_mode (local/cloud), решта клієнтів чекає в черзі.
+- 🩺 Checkout Health Check: Легкий ping (SELECT 1) перед видачею простоюючого з'єднання.
+- 🎲 Jittered Backoff: Експоненційна затримка з "повним джитером" замість фіксованих 3 с між спробами.
+- 📊 Pool Stats: Лічильники in-use / idle / часу очікування для діагностики "штормів" підключень.
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import psycopg2
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+DEFAULT_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "8"))
+DEFAULT_CHECKOUT_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+CONNECT_RETRIES = 3
+
+
+class PoolTimeoutError(TimeoutError):
+    """Усі з'єднання пулу зайняті довше за checkout_timeout."""
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """
+    Експоненційна затримка з повним джитером (Full Jitter).
+
+    Args:
+        attempt: Номер спроби, починаючи з 0.
+        base: Базова затримка в секундах.
+        cap: Верхня межа затримки в секундах.
+
+    Returns:
+        Випадкова затримка в діапазоні [0, min(cap, base * 2**attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def connection_config(db_mode: str) -> Dict[str, Any]:
+    """Повертає параметри psycopg2.connect для обраного режиму (local/cloud)."""
+    if db_mode == "cloud":
+        return {
+            "dbname": os.getenv("CLOUD_DB_NAME"),
+            "user": os.getenv("CLOUD_DB_USER"),
+            "password": os.getenv("CLOUD_DB_PASSWORD"),
+            "host": os.getenv("CLOUD_DB_HOST"),
+            "port": os.getenv("CLOUD_DB_PORT", "5432"),
+            "sslmode": os.getenv("CLOUD_DB_SSL", "require")
+        }
+    return {
+        "dbname": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": os.getenv("DB_PORT", "5432"),
+        "sslmode": os.getenv("DB_SSL", "prefer")
+    }
+
+
+class ConnectionPool:
+    """
+    Обмежений потокобезпечний пул psycopg2-з'єднань.
+
+    З'єднання створюються ліниво (до max_size), повертаються у LIFO-стек простою
+    та перевіряються ping-запитом при кожній видачі.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT_S,
+        connect_fn: Callable[..., Any] = psycopg2.connect,
+        name: str = "local",
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.name = name
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self._config = config
+        self._connect_fn = connect_fn
+        self._idle: list = []
+        self._in_use = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "failed_health_checks": 0,
+            "timeouts": 0,
+            "total_wait_s": 0.0,
+            "max_wait_s": 0.0,
+        }
+
+    # --- Низькорівневі операції ---
+
+    def _connect(self):
+        """Створює нове з'єднання з джитерованими ретраями (холодний старт Neon)."""
+        for attempt in range(CONNECT_RETRIES):
+            try:
+                conn = self._connect_fn(**self._config)
+                with self._cond:
+                    self._stats["created"] += 1
+                return conn
+            except psycopg2.OperationalError as e:
+                if attempt < CONNECT_RETRIES - 1:
+                    delay = backoff_delay(attempt)
+                    log.warning(
+                        f"🔄 [{self.name}] Спроба підключення до БД {attempt + 1}/{CONNECT_RETRIES} "
+                        f"(база прокидається), чекаємо {delay:.2f}с..."
+                    )
+                    time.sleep(delay)
+                    continue
+                raise e
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        """Ping перед видачею: відкидає розірвані з'єднання (idle timeout, рестарт Neon)."""
+        if getattr(conn, "closed", 0):
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # --- Публічний API ---
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Видає з'єднання з пулу, за потреби чекаючи на звільнення слоту.
+
+        Raises:
+            PoolTimeoutError: Якщо слот не звільнився за timeout секунд.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"Connection pool '{self.name}' exhausted ({self.max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+            conn = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            waited = time.monotonic() - started
+            self._stats["checkouts"] += 1
+            self._stats["total_wait_s"] += waited
+            self._stats["max_wait_s"] = max(self._stats["max_wait_s"], waited)
+
+        # Мережеві операції виконуються поза блокуванням
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                with self._cond:
+                    self._stats["failed_health_checks"] += 1
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+            return conn
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Повертає з'єднання у пул (або закриває, якщо воно зламане чи discard=True)."""
+        if not discard and not getattr(conn, "closed", 0):
+            try:
+                # Незавершена транзакція не повинна "протекти" до наступного клієнта
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._stats["discarded"] += 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def closeall(self) -> None:
+        """Закриває всі простоюючі з'єднання; зайняті закриються при поверненні."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._close_quietly(self._idle.pop())
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Знімок стану пулу для діагностики."""
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "name": self.name,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "created": self._stats["created"],
+                "discarded": self._stats["discarded"],
+                "failed_health_checks": self._stats["failed_health_checks"],
+                "timeouts": self._stats["timeouts"],
+                "avg_wait_ms": round(self._stats["total_wait_s"] / checkouts * 1000, 2) if checkouts else 0.0,
+                "max_wait_ms": round(self._stats["max_wait_s"] * 1000, 2),
+            }
+
+
+# --- PROCESS-WIDE REGISTRY ---
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_mode: str = "local") -> ConnectionPool:
+    """Повертає (створюючи за потреби) спільний пул для режиму db_mode."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(db_mode)
+        if pool is None:
+            pool = ConnectionPool(connection_config(db_mode), name=db_mode)
+            _POOLS[db_mode] = pool
+            log.info(f"🧮 Створено пул з'єднань '{db_mode}' (max_size={pool.max_size})")
+        return pool
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Статистика всіх активних пулів, згрупована за db_mode."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return {p.name: p.stats() for p in pools}
+
+
+def close_all_pools() -> None:
+    """Закриває всі пули процесу (зміна режиму БД, завершення роботи)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for p in pools:
+        p.closeall()
@@ -0,0 +1,223 @@
+# ATLAS_PASSPORT: docs/system/map/profiler.md
+"""
+🩺 QUERY PROFILER (Per-fingerprint Instrumentation).
+Модуль: profiler.py | Версія: 1.0.0
+Призначення: Збір статистики виконання запитів run_query/execute_update за нормалізованим відбитком SQL для пошуку "гарячих" запитів під реальним навантаженням.
+
+Ключові можливості:
+- 🔏 Fingerprinting: Літерали, :параметри та списки IN (...) замінюються на "?", пробіли та коментарі прибираються.
+- ⏱️ Latency Percentiles: Кількість викликів, p50/p95/max за ковзною вибіркою останніх викликів.
+- 📦 Volume Metrics: Рядки та байти результату, влучання/промахи кешу, ретраї та помилки.
+- 🐢 Slow Plan Capture: EXPLAIN (ANALYZE, BUFFERS) для SELECT, повільніших за QUERY_PROFILE_EXPLAIN_MS.
+- 📄 JSON Dump: Знімок статистики для UI-панелі та файлу logs/query_profile.json.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+PROFILING_ENABLED = os.getenv("QUERY_PROFILING", "1") == "1"
+# 0 — захоплення планів вимкнено
+EXPLAIN_THRESHOLD_MS = float(os.getenv("QUERY_PROFILE_EXPLAIN_MS", "0"))
+EXPLAIN_COOLDOWN_S = float(os.getenv("QUERY_PROFILE_EXPLAIN_COOLDOWN_S", "600"))
+LATENCY_WINDOW = int(os.getenv("QUERY_PROFILE_WINDOW", "512"))
+DUMP_PATH = os.path.join("logs", "query_profile.json")
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"(?<![:\w]):[A-Za-z_]\w*|%\(\w+\)s|%s")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Нормалізований текст запиту: без коментарів, літералів і зайвих пробілів."""
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _STRING_RE.sub("?", text)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("IN (?)", text)
+    return _SPACE_RE.sub(" ", text).strip().rstrip(";").strip()
+
+
+def fingerprint(sql: str) -> str:
+    """Короткий стабільний ідентифікатор нормалізованого запиту."""
+    return hashlib.md5(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+@dataclass
+class QueryStats:
+    """Накопичена статистика одного відбитка."""
+    fingerprint: str
+    kind: str
+    sql: str
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    rows: int = 0
+    bytes: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    plan: Optional[Any] = None
+    plan_ms: Optional[float] = None
+    plan_captured_at: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        samples = np.fromiter(self.latencies, dtype=float) if self.latencies else np.zeros(1)
+        p50, p95 = np.percentile(samples, [50, 95])
+        return {
+            "fingerprint": self.fingerprint,
+            "kind": self.kind,
+            "calls": self.calls,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "max_ms": round(self.max_ms, 2),
+            "total_ms": round(self.total_ms, 2),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "retries": self.retries,
+            "errors": self.errors,
+            "sql": self.sql,
+            "plan": self.plan,
+            "plan_ms": self.plan_ms,
+        }
+
+
+class QueryProfiler:
+    """Потокобезпечний реєстр статистики запитів процесу."""
+
+    def __init__(
+        self,
+        enabled: bool = PROFILING_ENABLED,
+        explain_threshold_ms: float = EXPLAIN_THRESHOLD_MS,
+        explain_cooldown_s: float = EXPLAIN_COOLDOWN_S,
+    ):
+        self.enabled = enabled
+        self.explain_threshold_ms = explain_threshold_ms
+        self.explain_cooldown_s = explain_cooldown_s
+        self._lock = threading.Lock()
+        self._stats: Dict[str, QueryStats] = {}
+        self._started = time.time()
+
+    def _entry(self, sql: str, kind: str) -> QueryStats:
+        normalized = normalize_sql(sql)
+        fp = hashlib.md5(normalized.encode()).hexdigest()[:12]
+        entry = self._stats.get(fp)
+        if entry is None:
+            entry = QueryStats(fingerprint=fp, kind=kind, sql=normalized)
+            self._stats[fp] = entry
+        return entry
+
+    def record(
+        self,
+        sql: str,
+        elapsed_s: float,
+        kind: str = "select",
+        rows: int = 0,
+        nbytes: int = 0,
+        cache: Optional[str] = None,
+        retries: int = 0,
+        error: bool = False,
+    ) -> Optional[str]:
+        """
+        Фіксує один виклик.
+
+        Args:
+            sql: Текст запиту (нормалізується тут).
+            elapsed_s: Повний час виклику, включно з ретраями.
+            kind: "select" або "update".
+            rows: Кількість рядків результату / змінених рядків.
+            nbytes: Розмір результату в пам'яті.
+            cache: "hit", "miss" або None (кеш не застосовувався).
+            retries: Кількість повторних спроб.
+            error: Виклик завершився помилкою (офлайн-фолбек).
+
+        Returns:
+            Відбиток запиту (None, якщо профілювання вимкнено).
+        """
+        if not self.enabled:
+            return None
+        ms = elapsed_s * 1000.0
+        with self._lock:
+            entry = self._entry(sql, kind)
+            entry.calls += 1
+            entry.total_ms += ms
+            entry.max_ms = max(entry.max_ms, ms)
+            entry.latencies.append(ms)
+            entry.rows += int(rows)
+            entry.bytes += int(nbytes)
+            entry.retries += int(retries)
+            entry.errors += int(error)
+            if cache == "hit":
+                entry.cache_hits += 1
+            elif cache == "miss":
+                entry.cache_misses += 1
+            return entry.fingerprint
+
+    def should_explain(self, fp: Optional[str], elapsed_s: float) -> bool:
+        """Чи варто зняти план: поріг увімкнено, запит повільний і план не знімався нещодавно."""
+        if not fp or not self.enabled or self.explain_threshold_ms <= 0:
+            return False
+        if elapsed_s * 1000.0 < self.explain_threshold_ms:
+            return False
+        with self._lock:
+            entry = self._stats.get(fp)
+            return entry is not None and time.time() - entry.plan_captured_at >= self.explain_cooldown_s
+
+    def store_plan(self, fp: str, plan: Any, elapsed_s: float) -> None:
+        with self._lock:
+            entry = self._stats.get(fp)
+            if entry is not None:
+                entry.plan = plan
+                entry.plan_ms = round(elapsed_s * 1000.0, 2)
+                entry.plan_captured_at = time.time()
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Статистика, відсортована за сумарним часом (найгарячіші запити спершу)."""
+        with self._lock:
+            rows = [entry.as_dict() for entry in self._stats.values()]
+        rows.sort(key=lambda r: r["total_ms"], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def dump_json(self, path: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Серіалізує знімок у JSON (і записує у файл, якщо path задано).
+
+        Args:
+            path: Шлях до файлу (наприклад, DUMP_PATH).
+            extra: Додаткові секції (статистика пулу, кешу тощо).
+        """
+        payload = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "uptime_s": round(time.time() - self._started, 1),
+            "queries": self.snapshot(),
+            **(extra or {}),
+        }
+        text = json.dumps(payload, ensure_ascii=False, indent=2, default=str)
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._started = time.time()
@@ -0,0 +1,279 @@
+# ATLAS_PASSPORT: docs/system/map/result_cache.md
+"""
+🗃️ QUERY RESULT CACHE (Two-tier, Version-aware).
+Модуль: result_cache.py | Версія: 1.0.0
+Призначення: Кешування результатів run_query між сесіями та рестартами з інвалідацією за версією даних таблиць.
+
+Ключові можливості:
+- 🧠 Memory Tier: LRU у RAM процесу з обмеженням за сумарним розміром DataFrame.
+- 💾 Disk Tier: Parquet-файли data/fallback/query_<md5>.parquet з версією у метаданих схеми та LRU-витісненням за розміром.
+- 🔖 Data Versioning: Версія = ідентичність БД (режим, сервер, старт/скидання статистики) + лічильники записів pg_stat_user_tables + локальні лічильники execute_update.
+- 📴 Offline Fallback: Застарілий дисковий запис усе ще повертається, якщо БД недоступна.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+CACHE_DIR = os.path.join("data", "fallback")
+DEFAULT_MEMORY_MB = float(os.getenv("QUERY_CACHE_MEMORY_MB", "64"))
+DEFAULT_DISK_MB = float(os.getenv("QUERY_CACHE_DISK_MB", "512"))
+DEFAULT_VERSION_TTL_S = float(os.getenv("QUERY_CACHE_VERSION_TTL", "5"))
+
+_VERSION_META_KEY = b"atlas_data_version"
+DB_IDENTITY_KEY = "@db"  # Службовий ключ проби: рядок ідентичності БД замість лічильника
+_TABLE_RE = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_TIME_RELATIVE_RE = re.compile(r"\b(?:NOW\s*\(|CURRENT_TIMESTAMP|CURRENT_DATE|LOCALTIMESTAMP)", re.IGNORECASE)
+
+
+def query_key(query_text: str, params: Optional[dict] = None) -> str:
+    """Контентна адреса запиту (md5 від тексту та параметрів)."""
+    return hashlib.md5(f"{query_text}_{params}".encode()).hexdigest()
+
+
+def referenced_tables(query_text: str) -> Tuple[str, ...]:
+    """Витягує імена таблиць з FROM/JOIN/INTO/UPDATE (у нижньому регістрі, як у pg_catalog)."""
+    found = {m.lower() for m in _TABLE_RE.findall(query_text)}
+    return tuple(sorted(found))
+
+
+def is_time_relative(query_text: str) -> bool:
+    """Чи залежить результат від поточного часу (NOW(), CURRENT_DATE тощо)."""
+    return bool(_TIME_RELATIVE_RE.search(query_text))
+
+
+class DataVersionTracker:
+    """
+    Обчислює версію даних для набору таблиць.
+
+    probe_fn(tables) повертає {table: write_counter} з БД; результат кешується
+    на ttl_s секунд, щоб серія однакових запитів не смикала pg_catalog щоразу.
+
+    Лічильники pg_stat обнуляються після рестарту/краху сервера й не мають
+    сенсу для іншої БД, а дисковий рівень кешу переживає рестарти. Тому до
+    версії входять scope_fn() (режим підключення) та рядок ідентичності,
+    який проба повертає під ключем DB_IDENTITY_KEY (база, сервер, час старту
+    та скидання статистики) — інакше старий Parquet-запис міг би збігтися
+    з "перевикористаним" значенням лічильника.
+    """
+
+    def __init__(
+        self,
+        probe_fn: Callable[[Tuple[str, ...]], Dict[str, object]],
+        ttl_s: float = DEFAULT_VERSION_TTL_S,
+        scope_fn: Optional[Callable[[], str]] = None,
+    ):
+        self._probe_fn = probe_fn
+        self._ttl_s = ttl_s
+        self._scope_fn = scope_fn or (lambda: "")
+        self._lock = threading.Lock()
+        self._local_writes: Dict[str, int] = {}
+        self._probed: Dict[Tuple[str, Tuple[str, ...]], Tuple[float, Dict[str, object]]] = {}
+
+    def bump(self, tables: Iterable[str]) -> None:
+        """Фіксує локальний запис у таблиці (execute_update) та скидає кеш проб."""
+        with self._lock:
+            for t in tables:
+                self._local_writes[t] = self._local_writes.get(t, 0) + 1
+            self._probed.clear()
+
+    def invalidate(self) -> None:
+        """Примусово перечитати версії при наступному зверненні."""
+        with self._lock:
+            self._probed.clear()
+
+    def version(self, tables: Tuple[str, ...], time_bucket_s: Optional[int] = None) -> Optional[str]:
+        """
+        Повертає рядок-версію або None, якщо версію визначити не вдалося.
+
+        Args:
+            tables: Таблиці, від яких залежить запит.
+            time_bucket_s: Для запитів з NOW() — ширина часового "кошика" у секундах.
+        """
+        if not tables:
+            return None
+
+        scope = self._scope_fn()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._probed.get((scope, tables))
+        if cached and now - cached[0] < self._ttl_s:
+            counters = cached[1]
+        else:
+            try:
+                counters = self._probe_fn(tables)
+            except Exception as e:
+                log.debug(f"Data version probe failed: {e}")
+                return None
+            with self._lock:
+                self._probed[(scope, tables)] = (now, counters)
+
+        with self._lock:
+            parts = [f"db:{scope}@{counters.get(DB_IDENTITY_KEY, '')}"]
+            parts += [f"{t}:{counters.get(t, 0)}:{self._local_writes.get(t, 0)}" for t in tables]
+        if time_bucket_s:
+            parts.append(f"t:{int(time.time() // time_bucket_s)}")
+        return "|".join(parts)
+
+
+class ResultCache:
+    """Дворівневий (RAM LRU + Parquet) кеш результатів запитів."""
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        max_memory_mb: float = DEFAULT_MEMORY_MB,
+        max_disk_mb: float = DEFAULT_DISK_MB,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, pd.DataFrame, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+    # --- Шляхи ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"query_{key}.parquet")
+
+    # --- Memory tier ---
+
+    def _memory_put(self, key: str, version: str, df: pd.DataFrame) -> None:
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_memory_bytes:
+            return  # Занадто великий для RAM — лишається тільки на диску
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old:
+                self._memory_bytes -= old[2]
+            self._memory[key] = (version, df, nbytes)
+            self._memory_bytes += nbytes
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                _, (_, _, evicted) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted
+                self._stats["evictions"] += 1
+
+    # --- Disk tier ---
+
+    def _disk_version(self, path: str) -> Optional[str]:
+        try:
+            meta = pq.read_schema(path).metadata or {}
+        except Exception:
+            return None
+        raw = meta.get(_VERSION_META_KEY)
+        return raw.decode() if raw else None
+
+    def _disk_write(self, key: str, version: str, df: pd.DataFrame) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        meta = dict(table.schema.metadata or {})
+        meta[_VERSION_META_KEY] = version.encode()
+        pq.write_table(table.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, path)  # Атомарна заміна: читачі не бачать напівзаписаний файл
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """LRU-витіснення за mtime (mtime оновлюється при кожному влучанні)."""
+        try:
+            entries = [
+                e for e in os.scandir(self.cache_dir)
+                if e.is_file() and e.name.startswith("query_") and e.name.endswith(".parquet")
+            ]
+        except OSError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+        total = sum(s[1] for s in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._stats["disk_evictions"] += 1
+            except OSError:
+                pass
+
+    # --- Публічний API ---
+
+    def get(self, key: str, version: Optional[str]) -> Optional[pd.DataFrame]:
+        """Повертає копію результату, якщо він збережений саме для цієї версії даних."""
+        if version is None:
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] == version:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1].copy()
+
+        path = self._path(key)
+        if os.path.exists(path) and self._disk_version(path) == version:
+            try:
+                df = pd.read_parquet(path)
+                os.utime(path, None)
+            except Exception as e:
+                log.warning(f"⚠️ Пошкоджений файл кешу {path}: {e}")
+                return None
+            with self._lock:
+                self._stats["disk_hits"] += 1
+            self._memory_put(key, version, df)
+            return df.copy()
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, version: Optional[str], df: pd.DataFrame) -> None:
+        """Зберігає результат у обидва рівні (порожні результати не кешуються)."""
+        if df is None or df.empty:
+            return
+        version = version or ""
+        # Копія: викликач може модифікувати свій DataFrame inplace
+        self._memory_put(key, version, df.copy())
+        try:
+            self._disk_write(key, version, df)
+        except Exception as e:
+            log.warning(f"⚠️ Не вдалося записати кеш запиту: {e}")
+
+    def get_stale(self, key: str) -> Optional[pd.DataFrame]:
+        """Офлайн-режим: будь-яка збережена версія (спершу RAM, потім диск)."""
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry:
+            return entry[1].copy()
+        path = self._path(key)
+        if os.path.exists(path):
+            try:
+                return pd.read_parquet(path)
+            except Exception:
+                return None
+        return None
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                **self._stats,
+                "memory_entries": len(self._memory),
+                "memory_mb": round(self._memory_bytes / (1024 * 1024), 2),
+            }
@@ -0,0 +1,190 @@
+# ATLAS_PASSPORT: docs/system/map/rollup.md
+"""
+🧊 HOURLY ROLLUP ENGINE (Pre-aggregated Load Facts).
+Модуль: rollup.py | Версія: 1.0.0
+Призначення: Підтримка погодинної таблиці фактів LoadHourly (по підстанції), щоб аналітичні запити не агрегували сирі LoadMeasurements щоразу.
+
+Ключові можливості:
+- 📊 Hourly Facts: sum/avg/min/max навантаження, середні температура масла, H2, health та погода регіону за годину.
+- 🔖 Watermark Refresh: Інкрементальне оновлення лише годин, новіших за останній водяний знак (RollupWatermarks).
+- ♻️ Idempotent Upsert: Остання (неповна) година перераховується через ON CONFLICT DO UPDATE.
+- 🔒 Single Refresher: pg_try_advisory_xact_lock не дає двом процесам оновлювати rollup одночасно.
+"""
+import datetime
+from typing import Optional
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+ROLLUP_NAME = "load_hourly"
+_ADVISORY_LOCK_KEY = 7_420_001  # Довільний, але стабільний ключ для pg_advisory_xact_lock
+
+# DDL для наявних інсталяцій (нові отримують те саме з sql/01_create_schema.sql)
+ROLLUP_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS LoadHourly (
+        substation_id INT NOT NULL,
+        ts_hour TIMESTAMPTZ NOT NULL,
+        samples INT NOT NULL,
+        load_sum_mw DECIMAL(14, 2),
+        load_avg_mw DECIMAL(10, 2),
+        load_min_mw DECIMAL(10, 2),
+        load_max_mw DECIMAL(10, 2),
+        oil_temp_avg DECIMAL(10, 2),
+        h2_ppm_avg DECIMAL(10, 2),
+        health_avg DECIMAL(10, 2),
+        air_temp DECIMAL(5, 2),
+        PRIMARY KEY (substation_id, ts_hour),
+        FOREIGN KEY (substation_id) REFERENCES Substations(substation_id) ON DELETE CASCADE
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_load_hourly_ts ON LoadHourly (ts_hour);",
+    """
+    CREATE TABLE IF NOT EXISTS RollupWatermarks (
+        rollup_name VARCHAR(50) PRIMARY KEY,
+        last_hour TIMESTAMPTZ NOT NULL,
+        refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """,
+]
+
+# Агрегація сирих вимірювань за [since, ∞); погода агрегується окремо,
+# щоб кілька звітів за годину не множили рядки навантаження.
+_REFRESH_SQL = """
+    INSERT INTO LoadHourly (
+        substation_id, ts_hour, samples,
+        load_sum_mw, load_avg_mw, load_min_mw, load_max_mw,
+        oil_temp_avg, h2_ppm_avg, health_avg, air_temp
+    )
+    SELECT
+        s.substation_id, agg.ts_hour, agg.samples,
+        agg.load_sum, agg.load_avg, agg.load_min, agg.load_max,
+        agg.oil_avg, agg.h2_avg, agg.health_avg, w.air_temp
+    FROM Substations s
+    -- LATERAL по кожній підстанції: діапазонний скан індексу (substation_id, timestamp)
+    CROSS JOIN LATERAL (
+        SELECT
+            lm.ts_hour,
+            COUNT(*)                         AS samples,
+            SUM(lm.actual_load_mw)           AS load_sum,
+            AVG(lm.actual_load_mw)           AS load_avg,
+            MIN(lm.actual_load_mw)           AS load_min,
+            MAX(lm.actual_load_mw)           AS load_max,
+            AVG(lm.temperature_c)            AS oil_avg,
+            AVG(lm.h2_ppm)                   AS h2_avg,
+            AVG(lm.health_score)             AS health_avg
+        FROM LoadMeasurements lm
+        WHERE lm.substation_id = s.substation_id
+          AND lm.timestamp >= %(since)s
+        GROUP BY 1
+    ) agg
+    LEFT JOIN (
+        SELECT region_id, ts_hour, AVG(temperature) AS air_temp
+        FROM WeatherReports
+        WHERE timestamp >= %(since)s
+        GROUP BY 1, 2
+    ) w ON w.region_id = s.region_id AND w.ts_hour = agg.ts_hour
+    ON CONFLICT (substation_id, ts_hour) DO UPDATE SET
+        samples      = EXCLUDED.samples,
+        load_sum_mw  = EXCLUDED.load_sum_mw,
+        load_avg_mw  = EXCLUDED.load_avg_mw,
+        load_min_mw  = EXCLUDED.load_min_mw,
+        load_max_mw  = EXCLUDED.load_max_mw,
+        oil_temp_avg = EXCLUDED.oil_temp_avg,
+        h2_ppm_avg   = EXCLUDED.h2_ppm_avg,
+        health_avg   = EXCLUDED.health_avg,
+        air_temp     = EXCLUDED.air_temp
+"""
+
+_MIN_TS = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def ensure_rollup_schema(cursor) -> None:
+    """Створює LoadHourly та RollupWatermarks, якщо їх ще немає."""
+    for ddl in ROLLUP_DDL:
+        cursor.execute(ddl)
+
+
+def get_watermark(cursor, rollup_name: str = ROLLUP_NAME) -> Optional[datetime.datetime]:
+    """Остання повністю або частково агрегована година (None — rollup ще не будувався)."""
+    cursor.execute("SELECT last_hour FROM RollupWatermarks WHERE rollup_name = %s", (rollup_name,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def set_watermark(cursor, last_hour: datetime.datetime, rollup_name: str = ROLLUP_NAME) -> None:
+    """Фіксує водяний знак (у транзакції курсора)."""
+    cursor.execute(
+        """
+        INSERT INTO RollupWatermarks (rollup_name, last_hour, refreshed_at)
+        VALUES (%s, %s, NOW())
+        ON CONFLICT (rollup_name) DO UPDATE
+        SET last_hour = EXCLUDED.last_hour, refreshed_at = EXCLUDED.refreshed_at
+        """,
+        (rollup_name, last_hour),
+    )
+
+
+def bump_rollup_version() -> None:
+    """Скидає версію LoadHourly у кеші результатів процесу (лише після commit оновлення)."""
+    from src.core.database import DATA_VERSIONS
+    DATA_VERSIONS.bump(("loadhourly",))
+
+
+def refresh_hourly_rollup(cursor=None, full: bool = False) -> int:
+    """
+    Інкрементально оновлює LoadHourly.
+
+    Перераховуються лише години, починаючи з водяного знака включно (остання
+    година могла бути неповною). Вимірювання, що надійшли заднім числом для
+    старіших годин, підхоплює лише full=True.
+
+    Args:
+        cursor: Курсор psycopg2 у відкритій транзакції (None — власне з'єднання з пулу).
+        full: Перебудувати rollup з нуля.
+
+    Returns:
+        Кількість вставлених/оновлених годинних рядків (-1, якщо оновлення вже виконує інший процес).
+
+    З власним курсором викликач після commit сам викликає bump_rollup_version(),
+    інакше читач цього процесу може закешувати ще не закомічені години під новою версією.
+    """
+    if cursor is None:
+        from src.core.database import get_db_cursor
+        with get_db_cursor() as (_, own_cursor):
+            upserted = refresh_hourly_rollup(own_cursor, full=full)
+        if upserted >= 0:
+            bump_rollup_version()
+        return upserted
+
+    cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (_ADVISORY_LOCK_KEY,))
+    if not cursor.fetchone()[0]:
+        log.info("🧊 Rollup вже оновлюється іншим процесом — пропускаємо.")
+        return -1
+
+    if full:
+        cursor.execute("TRUNCATE TABLE LoadHourly")
+        since = _MIN_TS
+    else:
+        since = get_watermark(cursor) or _MIN_TS
+
+    cursor.execute(_REFRESH_SQL, {"since": since})
+    upserted = cursor.rowcount
+
+    cursor.execute("SELECT MAX(ts_hour) FROM LoadHourly")
+    last_hour = cursor.fetchone()[0]
+    if last_hour is not None:
+        set_watermark(cursor, last_hour)
+
+    log.info(f"🧊 LoadHourly: оновлено {upserted} год. рядків (since={since}, watermark={last_hour}).")
+    return upserted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Оновлення погодинного rollup LoadHourly")
+    parser.add_argument("--full", action="store_true", help="Перебудувати rollup з нуля")
+    args = parser.parse_args()
+    refresh_hourly_rollup(full=args.full)
@@ -0,0 +1,201 @@
+# ATLAS_PASSPORT: docs/system/map/shared_store.md
+"""
+🫙 SHARED DATA STORE (Cross-session Immutable Snapshots).
+Модуль: shared_store.py | Версія: 1.0.0
+Призначення: Один екземпляр кадрів дашборду на процес, який усі сесії Streamlit читають без копіювання (на відміну від st.cache_data, що серіалізує результат для кожного виклику).
+
+Ключові можливості:
+- 🧊 Immutable Frames: Масиви колонок позначаються read-only; сесії отримують поверхневі view (нові колонки — локально, запис у спільні дані — ValueError).
+- 🔢 Versioned Snapshots: Кожне оновлення публікує новий знімок; старі живуть, доки на них є оренди.
+- 🎟️ Ref-counted Leases: Сесія тримає оренду знімка в session_state; після завершення сесії вона звільняється через weakref.finalize.
+- 🔒 Single Refresher: Оновлює лише один потік; решта в цей час отримують поточний знімок (stale-while-revalidate).
+"""
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Позначає масиви всіх блоків DataFrame як read-only (на місці) та повертає його."""
+    for block in df._mgr.blocks:
+        values = getattr(block.values, "_ndarray", block.values)  # Categorical/DatetimeArray → numpy
+        if isinstance(values, np.ndarray):
+            values.setflags(write=False)
+    return df
+
+
+class DataSnapshot:
+    """Незмінний версіонований набір кадрів."""
+
+    __slots__ = ("version", "frames", "created_at", "nbytes", "__weakref__")
+
+    def __init__(self, version: int, frames: Dict[str, Any]):
+        self.version = version
+        self.frames = {k: freeze_frame(v) if isinstance(v, pd.DataFrame) else v for k, v in frames.items()}
+        self.created_at = time.time()
+        self.nbytes = int(sum(
+            v.memory_usage(index=True, deep=False).sum()
+            for v in self.frames.values() if isinstance(v, pd.DataFrame)
+        ))
+
+    def view(self) -> Dict[str, Any]:
+        """Словник поверхневих копій: спільні масиви, власні об'єкти DataFrame."""
+        return {k: v.copy(deep=False) if isinstance(v, pd.DataFrame) else v for k, v in self.frames.items()}
+
+
+class SnapshotLease:
+    """Оренда знімка однією сесією; звільняється явно або при збиранні сміття."""
+
+    def __init__(self, store: "SharedDataStore", snapshot: DataSnapshot):
+        self.snapshot = snapshot
+        self._finalizer = weakref.finalize(self, store._release, snapshot.version)
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+
+    def release(self) -> None:
+        self._finalizer()
+
+
+class SharedDataStore:
+    """
+    Процесне сховище знімків з одним оновлювачем.
+
+    Args:
+        name: Ім'я для логів і статистики (наприклад, db_mode).
+        loader: Функція, що повертає свіжий словник кадрів.
+        max_age_s: Вік знімка, після якого наступне звернення ініціює оновлення.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Dict[str, Any]], max_age_s: float):
+        self.name = name
+        self._loader = loader
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._current: Optional[DataSnapshot] = None
+        self._snapshots: Dict[int, DataSnapshot] = {}
+        self._leases: Dict[int, int] = {}
+        self._version = 0
+        self._refreshed_at = 0.0
+
+    @property
+    def current(self) -> Optional[DataSnapshot]:
+        return self._current
+
+    # --- Публікація ---
+
+    def publish(self, frames: Dict[str, Any]) -> DataSnapshot:
+        """Робить frames поточним знімком; попередній лишається, доки його орендують."""
+        with self._lock:
+            self._version += 1
+            snapshot = DataSnapshot(self._version, frames)
+            previous = self._current
+            self._current = snapshot
+            self._snapshots[snapshot.version] = snapshot
+            self._refreshed_at = time.monotonic()
+            if previous is not None and not self._leases.get(previous.version):
+                self._snapshots.pop(previous.version, None)
+        log.debug(f"🫙 [{self.name}] Опубліковано знімок v{snapshot.version} ({snapshot.nbytes / 1048576:.1f} MB)")
+        return snapshot
+
+    def _is_stale(self) -> bool:
+        return self._current is None or time.monotonic() - self._refreshed_at >= self.max_age_s
+
+    def refresh(self, wait: bool = True) -> Optional[DataSnapshot]:
+        """
+        Оновлює знімок, якщо він застарів.
+
+        Args:
+            wait: Чекати на інший потік, що вже оновлює (інакше повернути поточний знімок).
+        """
+        if not self._refresh_lock.acquire(blocking=wait):
+            return self._current
+        try:
+            if not self._is_stale():
+                return self._current  # Інший потік щойно оновив
+            return self.publish(self._loader())
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self) -> None:
+        """Наступне звернення оновить знімок незалежно від його віку."""
+        with self._lock:
+            self._refreshed_at = float("-inf")
+
+    # --- Оренда ---
+
+    def acquire(self) -> SnapshotLease:
+        """Повертає оренду актуального знімка (оновлюючи його за потреби)."""
+        if self._is_stale():
+            try:
+                # Перше завантаження — чекаємо; далі — не блокуємо читачів під час оновлення
+                self.refresh(wait=self._current is None)
+            except Exception as e:
+                from src.utils.helpers import StopException, RerunException
+                if isinstance(e, (StopException, RerunException)) or self._current is None:
+                    raise
+                log.warning(f"⚠️ [{self.name}] Оновлення знімка не вдалося, лишаємо v{self._current.version}: {e}")
+        with self._lock:
+            snapshot = self._current
+            self._leases[snapshot.version] = self._leases.get(snapshot.version, 0) + 1
+        return SnapshotLease(self, snapshot)
+
+    def _release(self, version: int) -> None:
+        with self._lock:
+            count = self._leases.get(version, 0) - 1
+            if count > 0:
+                self._leases[version] = count
+                return
+            self._leases.pop(version, None)
+            if self._current is None or version != self._current.version:
+                self._snapshots.pop(version, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Стан сховища для діагностики."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "version": self._current.version if self._current else None,
+                "age_s": round(time.monotonic() - self._refreshed_at, 1) if self._current else None,
+                "live_snapshots": len(self._snapshots),
+                "leases": dict(self._leases),
+                "mb": round(sum(s.nbytes for s in self._snapshots.values()) / 1048576, 2),
+            }
+
+
+_STORES: Dict[str, SharedDataStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_shared_store(name: str, loader: Callable[[], Dict[str, Any]], max_age_s: float) -> SharedDataStore:
+    """Спільне для процесу сховище з ім'ям name (створюється при першому зверненні)."""
+    with _STORES_LOCK:
+        store = _STORES.get(name)
+        if store is None:
+            store = SharedDataStore(name, loader, max_age_s)
+            _STORES[name] = store
+        return store
+
+
+def invalidate_shared_stores() -> None:
+    """Позначає всі сховища застарілими (зміни даних з UI, перегенерація БД)."""
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    for store in stores:
+        store.invalidate()
+
+
+def shared_store_stats() -> Dict[str, Dict[str, Any]]:
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    return {s.name: s.stats() for s in stores}
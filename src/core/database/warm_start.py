@@ -0,0 +1,193 @@
+# ATLAS_PASSPORT: docs/system/map/warm_start.md
+"""
+🔥 WARM START SNAPSHOT (On-disk Dashboard Dataset).
+Модуль: warm_start.py | Версія: 1.0.0
+Призначення: Збереження набору даних дашборду на диск, щоб після рестарту контейнера перший користувач не платив повну вартість бут-запитів.
+
+Ключові можливості:
+- 🗜️ Columnar Files: Кожен набір (load/gen/fin/alerts/lines) — окремий Parquet (zstd) зі збереженням dtypes, включно з Category.
+- 📜 Manifest: JSON з версією, часом збереження, кількістю рядків та max(timestamp) кожного набору — водяні знаки для дельти.
+- ⚛️ Atomic Versions: Файли нової версії пишуться поруч, маніфест замінюється атомарно, старі файли прибираються після.
+- ⏲️ Throttled Saves: Не частіше за WARM_SNAPSHOT_INTERVAL_S, у фоновому потоці, одночасно лише один запис.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+SNAPSHOT_DIR = os.getenv("DASHBOARD_SNAPSHOT_DIR", os.path.join("data", "snapshots"))
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_DATASETS = ("load", "gen", "fin", "alerts", "lines")
+WARM_SNAPSHOT_INTERVAL_S = float(os.getenv("WARM_SNAPSHOT_INTERVAL_S", "300"))
+# Старіший знімок не використовується: дельта від нього все одно перейде у повне перечитування
+WARM_SNAPSHOT_MAX_AGE_S = float(os.getenv("WARM_SNAPSHOT_MAX_AGE_H", "72")) * 3600
+_MANIFEST = "manifest.json"
+
+_SAVE_LOCK = threading.Lock()
+_LAST_SAVE: Dict[str, float] = {}
+
+
+def _mode_dir(db_mode: str, root: str) -> str:
+    return os.path.join(root, db_mode)
+
+
+def _read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, _MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == SNAPSHOT_FORMAT else None
+
+
+def save_snapshot(frames: Dict[str, Any], db_mode: str, root: str = SNAPSHOT_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Записує набори даних дашборду як нову версію знімка.
+
+    Args:
+        frames: Словник кадрів (зберігаються лише SNAPSHOT_DATASETS).
+        db_mode: Режим БД (окремий знімок для cloud/local).
+        root: Коренева тека знімків.
+
+    Returns:
+        Маніфест записаної версії (None, якщо зберігати нічого).
+    """
+    datasets = {
+        key: frames[key] for key in SNAPSHOT_DATASETS
+        if isinstance(frames.get(key), pd.DataFrame) and not frames[key].empty
+    }
+    if not datasets:
+        return None
+
+    directory = _mode_dir(db_mode, root)
+    os.makedirs(directory, exist_ok=True)
+    previous = _read_manifest(directory)
+    version = (previous or {}).get("version", 0) + 1
+
+    entries = {}
+    for key, df in datasets.items():
+        name = f"{key}.v{version}.parquet"
+        tmp = os.path.join(directory, f"{name}.{os.getpid()}.tmp")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="zstd")
+        os.replace(tmp, os.path.join(directory, name))
+        max_ts = df["timestamp"].max() if "timestamp" in df.columns else None
+        entries[key] = {
+            "file": name,
+            "rows": len(df),
+            "max_ts": None if max_ts is None or pd.isna(max_ts) else pd.Timestamp(max_ts).isoformat(),
+        }
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "db_mode": db_mode,
+        "saved_at": time.time(),
+        "datasets": entries,
+    }
+    tmp = os.path.join(directory, f"{_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(directory, _MANIFEST))
+
+    # Файли попередніх версій більше не адресуються маніфестом
+    current = {entry["file"] for entry in entries.values()}
+    for path in glob.glob(os.path.join(directory, "*.parquet")):
+        if os.path.basename(path) not in current:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    log.info(f"🔥 Знімок дашборду v{version} ({db_mode}) збережено: {', '.join(entries)}")
+    return manifest
+
+
+def load_snapshot(
+    db_mode: str,
+    root: str = SNAPSHOT_DIR,
+    max_age_s: float = WARM_SNAPSHOT_MAX_AGE_S,
+) -> Optional[Tuple[Dict[str, pd.DataFrame], Dict[str, Optional[pd.Timestamp]], Dict[str, Any]]]:
+    """
+    Читає останню версію знімка.
+
+    Returns:
+        (кадри, водяні знаки max(timestamp), маніфест) або None, якщо знімка немає,
+        він застарий чи пошкоджений.
+    """
+    directory = _mode_dir(db_mode, root)
+    manifest = _read_manifest(directory)
+    if manifest is None:
+        return None
+    if time.time() - manifest.get("saved_at", 0) > max_age_s:
+        log.info(f"🔥 Знімок дашборду ({db_mode}) застарий — холодний старт.")
+        return None
+
+    frames, watermarks = {}, {}
+    try:
+        for key, entry in manifest["datasets"].items():
+            frames[key] = pq.read_table(os.path.join(directory, entry["file"])).to_pandas()
+            watermarks[key] = pd.Timestamp(entry["max_ts"]) if entry.get("max_ts") else None
+    except Exception as e:
+        log.warning(f"⚠️ Пошкоджений знімок дашборду ({db_mode}): {e}")
+        return None
+    return frames, watermarks, manifest
+
+
+def maybe_save_snapshot(frames: Dict[str, Any], db_mode: str, root: str = SNAPSHOT_DIR) -> bool:
+    """
+    Зберігає знімок у фоновому потоці, якщо з попереднього збереження минуло
+    WARM_SNAPSHOT_INTERVAL_S і інший запис зараз не виконується.
+
+    Returns:
+        True, якщо запис заплановано.
+    """
+    now = time.monotonic()
+    if not _SAVE_LOCK.acquire(blocking=False):
+        return False
+    previous = _LAST_SAVE.get(db_mode)
+    if now - (float("-inf") if previous is None else previous) < WARM_SNAPSHOT_INTERVAL_S:
+        _SAVE_LOCK.release()
+        return False
+    _LAST_SAVE[db_mode] = now
+
+    def _write():
+        try:
+            save_snapshot(frames, db_mode, root)
+        except Exception as e:
+            log.warning(f"⚠️ Не вдалося зберегти знімок дашборду: {e}")
+        finally:
+            _SAVE_LOCK.release()
+
+    from src.core.database.executor import get_executor
+    try:
+        get_executor().submit(_write)
+    except Exception as e:
+        # Запис не заплановано (наприклад, пул уже зупинено) — інакше lock лишився б зайнятим назавжди
+        if previous is None:
+            _LAST_SAVE.pop(db_mode, None)
+        else:
+            _LAST_SAVE[db_mode] = previous
+        _SAVE_LOCK.release()
+        log.warning(f"⚠️ Не вдалося запланувати збереження знімка дашборду: {e}")
+        return False
+    return True
+
+
+def clear_snapshots(root: str = SNAPSHOT_DIR) -> None:
+    """Видаляє маніфести всіх режимів (після перегенерації БД знімки недійсні)."""
+    for path in glob.glob(os.path.join(root, "*", _MANIFEST)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    _LAST_SAVE.clear()
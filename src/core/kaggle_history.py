@@ -0,0 +1,162 @@
+# ATLAS_PASSPORT: docs/system/map/core_kaggle_history.md
+"""
+🧠 KAGGLE HISTORY STORE (Memory-mapped Full History).
+Модуль: kaggle_history.py | Версія: 1.0.0
+Призначення: Повна історія еталонних Kaggle-даних без обрізки та без резидентної пам'яті: масиви на диску відкриваються через mmap і читаються лише у зрізаних вікнах.
+
+Ключові можливості:
+- 🧮 Contiguous Arrays: На регіон — float32-масив навантаження та int64-індекс епохальних годин (.npy), відсортовані за часом.
+- 🗺️ Memory Mapping: np.load(mmap_mode="r") — ОС підвантажує лише сторінки, яких торкається зріз.
+- 🔎 Binary Search: Вікно [start, end] знаходиться np.searchsorted за O(log n) без сканування.
+- 🔄 Source Tracking: Масиви перебудовуються з Parquet-кешу, коли змінюється вихідний CSV (mtime/size).
+"""
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.core import kaggle_loader as kl
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
+
+_HOUR_S = 3600
+_OPEN: Dict[str, Tuple[dict, np.ndarray, np.ndarray]] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def _store_dir(cache_dir: Optional[str]) -> str:
+    return os.path.join(cache_dir or kl.PARQUET_CACHE_DIR, "mmap")
+
+
+def _paths(csv_path: str, cache_dir: Optional[str]) -> Tuple[str, str, str]:
+    base = os.path.join(_store_dir(cache_dir), kl._prefix(csv_path))
+    return f"{base}.hours.npy", f"{base}.load.npy", f"{base}.json"
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp, path)
+
+
+def build_region_arrays(csv_path: str, cache_dir: Optional[str] = None, force: bool = False) -> bool:
+    """
+    Будує .npy-масиви регіону з Parquet-кешу, якщо їх немає або джерело змінилося.
+
+    Returns:
+        False, якщо CSV не містить потрібних колонок.
+    """
+    hours_path, load_path, meta_path = _paths(csv_path, cache_dir)
+    signature = kl._source_signature(csv_path)
+    if not force and os.path.exists(meta_path):
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                if json.load(f) == signature:
+                    return True
+        except (OSError, ValueError):
+            pass
+
+    parquet = kl.build_parquet_cache(csv_path, cache_dir)
+    if parquet is None:
+        return False
+    table = pq.read_table(parquet, columns=["timestamp", "actual_load_mw"])
+    seconds = table.column("timestamp").to_numpy().astype("datetime64[s]").astype(np.int64)
+    load = table.column("actual_load_mw").to_numpy().astype(np.float32, copy=False)
+
+    os.makedirs(_store_dir(cache_dir), exist_ok=True)
+    _save_npy(hours_path, seconds // _HOUR_S)
+    _save_npy(load_path, load)
+    # Маніфест останнім: його наявність означає, що обидва масиви вже на місці
+    tmp = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(signature, f)
+    os.replace(tmp, meta_path)
+    log.info(f"🧠 Kaggle mmap-масиви оновлено: {kl._prefix(csv_path)} ({len(load)} год)")
+    return True
+
+
+def open_region(csv_path: str, cache_dir: Optional[str] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Відкриває масиви регіону через mmap (кешується на процес до зміни джерела).
+
+    Returns:
+        (epoch-години int64, навантаження float32) або None.
+    """
+    key = os.path.abspath(_paths(csv_path, cache_dir)[0])
+    signature = kl._source_signature(csv_path)
+    with _OPEN_LOCK:
+        entry = _OPEN.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1], entry[2]
+        if not build_region_arrays(csv_path, cache_dir):
+            return None
+        hours_path, load_path, _ = _paths(csv_path, cache_dir)
+        hours = np.load(hours_path, mmap_mode="r")
+        load = np.load(load_path, mmap_mode="r")
+        _OPEN[key] = (signature, hours, load)
+        return hours, load
+
+
+def _hour_bounds(start, end) -> Tuple[Optional[int], Optional[int]]:
+    """Межі [start, end] у епохальних годинах: мітка h входить, якщо start <= h <= end."""
+    lo = hi = None
+    if start is not None:
+        lo = -(-int(kl._naive(start).value // 10**9) // _HOUR_S)  # ceil
+    if end is not None:
+        hi = int(kl._naive(end).value // 10**9) // _HOUR_S  # floor
+    return lo, hi
+
+
+def slice_region(
+    csv_path: str,
+    start=None,
+    end=None,
+    tail_rows: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Вікно історії регіону бінарним пошуком по індексу годин.
+
+    Returns:
+        DataFrame(timestamp datetime64[ms], actual_load_mw float32) — власна копія
+        лише зрізаних рядків, або None, якщо регіон недоступний.
+    """
+    arrays = open_region(csv_path, cache_dir)
+    if arrays is None:
+        return None
+    hours, load = arrays
+    lo_h, hi_h = _hour_bounds(start, end)
+    lo = 0 if lo_h is None else int(np.searchsorted(hours, lo_h, side="left"))
+    hi = len(hours) if hi_h is None else int(np.searchsorted(hours, hi_h, side="right"))
+    if tail_rows:
+        lo = max(lo, hi - tail_rows)
+    window = slice(lo, max(lo, hi))
+    return pd.DataFrame({
+        # Та сама одиниця, що й у Parquet-кешу: кадри обох шляхів ідентичні
+        "timestamp": (np.asarray(hours[window]) * (_HOUR_S * 1000)).astype("datetime64[ms]"),
+        "actual_load_mw": np.array(load[window], dtype=np.float32),
+    })
+
+
+def region_time_bounds(csv_path: str, cache_dir: Optional[str] = None) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """Перша та остання мітки регіону (читаються два елементи індексу)."""
+    arrays = open_region(csv_path, cache_dir)
+    if arrays is None or not len(arrays[0]):
+        return None, None
+    hours = arrays[0]
+    return (
+        pd.Timestamp(int(hours[0]) * _HOUR_S, unit="s"),
+        pd.Timestamp(int(hours[-1]) * _HOUR_S, unit="s"),
+    )
+
+
+def close_all() -> None:
+    """Закриває всі відкриті mmap (перед перебудовою архіву)."""
+    with _OPEN_LOCK:
+        _OPEN.clear()
@@ -7,12 +7,28 @@
 Ключові можливості:
 - 📂 Automated ETL: Динамічне сканування та уніфікація CSV-файлів за масками.
 - 🗺️ Pretty-Name Mapping: Денормалізація технічних кодів (AEP, PJM) у зрозумілі гео-ідентифікатори.
-- ⚡ Radical Optimization: Стратегія "Memory Diet" через превентивну обрізку часових рядів.
+- ⚡ Radical Optimization: Стратегія "Memory Diet": типізовані колонки та Category-назви підстанцій.
+- 🗜️ Parquet Cache: CSV розбирається один раз; далі — стиснений Parquet з інвалідацією за mtime/size та читанням лише потрібних колонок і діапазону часу.
+- 🧵 Parallel Ingest: Застарілі CSV розбираються у пулі процесів, результати зливаються з Category-кодами регіонів.
+- 🎯 Predicate Pushdown: load_kaggle_data(regions, start, end, columns) читає лише файли регіонів і row group, що перетинають діапазон.
+- 🧠 Full-history Mode: Вікна timestamp/actual_load_mw зрізаються з memory-mapped масивів (kaggle_history) бінарним пошуком.
 - 🛡️ Data Integrity: Верифікація типів та інтелектуальна чистка аномалій при завантаженні.
 """
 import glob
+import json
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.core.logger import setup_logger
+
+log = setup_logger(__name__)
 
 KAGGLE_MAPPING = {
     "AEP": "Американська електрична компанія (AEP)",
@@ -27,80 +43,351 @@ KAGGLE_MAPPING = {
     "PJME": "Східний регіон PJM (США)",
 }
 
+DATA_DIR = "data"
+PARQUET_CACHE_DIR = os.path.join(DATA_DIR, "kaggle_cache")
+KAGGLE_COLUMNS = ["timestamp", "actual_load_mw", "substation_name", "region_name"]
+# Версія формату кешу: зміна логіки стандартизації інвалідовує всі файли
+_CACHE_FORMAT = 1
+_SOURCE_META_KEY = b"atlas_kaggle_source"
+# Процеси для розбору CSV (0 — кількість CPU)
+KAGGLE_INGEST_WORKERS = int(os.getenv("KAGGLE_INGEST_WORKERS", "0"))
+# Memory-mapped масиви повної історії замість читання Parquet (0 — вимкнути)
+KAGGLE_HISTORY_MMAP = os.getenv("KAGGLE_HISTORY_MMAP", "1") != "0"
+# ~1 рік погодинних даних на row group: фільтр за часом відкидає зайві групи за статистикою
+_ROW_GROUP_SIZE = 8760
+
+
+def _prefix(csv_path: str) -> str:
+    return os.path.basename(csv_path).replace("_hourly.csv", "")
+
+
+def _source_signature(csv_path: str) -> dict:
+    stat = os.stat(csv_path)
+    return {"format": _CACHE_FORMAT, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _cache_path(csv_path: str, cache_dir: Optional[str]) -> str:
+    return os.path.join(cache_dir or PARQUET_CACHE_DIR, f"{_prefix(csv_path)}.parquet")
 
-def load_kaggle_data():
+
+def _standardize_csv(csv_path: str) -> Optional[pd.DataFrame]:
     """
-    Зчитує та денормалізує дані з еталонної Kaggle директорії за масками файлів *_hourly.csv.
+    Розбирає Kaggle CSV у типізований кадр (timestamp, actual_load_mw), відсортований за часом.
 
-    :return:pd.DataFrame Об'єднаний DataFrame з колонками: timestamp, actual_load_mw, substation_name, region_name.
+    Returns:
+        None, якщо у файлі немає колонки часу або навантаження.
     """
-    data_dir = "data"
-    csv_files = glob.glob(os.path.join(data_dir, "*_hourly.csv"))
+    prefix = _prefix(csv_path)
+    df = pd.read_csv(csv_path)
+    if df.empty:
+        return None
+
+    # Стандартизація колонки часу (timestamp)
+    dt_cols = [c for c in df.columns if c.lower() in ["datetime", "timestamp"]]
+    if not dt_cols:
+        return None
+    df = df.rename(columns={dt_cols[0]: "timestamp"})
+    # Kaggle-файли мають ISO-формат — явний формат у рази швидший за вгадування по рядках
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+
+    # Стандартизація колонки навантаження (actual_load_mw)
+    load_cols = [
+        c
+        for c in df.columns
+        if "_mw" in c.lower()
+        or "load" in c.lower()
+        or c.upper() == f"{prefix.upper()}_MW"
+    ]
+    if not load_cols:
+        return None
+    df = df.rename(columns={load_cols[0]: "actual_load_mw"})
+    df["actual_load_mw"] = pd.to_numeric(df["actual_load_mw"], errors="coerce").astype("float32")
+
+    df = df[["timestamp", "actual_load_mw"]].dropna()
+    df["timestamp"] = df["timestamp"].astype("datetime64[s]")
+    return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def cache_is_fresh(csv_path: str, cache_dir: Optional[str] = None) -> bool:
+    """Чи відповідає Parquet-кеш поточним mtime/size джерела та версії формату."""
+    path = _cache_path(csv_path, cache_dir)
+    if not os.path.exists(path):
+        return False
+    try:
+        meta = pq.read_schema(path).metadata or {}
+        return json.loads(meta.get(_SOURCE_META_KEY, b"{}")) == _source_signature(csv_path)
+    except Exception:
+        return False  # Пошкоджений кеш — перебудовуємо
 
-    all_dfs = []
 
-    for file_path in csv_files:
+def build_parquet_cache(csv_path: str, cache_dir: Optional[str] = None, force: bool = False) -> Optional[str]:
+    """
+    Конвертує CSV у стиснений Parquet-кеш, якщо кеш відсутній або джерело змінилося (mtime/size).
+
+    Returns:
+        Шлях до Parquet-файлу або None, якщо CSV не містить потрібних колонок.
+    """
+    path = _cache_path(csv_path, cache_dir)
+    if not force and cache_is_fresh(csv_path, cache_dir):
+        return path
+    signature = _source_signature(csv_path)
+
+    df = _standardize_csv(csv_path)
+    if df is None:
+        return None
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[_SOURCE_META_KEY] = json.dumps(signature).encode()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(
+        table.replace_schema_metadata(meta), tmp,
+        compression="zstd", row_group_size=_ROW_GROUP_SIZE,
+    )
+    os.replace(tmp, path)  # Атомарна заміна: паралельні читачі не бачать напівзаписаний файл
+    log.info(f"🗜️ Kaggle Parquet-кеш оновлено: {os.path.basename(path)} ({len(df)} рядків)")
+    return path
+
+
+def read_kaggle_file(
+    csv_path: str,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+    columns: Sequence[str] = ("timestamp", "actual_load_mw"),
+    cache_dir: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Читає один Kaggle-файл через Parquet-кеш: лише потрібні колонки та діапазон [start, end].
+
+    Returns:
+        Кадр, відсортований за timestamp, або None, якщо файл не вдалося стандартизувати.
+    """
+    path = build_parquet_cache(csv_path, cache_dir)
+    if path is None:
+        return None
+
+    filters = []
+    if start is not None:
+        filters.append(("timestamp", ">=", pd.Timestamp(start).to_pydatetime()))
+    if end is not None:
+        filters.append(("timestamp", "<=", pd.Timestamp(end).to_pydatetime()))
+    table = pq.read_table(path, columns=list(columns), filters=filters or None)
+    return table.to_pandas()
+
+
+def ingest_kaggle_files(
+    csv_paths: Sequence[str],
+    cache_dir: Optional[str] = None,
+    parallel: bool = True,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Optional[str]]:
+    """
+    Гарантує свіжий Parquet-кеш для списку CSV.
+
+    Застарілі файли розбираються паралельно у пулі процесів (spawn: безпечно
+    поруч із потоками Streamlit, розбір CSV не конкурує з UI за GIL).
+
+    Args:
+        csv_paths: Файли архіву.
+        cache_dir: Тека кешу (None — PARQUET_CACHE_DIR).
+        parallel: Дозволити пул процесів (інакше — послідовно в поточному процесі).
+        workers: Кількість процесів (None — KAGGLE_INGEST_WORKERS або кількість CPU).
+        force: Перебудувати кеш незалежно від mtime/size.
+
+    Returns:
+        {шлях CSV: шлях Parquet або None, якщо файл не вдалося стандартизувати}.
+    """
+    cache_dir = cache_dir or PARQUET_CACHE_DIR  # Явно: дочірні процеси не бачать змін модуля
+    stale = [p for p in csv_paths if force or not cache_is_fresh(p, cache_dir)]
+    result = {p: _cache_path(p, cache_dir) for p in csv_paths if p not in stale}
+    if not stale:
+        return result
+
+    workers = min(len(stale), workers or KAGGLE_INGEST_WORKERS or os.cpu_count() or 1)
+    if parallel and workers > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {pool.submit(build_parquet_cache, p, cache_dir, True): p for p in stale}
+            for future in as_completed(futures):
+                csv_path = futures[future]
+                try:
+                    result[csv_path] = future.result()
+                except Exception as e:
+                    log.warning(f"⚠️ Не вдалося конвертувати {csv_path}: {e}")
+                    result[csv_path] = None
+    else:
+        for csv_path in stale:
+            try:
+                result[csv_path] = build_parquet_cache(csv_path, cache_dir, force=True)
+            except Exception as e:
+                log.warning(f"⚠️ Не вдалося конвертувати {csv_path}: {e}")
+                result[csv_path] = None
+
+    log.info(f"🗜️ Kaggle ingest: {len(stale)} файлів ({'пул ' + str(workers) if parallel and workers > 1 else 'послідовно'})")
+    return result
+
+
+def convert_kaggle_archive(
+    data_dir: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    force: bool = False,
+    parallel: bool = True,
+) -> int:
+    """Будує/оновлює Parquet-кеш (та mmap-масиви) для всіх *_hourly.csv (крок підготовки після оновлення архіву)."""
+    csv_paths = sorted(glob.glob(os.path.join(data_dir or DATA_DIR, "*_hourly.csv")))
+    built = ingest_kaggle_files(csv_paths, cache_dir, parallel=parallel, force=force)
+    if KAGGLE_HISTORY_MMAP:
+        from src.core import kaggle_history
+        for csv_path, path in built.items():
+            if path is not None:
+                kaggle_history.build_region_arrays(csv_path, cache_dir, force=force)
+    return sum(path is not None for path in built.values())
+
+
+def _naive(ts) -> Optional[pd.Timestamp]:
+    """Kaggle-часові мітки без зони: tz-aware межі приводяться до наївних."""
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def _region_files(regions: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+    """
+    Файли архіву для вибраних регіонів.
+
+    Args:
+        regions: Розгорнуті назви (KAGGLE_MAPPING) або префікси файлів; None — усі.
+
+    Returns:
+        [(шлях до CSV, розгорнута назва)] у стабільному порядку.
+    """
+    wanted = None if regions is None else {str(r).upper() for r in regions}
+    files = []
+    for csv_path in sorted(glob.glob(os.path.join(DATA_DIR, "*_hourly.csv"))):
+        prefix = _prefix(csv_path)
+        name = KAGGLE_MAPPING.get(prefix.upper(), prefix)
+        if wanted is None or prefix.upper() in wanted or name.upper() in wanted:
+            files.append((csv_path, name))
+    return files
+
+
+def kaggle_regions() -> List[str]:
+    """Назви регіонів архіву без читання даних."""
+    return [name for _, name in _region_files()]
+
+
+def kaggle_time_bounds(regions: Optional[Iterable[str]] = None) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """
+    Мінімальний і максимальний timestamp вибраних регіонів зі статистики row group
+    Parquet-кешу (дані не читаються).
+    """
+    lo, hi = None, None
+    for csv_path, _ in _region_files(regions):
         try:
-            # Читаємо файл
-            df = pd.read_csv(file_path)
-            if df.empty:
+            path = build_parquet_cache(csv_path)
+            if path is None:
                 continue
+            meta = pq.ParquetFile(path).metadata
+            if meta.num_row_groups == 0:
+                continue
+            idx = meta.schema.to_arrow_schema().get_field_index("timestamp")
+            first = meta.row_group(0).column(idx).statistics
+            last = meta.row_group(meta.num_row_groups - 1).column(idx).statistics
+        except Exception as e:
+            log.warning(f"⚠️ Kaggle-файл {csv_path} пропущено: {e}")
+            continue
+        # Файли відсортовані за часом: межі — у першій та останній групах
+        f_lo, f_hi = pd.Timestamp(first.min), pd.Timestamp(last.max)
+        lo = f_lo if lo is None else min(lo, f_lo)
+        hi = f_hi if hi is None else max(hi, f_hi)
+    return lo, hi
 
-            # Визначення префіксу файлу для ідентифікації підстанції
-            base = os.path.basename(file_path)
-            prefix = base.replace("_hourly.csv", "")
 
-            # Стандартизація колонки часу (timestamp)
-            dt_cols = [c for c in df.columns if c.lower() in ["datetime", "timestamp"]]
-            if dt_cols:
-                df = df.rename(columns={dt_cols[0]: "timestamp"})
-            else:
-                continue  # Скіпаємо якщо немає колонки часу
-
-            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-
-            # Стандартизація колонки навантаження (actual_load_mw)
-            load_cols = [
-                c
-                for c in df.columns
-                if "_mw" in c.lower()
-                or "load" in c.lower()
-                or c.upper() == f"{prefix.upper()}_MW"
-            ]
-            if load_cols:
-                df = df.rename(columns={load_cols[0]: "actual_load_mw"})
-            else:
-                continue  # Скіпаємо якщо не знайдено навантаження
+def load_kaggle_data(
+    regions: Optional[Iterable[str]] = None,
+    start=None,
+    end=None,
+    columns: Optional[Sequence[str]] = None,
+    tail_rows: Optional[int] = None,
+    parallel: bool = True,
+):
+    """
+    Зчитує та денормалізує дані з еталонної Kaggle директорії за масками файлів *_hourly.csv.
 
-            df["actual_load_mw"] = pd.to_numeric(df["actual_load_mw"], errors="coerce")
+    Фільтри проштовхуються у сховище: читаються лише файли вибраних регіонів
+    (один відсортований за часом Parquet на регіон), лише row group, що
+    перетинають [start, end], і лише потрібні колонки. Якщо потрібні лише
+    timestamp/actual_load_mw, вікно зрізається з memory-mapped масивів
+    (KAGGLE_HISTORY_MMAP) без розпакування Parquet.
 
-            # Мапінг локальних ідентифікаторів на розгорнуті назви (Pretty Name)
-            pretty_name = KAGGLE_MAPPING.get(prefix.upper(), prefix)
-            df["substation_name"] = pretty_name
-            df["region_name"] = (
-                pretty_name  # Забезпечення підтримки фільтрації регіонів
-            )
+    :param regions: Розгорнуті назви регіонів/підстанцій або префікси файлів (None — усі).
+    :param start: Нижня межа timestamp включно (None — без обмеження).
+    :param end: Верхня межа timestamp включно (None — без обмеження).
+    :param columns: Підмножина KAGGLE_COLUMNS (None — усі).
+    :param tail_rows: Залишити лише N останніх рядків кожного файлу (None — усі в діапазоні).
+    :param parallel: Розбирати застарілі CSV у пулі процесів (див. ingest_kaggle_files).
+    :return:pd.DataFrame Об'єднаний DataFrame з колонками: timestamp, actual_load_mw, substation_name, region_name.
+    """
+    columns = list(columns) if columns else list(KAGGLE_COLUMNS)
+    file_columns = [c for c in ("timestamp", "actual_load_mw") if c in columns]
+    start, end = _naive(start), _naive(end)
 
-            df = df[["timestamp", "actual_load_mw", "substation_name", "region_name"]]
-            df = df.dropna(subset=["timestamp", "actual_load_mw"])
-            
-            # РАДИКАЛЬНА ОПТИМІЗАЦІЯ: Обрізаємо дані ОДРАЗУ після завантаження одного файлу,
-            # до того як вони потраплять у великий загальний масив
-            df = df.sort_values("timestamp").tail(5000)
+    files = _region_files(regions)
+    ingest_kaggle_files([path for path, _ in files], parallel=parallel)
+    if KAGGLE_HISTORY_MMAP:
+        from src.core import kaggle_history
 
-            all_dfs.append(df)
+    all_dfs = []
+    names = []
 
-        except Exception:
+    for file_path, name in files:
+        try:
+            df = None
+            if KAGGLE_HISTORY_MMAP:
+                df = kaggle_history.slice_region(file_path, start=start, end=end, tail_rows=tail_rows)
+            if df is not None:
+                df = df[file_columns or ["timestamp"]]
+            else:
+                df = read_kaggle_file(file_path, start=start, end=end, columns=file_columns or ["timestamp"])
+        except Exception as e:
             # Ігноруємо биті файли, йдемо далі
+            log.warning(f"⚠️ Kaggle-файл {file_path} пропущено: {e}")
             continue
+        if df is None or df.empty:
+            continue
+        if tail_rows:
+            df = df.iloc[-tail_rows:]
+
+        names.append(name)
+        all_dfs.append((df, len(names) - 1))
 
     if not all_dfs:
-        return pd.DataFrame(
-            columns=["timestamp", "actual_load_mw", "substation_name", "region_name"]
-        )
+        return pd.DataFrame(columns=columns)
+
+    full_df = pd.concat([df for df, _ in all_dfs], ignore_index=True)
+    # Назви підстанцій — одразу Category (коди), без рядка на кожен запис
+    codes = np.repeat(
+        np.array([code for _, code in all_dfs], dtype=np.int16),
+        [len(df) for df, _ in all_dfs],
+    )
+    names_cat = pd.Categorical.from_codes(codes, categories=pd.Index(names))
+    if "substation_name" in columns:
+        full_df["substation_name"] = names_cat
+    if "region_name" in columns:
+        full_df["region_name"] = names_cat  # Забезпечення підтримки фільтрації регіонів
 
-    # Об'єднуємо (тепер масив вже маленький)
-    full_df = pd.concat(all_dfs, ignore_index=True)
-    
     from src.core.database import memory_diet
-    return memory_diet(full_df)
+    return memory_diet(full_df[columns])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Конвертація Kaggle CSV у Parquet-кеш")
+    parser.add_argument("--force", action="store_true", help="Перебудувати кеш незалежно від mtime/size")
+    parser.add_argument("--sequential", action="store_true", help="Без пулу процесів")
+    args = parser.parse_args()
+    print(f"Converted: {convert_kaggle_archive(force=args.force, parallel=not args.sequential)}")
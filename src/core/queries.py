@@ -14,14 +14,14 @@
 QUERY_REAL_LOAD = """
     SELECT 
         timestamp,
-        'Kaggle AEP (США)' as region_name,
+        region_name,
         actual_load_mw
     FROM RealLoadMeasurements
     WHERE timestamp >= NOW() - INTERVAL '30 days'
     ORDER BY timestamp ASC
 """
 
-QUERY_LOAD_WEATHER = """
+_LOAD_WEATHER_SELECT = """
     SELECT 
         lm.timestamp,
         r.region_name,
@@ -37,11 +37,14 @@ QUERY_LOAD_WEATHER = """
     LEFT JOIN WeatherReports wr ON 
         lm.timestamp = wr.timestamp 
         AND r.region_id = wr.region_id
+"""
+
+QUERY_LOAD_WEATHER = _LOAD_WEATHER_SELECT + """
     WHERE lm.timestamp >= NOW() - INTERVAL '30 days'
     ORDER BY lm.timestamp ASC
 """
 
-QUERY_GENERATION = """
+_GENERATION_SELECT = """
     SELECT 
         gm.timestamp,
         g.generator_type,
@@ -51,6 +54,9 @@ QUERY_GENERATION = """
     JOIN Generators g ON gm.generator_id = g.generator_id
     JOIN Substations s ON g.substation_id = s.substation_id
     JOIN Regions r ON s.region_id = r.region_id
+"""
+
+QUERY_GENERATION = _GENERATION_SELECT + """
     ORDER BY gm.timestamp DESC
     LIMIT 50000
 """
@@ -71,7 +77,7 @@ QUERY_ALERTS = """
     LIMIT 1000
 """
 
-QUERY_LINES = """
+_LINES_SELECT = """
     SELECT 
         lm.timestamp,
         pl.line_name,
@@ -86,11 +92,14 @@ QUERY_LINES = """
     JOIN PowerLines pl ON lm.line_id = pl.line_id
     JOIN Substations s_from ON pl.from_substation_id = s_from.substation_id
     JOIN Regions r ON s_from.region_id = r.region_id
+"""
+
+QUERY_LINES = _LINES_SELECT + """
     ORDER BY lm.timestamp DESC
     LIMIT 50000
 """
 
-QUERY_FINANCE = """
+_FINANCE_SELECT = """
     SELECT 
         lm.timestamp,
         r.region_name,
@@ -103,6 +112,36 @@ QUERY_FINANCE = """
     JOIN EnergyPricing ep ON 
         lm.timestamp = ep.timestamp
         AND r.region_id = ep.region_id
+"""
+
+QUERY_FINANCE = _FINANCE_SELECT + """
     ORDER BY lm.timestamp DESC
     LIMIT 50000
 """
+
+# --- DELTA QUERIES (інкрементальне довантаження) ---
+# Лише рядки, новіші за водяний знак :since; :cap обмежує обсяг довантаження —
+# якщо його досягнуто, завантажувач робить повне перечитування.
+QUERY_LOAD_WEATHER_DELTA = _LOAD_WEATHER_SELECT + """
+    WHERE lm.timestamp > :since
+    ORDER BY lm.timestamp ASC
+    LIMIT :cap
+"""
+
+QUERY_GENERATION_DELTA = _GENERATION_SELECT + """
+    WHERE gm.timestamp > :since
+    ORDER BY gm.timestamp DESC
+    LIMIT :cap
+"""
+
+QUERY_LINES_DELTA = _LINES_SELECT + """
+    WHERE lm.timestamp > :since
+    ORDER BY lm.timestamp DESC
+    LIMIT :cap
+"""
+
+QUERY_FINANCE_DELTA = _FINANCE_SELECT + """
+    WHERE lm.timestamp > :since
+    ORDER BY lm.timestamp DESC
+    LIMIT :cap
+"""
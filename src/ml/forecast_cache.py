@@ -0,0 +1,129 @@
+# ATLAS_PASSPORT: docs/system/map/forecast_cache.md
+"""
+🗃️ FORECAST RESULT CACHE (Watermark-keyed Inference Memo).
+Модуль: forecast_cache.py | Версія: 1.0.0
+Призначення: Повторне використання ШІ-прогнозів між сесіями, доки не з'явилися нові погодинні дані або не змінився артефакт моделі.
+
+Ключові можливості:
+- 🔖 Data Watermark Key: Ключ містить останню годину вхідного вікна — новий прогноз рахується лише після появи нової години телеметрії.
+- 🧬 Artifact Hash: Хеш ONNX-моделі та скейлера — перенавчена модель не віддає старі прогнози.
+- 🔒 Single Flight: Однаковий ключ з кількох сесій рахується один раз, решта чекають результат.
+- 📈 Hit/Miss Counters: Лічильники влучань/промахів та сумарний час обчислень для оцінки реальної вартості вкладки прогнозів.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "256"))
+
+
+def scenario_key(scenario: Any) -> str:
+    """Стабільне представлення сценарію (dict) для ключа кешу."""
+    try:
+        return json.dumps(scenario, sort_keys=True, default=str)
+    except TypeError:
+        return repr(scenario)
+
+
+class ForecastCache:
+    """
+    LRU-кеш результатів прогнозу з лічильниками.
+
+    Args:
+        max_entries: Максимум збережених прогнозів (найстаріші за використанням витісняються).
+    """
+
+    def __init__(self, max_entries: int = FORECAST_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+        self._compute_s = 0.0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Збережений результат (з оновленням LRU-порядку та лічильника влучань) або None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_miss(self, compute_s: float = 0.0) -> None:
+        with self._lock:
+            self._misses += 1
+            self._compute_s += compute_s
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = lambda result: result is not None,
+    ) -> Any:
+        """
+        Повертає збережений результат або обчислює його (один раз на ключ).
+
+        Args:
+            compute: Функція обчислення прогнозу.
+            cacheable: Чи зберігати результат (помилки та fallback не кешуються).
+        """
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+
+        with self._lock:
+            gate = self._inflight.setdefault(key, threading.Lock())
+        with gate:
+            # Поки чекали, інша сесія могла вже порахувати цей ключ
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+            started = time.perf_counter()
+            try:
+                result = compute()
+                # Запис до зняття gate: запит, що прийде одразу після, уже влучить у кеш
+                if cacheable(result):
+                    self.put(key, result)
+            finally:
+                self.record_miss(time.perf_counter() - started)
+                with self._lock:
+                    self._inflight.pop(key, None)
+            return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Лічильники для діагностики вкладки прогнозів."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else None,
+                "compute_s": round(self._compute_s, 2),
+            }
+
+
+FORECAST_CACHE = ForecastCache()
+
+
+def forecast_cache_stats() -> Dict[str, Any]:
+    return FORECAST_CACHE.stats()
@@ -6,33 +6,143 @@
 Основні функції:
 1. Neural Inference Orchestration: координація запусків нейронних мереж (V1-V3) залежно від контексту.
 2. Scenario-based Simulation: адаптація прогнозів під користувацькі сценарії (температурні зсуви, стан обладнання).
-3. Intelligent Caching: мінімізація надлишкових обчислень та запитів до БД через st.cache_data.
+3. Intelligent Caching: прогнози кешуються між сесіями за водяним знаком вхідного вікна та відбитком моделі (forecast_cache), а не за TTL.
 4. Instant Accuracy Audit: миттєва верифікація моделі на останньому зрізі історії для формування довірчих інтервалів.
+5. Batched Grid Inference: прогноз сітки підстанцій однією пакетною розгорткою на версію моделі.
+6. Precomputed Forecasts: актуальні прогони фонового воркера (forecast_worker, таблиця Forecasts) читаються замість інференсу.
 Забезпечує високу швидкість відгуку аналітичного дашборду при складних ШІ-обчисленнях.
 """
+import time
+
 import streamlit as st
 import pandas as pd
-from src.ml.predict_v2 import get_ai_forecast
+from src.ml.forecast_cache import FORECAST_CACHE, scenario_key
+from src.ml.forecast_worker import is_precomputed_scenario, load_precomputed_forecasts
+from src.ml.model_loader import artifact_fingerprint
+from src.ml.predict_v2 import get_ai_forecast, get_ai_forecast_batch
+from src.ml.vectorizer import get_window_watermarks
 from src.ml.backtest import get_fast_backtest, evaluate_last_24h
 
-@st.cache_data(ttl=3600, show_spinner="🧠 Neural Inference (Vectorized)...")
+def _forecast_key(hours_ahead, substation_name, source_type, version, scenario, watermark, fingerprint):
+    sub_key = tuple(substation_name) if isinstance(substation_name, list) else substation_name
+    return (hours_ahead, sub_key, source_type, version, scenario_key(scenario), watermark.isoformat(), fingerprint)
+
+def _detached(result):
+    """Копія кадру для викликача: кеш спільний між сесіями, а UI дописує колонки в результат."""
+    if result and isinstance(result[0], pd.DataFrame):
+        return result[0].copy(), result[1]
+    return result
+
+def _is_cacheable(result):
+    """Кешуються лише успішні ШІ-прогнози (не помилки й не Baseline Fallback)."""
+    return bool(result) and result[1] is None and not result[0].empty
+
+def _precomputed(names, hours_ahead, source_type, version, temp_s, consts, watermarks):
+    """Готові прогони фонового воркера (лише Live та нейтральний сценарій)."""
+    if source_type != "Live" or not is_precomputed_scenario(temp_s, consts):
+        return {}
+    return load_precomputed_forecasts(names, version, hours_ahead, watermarks)
+
 def cached_ai_forecast(hours_ahead, substation_name, source_type, version, scenario):
-    """Cached wrapper for ML inference to prevent redundant re-computation."""
+    """
+    Cached wrapper for ML inference to prevent redundant re-computation.
+
+    Ключ — остання година вхідного вікна + відбиток артефактів моделі, тож
+    результат спільний для всіх сесій і перераховується лише після появи
+    нової години телеметрії або зміни моделі. Прогін фонового воркера
+    (таблиця Forecasts) читається замість інференсу, якщо він актуальний.
+    """
+    temp_s, consts = _scenario_overrides(scenario)
+    sub_key = tuple(substation_name) if isinstance(substation_name, list) else substation_name
+    watermarks = get_window_watermarks([substation_name], source_type)
+    watermark = watermarks.get(sub_key)
+
+    def _compute():
+        if watermark is not None and isinstance(substation_name, str):
+            ready = _precomputed([substation_name], hours_ahead, source_type, version, temp_s, consts, watermarks)
+            if substation_name in ready:
+                return ready[substation_name], None
+        with st.spinner("🧠 Neural Inference (Vectorized)..."):
+            return get_ai_forecast(
+                hours_ahead=hours_ahead, 
+                substation_name=substation_name, 
+                source_type=source_type, 
+                version=version, 
+                temp_shift=temp_s,
+                constants=consts
+            )
+
+    fingerprint = artifact_fingerprint(version)
+    if watermark is None or fingerprint is None:
+        FORECAST_CACHE.record_miss()
+        return _compute()
+
+    key = _forecast_key(hours_ahead, substation_name, source_type, version, scenario, watermark, fingerprint)
+    return _detached(FORECAST_CACHE.get_or_compute(key, _compute, cacheable=_is_cacheable))
+
+def _scenario_overrides(scenario):
+    """Зсув температури та константи здоров'я зі сценарію користувача."""
     # Захист від некоректного типу даних сценарію
     if not isinstance(scenario, dict):
         scenario = {"air_temp": 15, "health_score": 100}
-        
     temp_s = scenario.get("air_temp", 15) - 15 # Зсув відносно норми (15C)
     consts = {"health": scenario.get("health_score", 100)}
-    
-    return get_ai_forecast(
-        hours_ahead=hours_ahead, 
-        substation_name=substation_name, 
-        source_type=source_type, 
-        version=version, 
-        temp_shift=temp_s,
-        constants=consts
-    )
+    return temp_s, consts
+
+def cached_ai_forecast_batch(hours_ahead, substation_names, source_type, version, scenario):
+    """
+    Cached wrapper for batched ML inference over several substations.
+
+    Кожна підстанція кешується окремо (той самий ключ, що й у cached_ai_forecast);
+    промахи спершу шукаються серед актуальних прогонів воркера, решта рахується пакетом.
+
+    Returns:
+        {substation: (df_forecast, error)} — той самий формат, що й cached_ai_forecast для кожного об'єкта.
+    """
+    temp_s, consts = _scenario_overrides(scenario)
+    names = list(dict.fromkeys(substation_names))
+    watermarks = get_window_watermarks(names, source_type)
+    fingerprint = artifact_fingerprint(version)
+
+    results, keys, missing = {}, {}, []
+    for name in names:
+        watermark = watermarks.get(name)
+        if watermark is not None and fingerprint is not None:
+            keys[name] = _forecast_key(hours_ahead, name, source_type, version, scenario, watermark, fingerprint)
+            hit = FORECAST_CACHE.get(keys[name])
+            if hit is not None:
+                results[name] = hit
+                continue
+        missing.append(name)
+
+    if missing:
+        started = time.perf_counter()
+        computed = {
+            name: (df_fc, None)
+            for name, df_fc in _precomputed(missing, hours_ahead, source_type, version, temp_s, consts, watermarks).items()
+        }
+        to_infer = [name for name in missing if name not in computed]
+        if to_infer:
+            with st.spinner("🧠 Batched Neural Inference..."):
+                computed.update(get_ai_forecast_batch(
+                    to_infer,
+                    hours_ahead=hours_ahead,
+                    source_type=source_type,
+                    version=version,
+                    temp_shift=temp_s,
+                    constants=consts
+                ) or {})
+        per_station_s = (time.perf_counter() - started) / len(missing)
+        for name in missing:
+            FORECAST_CACHE.record_miss(per_station_s)
+            result = computed.get(name)
+            if result is None:
+                continue
+            if name in keys and _is_cacheable(result):
+                FORECAST_CACHE.put(keys[name], result)
+            results[name] = result
+
+    return {name: _detached(results[name]) for name in names if name in results}
 
 @st.cache_data(ttl=3600, show_spinner="📊 Batch Auditing System Accuracy...")
 def cached_fast_backtest(substation_name, version, source_type):
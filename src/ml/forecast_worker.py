@@ -0,0 +1,266 @@
+# ATLAS_PASSPORT: docs/system/map/forecast_worker.md
+"""
+🛰️ FORECAST PRECOMPUTE WORKER (Scheduled Batch Inference).
+Модуль: forecast_worker.py | Версія: 1.0.0
+Призначення: Фоновий процес, який після кожної нової години rollup прораховує прогнози всіх підстанцій × версій моделі й пише їх у таблицю Forecasts, щоб вкладка прогнозів читала готовий результат індексним запитом.
+
+Ключові можливості:
+- ⏰ Hourly Rollover Trigger: Прогін запускається, коли водяний знак LoadHourly переходить на нову годину (RollupWatermarks).
+- 🔁 Per-pair Completion: Завершеність обліковується для кожної пари (підстанція, версія) через Forecasts.source_hour — невдалі пари повторюються на наступній перевірці, успішні не перераховуються.
+- 📦 Batched Inference: Одна пакетна розгортка get_ai_forecast_batch на версію для всіх підстанцій.
+- 🚚 Bulk Write: Попередній прогін замінюється новим в одній транзакції через execute_values.
+- 🔒 Single Worker: pg_try_advisory_xact_lock не дає двом воркерам рахувати один і той самий прогін.
+- ⚡ Indexed Read: load_precomputed_forecasts повертає прогін лише якщо він виданий від поточної години даних.
+
+Запуск: python -m src.ml.forecast_worker [--once] [--interval 60] [--horizon 24] [--versions v1 v2 v3]
+"""
+import argparse
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from src.core.database.forecasts import FORECASTS_DDL
+from src.core.database.rollup import get_watermark, set_watermark
+from src.ml.predict_v2 import get_ai_forecast_batch
+
+logger = logging.getLogger(__name__)
+
+FORECAST_VERSIONS = ("v1", "v2", "v3")
+FORECAST_HORIZON_H = 24
+FORECASTS_WATERMARK = "forecasts"  # Запис у RollupWatermarks: година даних, для якої записано всі прогони
+_ADVISORY_LOCK_KEY = 7_420_025
+
+# Прогін рахується для нейтрального сценарію вкладки прогнозів (15°C, health 100)
+PRECOMPUTE_TEMP_SHIFT = 0.0
+PRECOMPUTE_CONSTANTS = {"health": 100}
+
+_READ_SQL = """
+    SELECT s.substation_name, f.horizon_h, f.timestamp,
+           f.predicted_load_mw, f.lower, f.upper, f.predicted_health_score
+    FROM Substations s
+    JOIN Forecasts f ON f.substation_id = s.substation_id
+    WHERE s.substation_name = ANY(:names)
+      AND f.version = :version
+      AND f.horizon_h <= :hours
+    ORDER BY s.substation_name, f.horizon_h
+"""
+
+
+def ensure_forecasts_schema(cursor) -> None:
+    """Створює таблицю Forecasts, якщо її ще немає."""
+    for ddl in FORECASTS_DDL:
+        cursor.execute(ddl)
+
+
+def is_precomputed_scenario(temp_shift: float, constants: Optional[dict]) -> bool:
+    """Чи збігається сценарій з тим, для якого воркер рахує прогони."""
+    return temp_shift == PRECOMPUTE_TEMP_SHIFT and (constants or {}) == PRECOMPUTE_CONSTANTS
+
+
+def _as_utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_convert("UTC") if ts.tzinfo else ts.tz_localize("UTC")
+
+
+def forecast_rows(substation_id: int, version: str, df_forecast: pd.DataFrame, source_hour=None) -> List[tuple]:
+    """
+    Рядки Forecasts з кадру get_ai_forecast.
+
+    horizon_h 0 — стартова (фактична) точка прогнозу, тобто година даних,
+    від якої виданий прогін; source_hour — година rollup, для якої прогін рахувався.
+    """
+    health = df_forecast["predicted_health_score"] if "predicted_health_score" in df_forecast else [100.0] * len(df_forecast)
+    return [
+        (
+            substation_id, version, _as_utc(ts).to_pydatetime(), horizon,
+            round(float(p), 2), round(float(lo), 2), round(float(hi), 2), round(float(h), 2),
+            source_hour,
+        )
+        for horizon, (ts, p, lo, hi, h) in enumerate(zip(
+            df_forecast["timestamp"], df_forecast["predicted_load_mw"],
+            df_forecast["lower_bond"], df_forecast["upper_bond"], health,
+        ))
+    ]
+
+
+def write_forecasts(cursor, rows: Sequence[tuple]) -> None:
+    """Замінює прогони (substation_id, version), присутні в rows (у транзакції курсора)."""
+    pairs = sorted({(row[0], row[1]) for row in rows})
+    execute_values(cursor, "DELETE FROM Forecasts WHERE (substation_id, version) IN (VALUES %s)", pairs)
+    execute_values(
+        cursor,
+        "INSERT INTO Forecasts (substation_id, version, timestamp, horizon_h, "
+        "predicted_load_mw, lower, upper, predicted_health_score, source_hour) VALUES %s",
+        rows,
+        page_size=1000,
+    )
+
+
+def completed_pairs(cursor, source_hour) -> Set[Tuple[int, str]]:
+    """Пари (substation_id, version), прогони яких уже записані від source_hour."""
+    cursor.execute("SELECT DISTINCT substation_id, version FROM Forecasts WHERE source_hour = %s", (source_hour,))
+    return {(sub_id, version) for sub_id, version in cursor.fetchall()}
+
+
+def precompute_forecasts(
+    cursor=None,
+    versions: Iterable[str] = FORECAST_VERSIONS,
+    hours_ahead: int = FORECAST_HORIZON_H,
+    force: bool = False,
+) -> int:
+    """
+    Прораховує прогнози всіх підстанцій × версій, якщо rollup має нову годину.
+
+    Рахуються лише пари (підстанція, версія), ще не записані від поточної
+    години; невдалі пари лишаються незавершеними й повторюються наступною
+    перевіркою. Водяний знак прогнозів ставиться, коли записано всі пари.
+
+    Args:
+        cursor: Курсор psycopg2 у відкритій транзакції (None — власне з'єднання з пулу).
+        versions: Версії моделей для прогону.
+        hours_ahead: Горизонт прогнозу, год.
+        force: Перерахувати всі пари, навіть якщо прогін для поточної години вже є.
+
+    Returns:
+        Кількість записаних рядків (0 — нової години немає або жоден прогін не вдався,
+        -1 — прогін уже виконує інший воркер).
+    """
+    if cursor is None:
+        from src.core.database import get_db_cursor
+        with get_db_cursor() as (_, own_cursor):
+            return precompute_forecasts(own_cursor, versions, hours_ahead, force)
+
+    cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (_ADVISORY_LOCK_KEY,))
+    if not cursor.fetchone()[0]:
+        logger.info("🛰️ Прогін прогнозів уже виконує інший воркер — пропускаємо.")
+        return -1
+
+    source_hour = get_watermark(cursor)
+    if source_hour is None:
+        logger.info("🛰️ LoadHourly ще не будувався — прогнозувати нічого.")
+        return 0
+    if not force and get_watermark(cursor, FORECASTS_WATERMARK) == source_hour:
+        return 0
+
+    cursor.execute("SELECT substation_id, substation_name FROM Substations ORDER BY substation_name")
+    ids = {name: sub_id for sub_id, name in cursor.fetchall()}
+    done = set() if force else completed_pairs(cursor, source_hour)
+
+    rows: List[tuple] = []
+    failed = 0
+    for version in versions:
+        pending = [name for name, sub_id in ids.items() if (sub_id, version) not in done]
+        if not pending:
+            continue
+        started = time.perf_counter()
+        results = get_ai_forecast_batch(
+            pending,
+            hours_ahead=hours_ahead,
+            source_type="Live",
+            version=version,
+            temp_shift=PRECOMPUTE_TEMP_SHIFT,
+            constants=dict(PRECOMPUTE_CONSTANTS),
+        ) or {}
+        written = 0
+        for name in pending:
+            df_forecast, error = results.get(name, (pd.DataFrame(), "немає результату"))
+            # Помилки та Baseline Fallback не зберігаються — вкладка порахує їх сама
+            if error or df_forecast.empty:
+                logger.warning(f"⚠️ {name} ({version}): {error or 'порожній прогноз'}")
+                failed += 1
+                continue
+            rows.extend(forecast_rows(ids[name], version, df_forecast, source_hour))
+            written += 1
+        logger.info(f"🛰️ {version}: {written}/{len(pending)} підстанцій за {time.perf_counter() - started:.2f} с")
+
+    if rows:
+        write_forecasts(cursor, rows)
+    if failed:
+        # Година не позначається виконаною — наступна перевірка повторить лише невдалі пари
+        logger.warning(f"⚠️ {failed} прогонів для години {source_hour} не вдалися — повтор на наступній перевірці.")
+    else:
+        set_watermark(cursor, source_hour, FORECASTS_WATERMARK)
+
+    logger.info(f"🛰️ Forecasts: записано {len(rows)} рядків (година даних {source_hour}).")
+    return len(rows)
+
+
+def load_precomputed_forecasts(
+    substation_names: Sequence[str],
+    version: str,
+    hours_ahead: int,
+    watermarks: Dict[str, Optional[pd.Timestamp]],
+) -> Dict[str, pd.DataFrame]:
+    """
+    Готові прогони з Forecasts одним індексним запитом.
+
+    Прогін повертається лише якщо він покриває hours_ahead і виданий від
+    поточної години даних підстанції (watermarks, див. get_window_watermarks);
+    решту викликач рахує сам.
+
+    Returns:
+        {назва підстанції: DataFrame у форматі get_ai_forecast}.
+    """
+    from src.core.database import run_query
+
+    names = [n for n in dict.fromkeys(substation_names) if isinstance(n, str) and watermarks.get(n) is not None]
+    if not names:
+        return {}
+
+    df = run_query(_READ_SQL, {"names": names, "version": version, "hours": int(hours_ahead)})
+    result: Dict[str, pd.DataFrame] = {}
+    if df is None or df.empty:
+        return result
+
+    for name, rows in df.groupby("substation_name", sort=False):
+        if len(rows) != hours_ahead + 1 or rows["horizon_h"].iloc[0] != 0:
+            continue
+        if _as_utc(rows["timestamp"].iloc[0]) != _as_utc(watermarks[name]):
+            continue  # Прогін від попередньої години — застарів
+        result[name] = pd.DataFrame({
+            "timestamp": rows["timestamp"].to_numpy(),
+            "predicted_load_mw": rows["predicted_load_mw"].astype(float).to_numpy(),
+            "predicted_health_score": rows["predicted_health_score"].astype(float).fillna(100.0).to_numpy(),
+            "upper_bond": rows["upper"].astype(float).to_numpy(),
+            "lower_bond": rows["lower"].astype(float).to_numpy(),
+            "is_actual_start": (rows["horizon_h"] == 0).to_numpy(),
+        })
+    return result
+
+
+def run_worker(
+    interval_s: float = 60.0,
+    versions: Iterable[str] = FORECAST_VERSIONS,
+    hours_ahead: int = FORECAST_HORIZON_H,
+    once: bool = False,
+) -> None:
+    """Цикл воркера: перевірка водяного знака кожні interval_s секунд, прогін після зміни години."""
+    from src.core.database import get_db_cursor
+
+    versions = tuple(versions)
+    with get_db_cursor() as (_, cursor):
+        ensure_forecasts_schema(cursor)
+    logger.info(f"🛰️ Forecast worker: {', '.join(versions)}, горизонт {hours_ahead} год, інтервал {interval_s:.0f} с")
+
+    while True:
+        try:
+            precompute_forecasts(versions=versions, hours_ahead=hours_ahead)
+        except Exception as e:
+            logger.error(f"❌ Прогін прогнозів не вдався: {e}", exc_info=True)
+        if once:
+            return
+        time.sleep(interval_s)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Фоновий прорахунок прогнозів у таблицю Forecasts")
+    parser.add_argument("--once", action="store_true", help="Один прогін і вихід")
+    parser.add_argument("--interval", type=float, default=60.0, help="Період перевірки водяного знака, с")
+    parser.add_argument("--horizon", type=int, default=FORECAST_HORIZON_H, help="Горизонт прогнозу, год")
+    parser.add_argument("--versions", nargs="+", default=list(FORECAST_VERSIONS), help="Версії моделей")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s | %(name)s -> %(message)s")
+    run_worker(args.interval, args.versions, args.horizon, once=args.once)
@@ -71,13 +71,17 @@ def _get_ground_truth(sub: str, min_ts: pd.Timestamp, max_ts: pd.Timestamp, sour
     """Fetches actual load data from the database or CSV loader."""
     if source_type == "CSV":
         from src.core.kaggle_loader import load_kaggle_data
-        df_all = load_kaggle_data()
-        
+
+        regions = None
         if sub and sub not in ["Усі підстанції", "Всі об'єкти", "Всі", "All", "Усі"]:
-            if isinstance(sub, list):
-                df_all = df_all[df_all["substation_name"].isin(sub)]
-            else:
-                df_all = df_all[df_all["substation_name"] == sub]
+            regions = sub if isinstance(sub, list) else [sub]
+        # Межі проштовхуються у сховище; верхня — до кінця години max_ts (далі floor("h"))
+        df_all = load_kaggle_data(
+            regions,
+            start=min_ts,
+            end=pd.Timestamp(max_ts).floor("h") + pd.Timedelta(hours=1) - pd.Timedelta(seconds=1),
+            columns=["timestamp", "actual_load_mw"],
+        )
         
         if not df_all.empty:
             df_all["timestamp"] = df_all["timestamp"].dt.floor("h")
@@ -89,13 +93,15 @@ def _get_ground_truth(sub: str, min_ts: pd.Timestamp, max_ts: pd.Timestamp, sour
         return pd.DataFrame(columns=["ts", "actual_load_mw"])
 
     if sub and sub not in ["Усі підстанції", "Всі об'єкти", "Всі", "All", "Усі"]:
-        sql = """SELECT AVG(actual_load_mw) as actual_load_mw, DATE_TRUNC('hour', timestamp) as ts 
-                 FROM LoadMeasurements lm JOIN Substations s ON lm.substation_id = s.substation_id 
-                 WHERE s.substation_name = :sub AND lm.timestamp BETWEEN :min AND :max GROUP BY 2 ORDER BY ts ASC"""
+        sql = """SELECT lh.load_avg_mw as actual_load_mw, lh.ts_hour as ts 
+                 FROM LoadHourly lh JOIN Substations s ON lh.substation_id = s.substation_id 
+                 WHERE s.substation_name = :sub AND lh.ts_hour BETWEEN DATE_TRUNC('hour', CAST(:min AS timestamptz)) AND :max
+                 ORDER BY ts ASC"""
         return run_query(sql, {"sub": sub, "min": min_ts, "max": max_ts})
     else:
-        sql = """SELECT SUM(actual_load_mw) as actual_load_mw, DATE_TRUNC('hour', timestamp) as ts 
-                 FROM LoadMeasurements WHERE timestamp BETWEEN :min AND :max GROUP BY 2 ORDER BY ts ASC"""
+        sql = """SELECT SUM(load_sum_mw) as actual_load_mw, ts_hour as ts 
+                 FROM LoadHourly WHERE ts_hour BETWEEN DATE_TRUNC('hour', CAST(:min AS timestamptz)) AND :max
+                 GROUP BY 2 ORDER BY ts ASC"""
         return run_query(sql, {"min": min_ts, "max": max_ts})
 
 def _get_outlier_mask(actual: np.ndarray, preds: np.ndarray) -> np.ndarray:
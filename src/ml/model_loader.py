@@ -8,9 +8,11 @@ py | Версія: 2.1.0
 - 🗄️ Unified Registry: Ведення реєстру версій моделей (V1-V3) та бінарних ресурсів.
 - 🚀 Optimized Inference: Конфігурація ONNX-сесій з максимальною оптимізацією графів обчислень.
 - 🛡️ Integrity Guards: Автоматична перевірка цілісності та валідація бінарних файлів.
-- 🧠 Smart Caching: Використання st.cache_resource для запобігання дублювання моделей у RAM.
+- 🧬 Artifact Fingerprint: SHA-256 моделі та скейлера (кешується за mtime/size) — ключ інвалідації кешу прогнозів.
+- 🧠 Smart Caching: st.cache_resource, ключований версією та відбитком артефактів, — без дублювання моделей у RAM і без застарілих сесій після перенавчання.
 """
 import os
+import hashlib
 import joblib
 import logging
 import onnxruntime as ort
@@ -54,11 +56,11 @@ try:
 except ImportError:
     HAS_STREAMLIT = False
 
-def st_cache_resource_fallback(show_spinner=True):
+def st_cache_resource_fallback(show_spinner=True, max_entries=None):
     """Conditional decorator for Streamlit caching with CLI fallback."""
     def decorator(func):
         if HAS_STREAMLIT:
-            return st.cache_resource(show_spinner=show_spinner)(func)
+            return st.cache_resource(show_spinner=show_spinner, max_entries=max_entries)(func)
         return func
     return decorator
 
@@ -89,10 +91,8 @@ def _get_substation_peak_automated(name: Union[str, List[str]]) -> float:
         
     return 5269.0 
 
-@st_cache_resource_fallback(show_spinner="⏳ Loading AI Models...")
-@robust_ml_handler
-def load_resources(version: str = "v3") -> Tuple[Optional[ort.InferenceSession], Optional[Any]]:
-    """Loads ONNX model and Joblib scaler with integrity checks."""
+def resolve_artifact_paths(version: str = "v3") -> Tuple[Optional[str], Optional[str]]:
+    """Шляхи до ONNX-моделі та скейлера версії (з резервним checkpoint для v3) або (None, None)."""
     m_path = MODEL_REGISTRY.get(version)
     s_path = SCALER_REGISTRY.get(version)
 
@@ -103,9 +103,56 @@ def load_resources(version: str = "v3") -> Tuple[Optional[ort.InferenceSession],
             logger.error(f"❌ Critical Model Path Missing for {version}")
             return None, None
 
-    if not os.path.exists(m_path) or not os.path.exists(s_path):
+    if not os.path.exists(m_path) or not s_path or not os.path.exists(s_path):
         logger.error(f"❌ Model or Scaler file not found: {m_path}")
         return None, None
+    return m_path, s_path
+
+
+_FILE_HASHES = {}
+
+
+def _file_sha256(path: str) -> str:
+    """SHA-256 файлу; перераховується лише після зміни mtime/size."""
+    info = os.stat(path)
+    key = (path, info.st_mtime_ns, info.st_size)
+    cached = _FILE_HASHES.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _FILE_HASHES[path] = (key, digest.hexdigest())
+    return _FILE_HASHES[path][1]
+
+
+def artifact_fingerprint(version: str = "v3") -> Optional[str]:
+    """Короткий відбиток артефактів версії (модель + скейлер) або None, якщо їх немає."""
+    m_path, s_path = resolve_artifact_paths(version)
+    if m_path is None:
+        return None
+    return hashlib.sha256(f"{_file_sha256(m_path)}:{_file_sha256(s_path)}".encode()).hexdigest()[:16]
+
+
+def load_resources(version: str = "v3") -> Tuple[Optional[ort.InferenceSession], Optional[Any]]:
+    """
+    Loads ONNX model and Joblib scaler with integrity checks.
+
+    Кеш ресурсів ключується відбитком артефактів: після перенавчання (новий
+    .onnx/.pkl) сесія завантажується заново, а не береться стара з кешу.
+    """
+    return _load_resources_cached(version, artifact_fingerprint(version))
+
+
+# Одна актуальна пара (сесія, скейлер) на версію: записи старих відбитків витісняються
+@st_cache_resource_fallback(show_spinner="⏳ Loading AI Models...", max_entries=len(MODEL_REGISTRY))
+@robust_ml_handler
+def _load_resources_cached(version: str, fingerprint: Optional[str]) -> Tuple[Optional[ort.InferenceSession], Optional[Any]]:
+    """Завантаження ресурсів версії; fingerprint — лише ключ кешу."""
+    m_path, s_path = resolve_artifact_paths(version)
+    if m_path is None:
+        return None, None
 
     try:
         sess_options = ort.SessionOptions()
@@ -6,6 +6,9 @@
 
 Ключові технології:
 - 🧠 ONNX Optimized Inference: Рекурентне прогнозування на базі квантованих нейронних моделей.
+- 📦 Batched Rollout: Вікна кількох підстанцій складаються в один тензор (N, window, features) — один model.run на крок горизонту.
+- 🔁 Ring-buffer Rollout: Один float32-буфер довжини window + horizon, ковзне вікно-view та IO binding — без алокацій на кроці.
+- 🎯 Direct Multi-horizon: Моделі з вектором горизонту на виході дають усі години одним запуском; рекурсія — лише за межами ширини виходу.
 - ⚖️ Domain Adaptation: Динамічне масштабування прогнозів під специфіку конкретних вузлів мережі.
 - 🧵 Seamless Stitching: Алгоритм усунення розривів (Bias Correction) між фактом та прогнозом.
 - 🛡️ Sanity Checker: Система верифікації результатів ШІ та автоматичний Fallback на базові моделі.
@@ -14,7 +17,8 @@
 import numpy as np
 import gc
 import logging
-from typing import Tuple, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple, Optional
 
 import pandas as pd
 
@@ -84,6 +88,154 @@ def _build_norm_overrides(
     return target_norm_temp, norm_health
 
 
+def _future_trig_features(future_ts: Sequence[Sequence[pd.Timestamp]]) -> np.ndarray:
+    """Циклічні ознаки (sin/cos години та дня тижня) майбутніх міток: (N, hours_ahead, 4)."""
+    h_idx = np.array([[ts.hour for ts in row] for row in future_ts], dtype=np.float64)
+    d_idx = np.array([[ts.weekday() for ts in row] for row in future_ts], dtype=np.float64)
+    return np.stack([
+        np.sin(2 * np.pi * h_idx / 24), np.cos(2 * np.pi * h_idx / 24),
+        np.sin(2 * np.pi * d_idx / 7), np.cos(2 * np.pi * d_idx / 7),
+    ], axis=-1)
+
+
+# Виходи шириною до 2 — однокрокові (навантаження[, здоров'я]); ширші — вектор горизонту навантаження
+_SINGLE_STEP_OUTPUTS = 2
+
+
+def _direct_horizon(model) -> int:
+    """
+    Кількість годин, які модель прогнозує за один запуск.
+
+    Береться з метаданих ONNX (custom "forecast_horizon"), інакше — з ширини
+    першого виходу model.get_outputs(). 1 — класична рекурентна модель.
+    """
+    try:
+        meta = model.get_modelmeta().custom_metadata_map
+        if meta.get("forecast_horizon"):
+            return max(1, int(meta["forecast_horizon"]))
+    except Exception:
+        pass
+    try:
+        width = model.get_outputs()[0].shape[-1]
+    except Exception:
+        return 1
+    return int(width) if isinstance(width, int) and width > _SINGLE_STEP_OUTPUTS else 1
+
+
+class _RolloutIO:
+    """
+    Повторно використовувані вхідний/вихідний буфери ONNX-сесії.
+
+    Для onnxruntime-сесій буфери прив'язуються через IO binding один раз
+    (OrtValue спільно використовує пам'ять numpy), тож крок не алокує ні
+    вхідний тензор, ні результат. Для інших об'єктів із методом run — звичайний виклик.
+    """
+
+    def __init__(self, model, x: np.ndarray):
+        self._model = model
+        self._x = x
+        self._input_name = model.get_inputs()[0].name
+        self._binding = None
+        self._out = None
+
+    def run(self) -> np.ndarray:
+        if self._binding is not None:
+            self._model.run_with_iobinding(self._binding)
+            return self._out
+        out = self._model.run(None, {self._input_name: self._x})[0]
+        if self._out is None and hasattr(self._model, "io_binding"):
+            self._bind(out)
+        return out
+
+    def _bind(self, first_out: np.ndarray) -> None:
+        """Прив'язує буфери після першого кроку (ширина виходу стає відомою)."""
+        try:
+            import onnxruntime as ort
+            self._out = np.empty_like(first_out, dtype=np.float32)
+            binding = self._model.io_binding()
+            binding.bind_ortvalue_input(self._input_name, ort.OrtValue.ortvalue_from_numpy(self._x))
+            binding.bind_ortvalue_output(
+                self._model.get_outputs()[0].name, ort.OrtValue.ortvalue_from_numpy(self._out)
+            )
+            self._binding = binding
+        except Exception as e:
+            logger.debug(f"IO binding unavailable, falling back to model.run: {e}")
+            self._out, self._binding = None, None
+
+
+def _run_onnx_inference_batch(
+    model,
+    windows: np.ndarray,
+    hours_ahead: int,
+    future_ts: Sequence[Sequence[pd.Timestamp]],
+    target_norm_temps: Sequence[Optional[float]],
+    norm_healths: Sequence[Optional[float]]
+) -> np.ndarray:
+    """
+    Прогноз для N вікон одночасно: один model.run на крок горизонту, а для
+    моделей з вектором горизонту — один запуск на кожні width годин.
+
+    Історія та майбутні рядки лежать в одному float32-буфері (N, window + horizon, F):
+    усі ознаки майбутніх рядків, окрім навантаження, відомі наперед і заповнюються
+    до розгортки, а крок лише копіює ковзне вікно у прив'язаний вхід моделі та
+    дописує прогноз навантаження в наступні рядки.
+
+    Args:
+        windows: Нормалізовані вікна (N, window_size, n_features).
+        future_ts: Майбутні мітки кожного вікна (N × hours_ahead).
+        target_norm_temps / norm_healths: Перезаписи температури та здоров'я по вікнах (None — без перезапису).
+
+    Returns:
+        Прогнози моделі (N, hours_ahead, n_outputs) у нормалізованому масштабі
+        (для direct-моделей n_outputs = 1: лише навантаження).
+    """
+    n_windows, window_size, n_features = windows.shape
+    horizon_width = _direct_horizon(model)
+
+    # float32 одразу: модель однаково отримувала б вхід, приведений до float32
+    buffer = np.empty((n_windows, window_size + hours_ahead, n_features), dtype=np.float32)
+    buffer[:, :window_size] = windows
+    # Незмінні ознаки переносяться з останнього спостереження, далі — перезаписи сценарію
+    buffer[:, window_size:] = buffer[:, window_size - 1:window_size]
+    if n_features > 4:
+        temps = np.array([np.nan if t is None else t for t in target_norm_temps], dtype=np.float64)
+        healths = np.array([np.nan if h is None else h for h in norm_healths], dtype=np.float64)
+        has_temp = ~np.isnan(temps)
+        has_health = has_temp & ~np.isnan(healths)
+        buffer[has_temp, window_size:, 4] = temps[has_temp, None]
+        buffer[has_health, window_size:, 3] = healths[has_health, None]
+    if n_features >= 9:
+        buffer[:, window_size:, 5:9] = _future_trig_features(future_ts)
+
+    x = np.empty((n_windows, window_size, n_features), dtype=np.float32)
+    io = _RolloutIO(model, x)
+    predictions = None
+    pos = 0
+
+    while pos < hours_ahead:
+        np.copyto(x, buffer[:, pos:pos + window_size])
+        pred = io.run()
+        if horizon_width > 1:
+            # Direct: вектор навантаження на width годин; далі — рекурсія від прогнозованого краю
+            step_len = min(horizon_width, hours_ahead - pos)
+            if predictions is None:
+                predictions = np.empty((n_windows, hours_ahead, 1), dtype=np.float32)
+            block = predictions[:, pos:pos + step_len, 0]
+            np.clip(pred[:, :step_len], 0, 1.1, out=block)
+            buffer[:, window_size + pos:window_size + pos + step_len, 0] = block
+        else:
+            step_len = 1
+            if predictions is None:
+                predictions = np.empty((n_windows, hours_ahead, pred.shape[1]), dtype=np.float32)
+            step = predictions[:, pos]
+            np.copyto(step, pred)
+            np.clip(step[:, 0], 0, 1.1, out=step[:, 0])
+            buffer[:, window_size + pos, 0] = step[:, 0]
+        pos += step_len
+
+    return predictions
+
+
 def _run_onnx_inference(
     model,
     current_window: np.ndarray,
@@ -94,37 +246,12 @@ def _run_onnx_inference(
     target_norm_temp: Optional[float],
     norm_health: Optional[float]
 ) -> list:
-    """Запускає ONNX-модель у рекурентному режимі на hours_ahead кроків."""
-    # Передобчислення тригонометрії для майбутніх часових міток
-    sin_h = cos_h = sin_d = cos_d = None
-    if n_features >= 9:
-        h_idx = np.array([ts.hour for ts in future_ts])
-        d_idx = np.array([ts.weekday() for ts in future_ts])
-        sin_h, cos_h = np.sin(2 * np.pi * h_idx / 24), np.cos(2 * np.pi * h_idx / 24)
-        sin_d, cos_d = np.sin(2 * np.pi * d_idx / 7), np.cos(2 * np.pi * d_idx / 7)
-
-    input_name = model.get_inputs()[0].name
-    all_stage_predictions = []
-
-    for i in range(hours_ahead):
-        x_input = current_window.reshape(1, window_size, n_features).astype(np.float32)
-        ort_outs = model.run(None, {input_name: x_input})
-        pred_s = ort_outs[0][0]
-        pred_s[0] = np.clip(pred_s[0], 0, 1.1)
-        all_stage_predictions.append(pred_s)
-
-        new_row = current_window[-1].copy()
-        new_row[0] = pred_s[0]
-        if n_features > 4 and target_norm_temp is not None:
-            new_row[4] = target_norm_temp
-            if norm_health is not None:
-                new_row[3] = norm_health
-        if n_features >= 9 and sin_h is not None:
-            new_row[5:9] = [sin_h[i], cos_h[i], sin_d[i], cos_d[i]]
-
-        current_window = np.append(current_window[1:], [new_row], axis=0)
-
-    return all_stage_predictions
+    """Запускає ONNX-модель у рекурентному режимі на hours_ahead кроків (одне вікно)."""
+    preds = _run_onnx_inference_batch(
+        model, current_window.reshape(1, window_size, n_features),
+        hours_ahead, [future_ts], [target_norm_temp], [norm_health]
+    )
+    return list(preds[0])
 
 
 def _apply_bias_correction_and_blend(
@@ -189,6 +316,103 @@ def _run_baseline_fallback(hours_ahead, values, last_ts):
         "is_actual_start": [True] + [False] * hours_ahead
     })
 
+@dataclass
+class _ForecastInput:
+    """Підготовлене вікно однієї підстанції перед інференсом."""
+    substation_name: str
+    values: np.ndarray
+    current_window: np.ndarray
+    scale_factor: float
+    original_last_load: float
+    last_ts: pd.Timestamp
+    future_ts: List[pd.Timestamp]
+    target_norm_temp: Optional[float]
+    norm_health: Optional[float]
+    constants: Optional[dict]
+
+
+def _model_window_size(model) -> int:
+    """Глибина вхідного вікна моделі (з ONNX-графа) або DEFAULT_WINDOW_SIZE."""
+    try:
+        return int(model.get_inputs()[0].shape[1]) if model.get_inputs()[0].shape[1] else DEFAULT_WINDOW_SIZE
+    except Exception:
+        return DEFAULT_WINDOW_SIZE
+
+
+def _prepare_forecast_input(
+    substation_name: str,
+    source_type: str,
+    version: str,
+    offset_hours: int,
+    window_size: int,
+    scaler,
+    hours_ahead: int,
+    temp_shift: float,
+    constants: Optional[dict]
+) -> Tuple[Optional[_ForecastInput], Optional[str]]:
+    """Кроки 2-4 конвеєра: вікно телеметрії, масштабування та нормалізовані перезаписи."""
+    values, constants_res, last_ts, _ = get_latest_window(
+        substation_name, source_type, version, offset_hours=offset_hours, window_size=window_size
+    )
+    if hasattr(constants_res, "copy"):
+        merged_consts = constants_res.copy() if constants_res else {}
+        if constants:
+            merged_consts.update(constants)
+        constants = merged_consts
+
+    if values is None:
+        return None, "Input telemetry window is empty or insufficient."
+
+    values = select_features_v2(values, version)
+    n_features = values.shape[1]
+    original_last_load = float(values[-1, 0])
+
+    scale_factor, _ = _compute_scale_factor(values, substation_name, source_type, scaler)
+
+    current_window = scaler.transform(values)
+    target_norm_temp, norm_health = _build_norm_overrides(n_features, current_window, scaler, temp_shift, constants)
+    future_ts = [last_ts + pd.Timedelta(hours=i + 1) for i in range(hours_ahead)]
+
+    return _ForecastInput(
+        substation_name, values, current_window, scale_factor, original_last_load,
+        last_ts, future_ts, target_norm_temp, norm_health, constants
+    ), None
+
+
+def _finalize_forecast(inp: _ForecastInput, preds_p: np.ndarray, scaler, hours_ahead: int) -> pd.DataFrame:
+    """Кроки 6-8 конвеєра: зворотне масштабування, зшивання з фактом та формування результату."""
+    # 6. Inverse Transform
+    n_sc = scaler.n_features_in_
+    dummy = np.zeros((hours_ahead, n_sc))
+    dummy[:, 0] = preds_p[:, 0]
+    if preds_p.shape[1] > 1 and n_sc > 3:
+        dummy[:, 3] = preds_p[:, 1]
+
+    unscaled_raw = scaler.inverse_transform(dummy)
+    load_fc = unscaled_raw[:, 0] / inp.scale_factor
+    health_fc = unscaled_raw[:, 3] if n_sc > 3 else np.full(hours_ahead, 100.0)
+
+    # 7. Bias Correction + Seasonal Blend
+    load_fc = _apply_bias_correction_and_blend(
+        load_fc, inp.original_last_load, inp.values, inp.scale_factor, hours_ahead, inp.substation_name
+    )
+
+    # 8. Формування результату
+    load_stitched = np.insert(load_fc, 0, inp.original_last_load)
+    health_stitched = np.insert(health_fc, 0, inp.constants.get("health", 100.0) if inp.constants else 100.0)
+    all_ts_stitched = [inp.last_ts] + inp.future_ts
+    error_band = np.array(load_stitched) * 0.13
+
+    return pd.DataFrame({
+        "timestamp": all_ts_stitched,
+        "predicted_load_mw": load_stitched,
+        "predicted_health_score": health_stitched,
+        "upper_bond": load_stitched + error_band,
+        "lower_bond": np.maximum(load_stitched - error_band, 0),
+        "is_actual_start": [True] + [False] * hours_ahead
+    })
+
+
 @robust_ml_handler
 def get_ai_forecast(
     hours_ahead: int = 24,
@@ -224,73 +448,26 @@ def get_ai_forecast(
         if model is None or scaler is None:
             return _run_baseline_fallback(hours_ahead, values, last_ts), "Baseline Fallback (AI offline)"
 
-        try:
-            window_size = int(model.get_inputs()[0].shape[1]) if model.get_inputs()[0].shape[1] else DEFAULT_WINDOW_SIZE
-        except Exception:
-            window_size = DEFAULT_WINDOW_SIZE
+        window_size = _model_window_size(model)
 
-        # 2. Отримання вхідного вікна
-        values, constants_res, last_ts, _ = get_latest_window(
-            substation_name, source_type, version, offset_hours=offset_hours, window_size=window_size
+        # 2-4. Вхідне вікно, масштабування під підстанцію, нормалізовані перезаписи
+        inp, error = _prepare_forecast_input(
+            substation_name, source_type, version, offset_hours, window_size,
+            scaler, hours_ahead, temp_shift, constants
         )
-        if hasattr(constants_res, "copy"):
-            merged_consts = constants_res.copy() if constants_res else {}
-            if constants:
-                merged_consts.update(constants)
-            constants = merged_consts
-
-        if values is None:
-            return pd.DataFrame(), "Input telemetry window is empty or insufficient."
-
-        values = select_features_v2(values, version)
-        n_features = values.shape[1]
-        original_last_load = float(values[-1, 0])
-
-        # 3. Масштабування під підстанцію
-        scale_factor, _ = _compute_scale_factor(values, substation_name, source_type, scaler)
-
-        # 4. Підготовка нормалізованих перезаписів
-        current_window = scaler.transform(values)
-        target_norm_temp, norm_health = _build_norm_overrides(n_features, current_window, scaler, temp_shift, constants)
-        future_ts = [last_ts + pd.Timedelta(hours=i + 1) for i in range(hours_ahead)]
+        if inp is None:
+            return pd.DataFrame(), error
 
         # 5. ONNX Inference
         all_stage_predictions = _run_onnx_inference(
-            model, current_window, window_size, n_features,
-            hours_ahead, future_ts, target_norm_temp, norm_health
+            model, inp.current_window, window_size, inp.values.shape[1],
+            hours_ahead, inp.future_ts, inp.target_norm_temp, inp.norm_health
         )
 
-        # 6. Inverse Transform
-        n_sc = scaler.n_features_in_
-        dummy = np.zeros((hours_ahead, n_sc))
-        preds_p = np.array(all_stage_predictions)
-        dummy[:, 0] = preds_p[:, 0]
-        if preds_p.shape[1] > 1 and n_sc > 3:
-            dummy[:, 3] = preds_p[:, 1]
-
-        unscaled_raw = scaler.inverse_transform(dummy)
-        load_fc = unscaled_raw[:, 0] / scale_factor
-        health_fc = unscaled_raw[:, 3] if n_sc > 3 else np.full(hours_ahead, 100.0)
-
-        # 7. Bias Correction + Seasonal Blend
-        load_fc = _apply_bias_correction_and_blend(load_fc, original_last_load, values, scale_factor, hours_ahead, substation_name)
-
-        # 8. Формування результату
-        load_stitched = np.insert(load_fc, 0, original_last_load)
-        health_stitched = np.insert(health_fc, 0, constants.get("health", 100.0) if constants else 100.0)
-        all_ts_stitched = [last_ts] + future_ts
-        error_band = np.array(load_stitched) * 0.13
-
-        df_result = pd.DataFrame({
-            "timestamp": all_ts_stitched,
-            "predicted_load_mw": load_stitched,
-            "predicted_health_score": health_stitched,
-            "upper_bond": load_stitched + error_band,
-            "lower_bond": np.maximum(load_stitched - error_band, 0),
-            "is_actual_start": [True] + [False] * hours_ahead
-        })
-
-        del values, current_window, dummy, unscaled_raw
+        # 6-8. Inverse Transform, Bias Correction, результат
+        df_result = _finalize_forecast(inp, np.array(all_stage_predictions), scaler, hours_ahead)
+
+        del values, inp
         gc.collect()
 
         logger.info(f"🎯 Optimization success: Forecast generated for {substation_name}")
@@ -303,3 +480,81 @@ def get_ai_forecast(
             
         logger.error(f"Prediction Pipeline Failure: {str(exc)}", exc_info=True)
         return pd.DataFrame(), f"System Error: {str(exc)}"
+
+
+@robust_ml_handler
+def get_ai_forecast_batch(
+    substation_names: Sequence[str],
+    hours_ahead: int = 24,
+    source_type: str = "Live",
+    version: str = "v3",
+    offset_hours: int = 0,
+    temp_shift: float = 0.0,
+    constants: dict = None
+) -> Dict[str, Tuple[pd.DataFrame, Optional[str]]]:
+    """
+    Прогноз для кількох підстанцій однією рекурентною розгорткою.
+
+    Вікна всіх підстанцій складаються в тензор (N, window, features), тож на
+    весь набір припадає hours_ahead викликів model.run замість hours_ahead × N.
+    Підготовка вікон та пост-обробка — ті самі, що в get_ai_forecast.
+
+    Returns:
+        {назва підстанції: (DataFrame прогнозу, повідомлення про помилку або None)}.
+    """
+    names = list(dict.fromkeys(n for n in substation_names if n))
+    if not names:
+        return {}
+
+    results: Dict[str, Tuple[pd.DataFrame, Optional[str]]] = {}
+    model, scaler = load_resources(version)
+    window_size = _model_window_size(model) if model is not None else DEFAULT_WINDOW_SIZE
+
+    prepared: List[_ForecastInput] = []
+    for name in names:
+        try:
+            if model is None or scaler is None:
+                values, _, last_ts, _ = get_latest_window(
+                    name, source_type, version, offset_hours=offset_hours, window_size=window_size
+                )
+                results[name] = (
+                    (_run_baseline_fallback(hours_ahead, values, last_ts), "Baseline Fallback (AI offline)")
+                    if values is not None else (pd.DataFrame(), "Telemetry unavailable.")
+                )
+                continue
+            inp, error = _prepare_forecast_input(
+                name, source_type, version, offset_hours, window_size,
+                scaler, hours_ahead, temp_shift, constants
+            )
+        except Exception as e:
+            from src.utils.helpers import StopException, RerunException
+            if isinstance(e, (StopException, RerunException)):
+                raise e
+            inp, error = None, f"Data error: {e}"
+        if inp is None:
+            results[name] = (pd.DataFrame(), error)
+        else:
+            prepared.append(inp)
+
+    if prepared:
+        # 5. ONNX Inference — одна розгортка на всі вікна
+        preds = _run_onnx_inference_batch(
+            model,
+            np.stack([inp.current_window for inp in prepared]),
+            hours_ahead,
+            [inp.future_ts for inp in prepared],
+            [inp.target_norm_temp for inp in prepared],
+            [inp.norm_health for inp in prepared],
+        )
+        for inp, station_preds in zip(prepared, preds):
+            try:
+                results[inp.substation_name] = (_finalize_forecast(inp, station_preds, scaler, hours_ahead), None)
+            except Exception as exc:
+                logger.error(f"Prediction Pipeline Failure ({inp.substation_name}): {exc}", exc_info=True)
+                results[inp.substation_name] = (pd.DataFrame(), f"System Error: {exc}")
+        runs = -(-hours_ahead // _direct_horizon(model))
+        logger.info(f"🎯 Batch forecast: {len(prepared)} substations, {runs} ONNX runs ({version})")
+        del preds, prepared
+        gc.collect()
+
+    return {name: results[name] for name in names}
@@ -48,7 +48,7 @@ def load_data_from_db(version="v3"):
 
     query = """
     SELECT 
-        DATE_TRUNC('hour', lm.timestamp) AS ts,
+        lm.ts_hour                       AS ts,
         s.substation_name,
         SUM(lm.actual_load_mw)           AS load_mw,
         AVG(lm.temperature_c)            AS oil_temp,
@@ -59,9 +59,9 @@ def load_data_from_db(version="v3"):
     JOIN Substations s ON lm.substation_id = s.substation_id
     JOIN Regions r     ON s.region_id = r.region_id
     LEFT JOIN WeatherReports wr 
-           ON DATE_TRUNC('hour', wr.timestamp) = DATE_TRUNC('hour', lm.timestamp)
+           ON wr.ts_hour = lm.ts_hour
            AND wr.region_id = r.region_id
-    GROUP BY DATE_TRUNC('hour', lm.timestamp), s.substation_name
+    GROUP BY lm.ts_hour, s.substation_name
     ORDER BY s.substation_name, ts ASC
     """
 
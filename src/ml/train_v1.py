@@ -51,11 +51,11 @@ def load_v1_data():
         SUM(avg_load) AS load_mw
     FROM (
         SELECT 
-            DATE_TRUNC('hour', lm.timestamp) AS ts,
+            lm.ts_hour                       AS ts,
             lm.substation_id,
             AVG(lm.actual_load_mw)           AS avg_load
         FROM LoadMeasurements lm
-        GROUP BY DATE_TRUNC('hour', lm.timestamp), lm.substation_id
+        GROUP BY lm.ts_hour, lm.substation_id
     ) s
     GROUP BY ts
     ORDER BY ts ASC
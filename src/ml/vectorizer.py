@@ -7,6 +7,8 @@
 - 🎡 Temporal Engineering: Циклічне кодування часу (Sine/Cosine) для відображення сезонності.
 - 🗃️ Versioned Selection: Динамічне формування наборів ознак для різних архітектур моделей (V1-V3).
 - 🪟 Rolling Window: Формування "ковзних вікон" (Sliding Windows) заданої глибини.
+- 🔑 Keyset Fetch: Live-вікно вибирається діапазоном часу по індексу; OFFSET рахує рядки лише всередині цього діапазону.
+- 🔖 Window Watermark: Дешеве визначення останньої години вхідного вікна (без читання самого вікна) для ключа кешу прогнозів.
 - 🩹 Data Imputation: Интелектуальне заповнення пропусків для забезпечення безперервності векторів.
 """
 import numpy as np
@@ -18,6 +20,8 @@ from src.core.database import run_query
 
 # --- CONSTANTS ---
 DEFAULT_WINDOW_SIZE = 48  # Unified 48h horizon for all V3+ models
+WINDOW_GAP_SLACK_HOURS = 24  # Запас діапазону на пропущені години у keyset-вікні
+_ALL_INDICATORS = {"Усі підстанції", "Всі об'єкти", "Всі", "All", "Усі"}
 logger = logging.getLogger(__name__)
 
 
@@ -100,25 +104,24 @@ def _fetch_window_csv(
     window_size: int
 ) -> Tuple[Optional[np.ndarray], Optional[Dict], Optional[pd.Timestamp], Optional[List[str]]]:
     """Завантажує вікно даних із Kaggle CSV-джерела."""
-    from src.core.kaggle_loader import load_kaggle_data
-    df_all = load_kaggle_data()
+    from src.core.kaggle_loader import kaggle_time_bounds, load_kaggle_data
 
+    regions = None
     if substation_name:
-        if isinstance(substation_name, list):
-            df_all = df_all[df_all["substation_name"].isin(substation_name)]
-        else:
-            df_all = df_all[df_all["substation_name"] == substation_name]
-
-    if "actual_load_mw" in df_all.columns:
+        regions = substation_name if isinstance(substation_name, list) else [substation_name]
+
+    # Читаємо лише хвіст історії вибраних регіонів (з запасом на пропуски годин);
+    # якщо після агрегації годин не вистачає — повторюємо без нижньої межі.
+    needed = offset_hours + window_size
+    _, last_ts = kaggle_time_bounds(regions)
+    starts = [None]
+    if last_ts is not None:
+        starts.insert(0, last_ts - pd.Timedelta(hours=needed + WINDOW_GAP_SLACK_HOURS))
+    for start in starts:
+        df_all = load_kaggle_data(regions, start=start, columns=["timestamp", "actual_load_mw"])
         df_all = df_all.groupby("timestamp")["actual_load_mw"].sum().reset_index()
-    elif "load" in df_all.columns:
-        df_all = df_all.groupby("timestamp")["load"].sum().reset_index()
-        df_all.rename(columns={"load": "actual_load_mw"}, inplace=True)
-    else:
-        load_col = [c for c in df_all.columns if "load" in c.lower() or "mw" in c.lower()]
-        if load_col:
-            df_all = df_all.groupby("timestamp")[load_col[0]].sum().reset_index()
-            df_all.rename(columns={load_col[0]: "actual_load_mw"}, inplace=True)
+        if len(df_all) >= needed:
+            break
 
     df_all["temperature_c"] = 25.0
     df_all["h2_ppm"] = 20.0
@@ -137,10 +140,32 @@ def _fetch_window_csv(
     return _prepare_features(df, version, last_ts_col="timestamp")
 
 
-def _build_live_sql(substation_name, is_all: bool, window_size: int, offset_hours: int):
-    """Будує SQL-запит та параметри для Live-джерела даних."""
-    all_indicators = {"Усі підстанції", "Всі об'єкти", "Всі", "All", "Усі"}
-    params = {"limit": window_size, "offset": offset_hours}
+def _build_live_sql(
+    substation_name,
+    is_all: bool,
+    window_size: int,
+    offset_hours: int,
+    end_ts: Optional[pd.Timestamp] = None,
+    bounded: bool = True,
+):
+    """
+    Будує SQL-запит та параметри для Live-джерела даних.
+
+    Вікно вибирається за діапазоном часу (keyset): кінець — end_ts або остання
+    година вимірювань, початок — на offset_hours + window_size +
+    WINDOW_GAP_SLACK_HOURS годин раніше. LIMIT/OFFSET (offset_hours — кількість
+    рядків-годин з даними, як і раніше) застосовуються лише всередині цього
+    діапазону, тому сканується потрібний відрізок індексу (substation_id, ts_hour),
+    і час запиту не росте разом з історією. bounded=False знімає нижню межу —
+    для повтору, коли через пропуски в даних діапазону не вистачило. Дані
+    беруться з погодинного rollup LoadHourly (див. src/core/database/rollup.py).
+    """
+    params = {
+        "limit": window_size,
+        "offset": int(offset_hours),
+    }
+    if bounded:
+        params["span"] = int(offset_hours + window_size + WINDOW_GAP_SLACK_HOURS)
 
     if not is_all:
         if isinstance(substation_name, str):
@@ -149,50 +174,89 @@ def _build_live_sql(substation_name, is_all: bool, window_size: int, offset_hour
         else:
             sub_filter = "s.substation_name = ANY(:sub)"
             params["sub"] = list(substation_name)
+    else:
+        sub_filter = "TRUE"
+
+    if end_ts is not None:
+        params["end_ts"] = pd.Timestamp(end_ts).isoformat()
+        anchor_cte = """
+        bounds AS (
+            SELECT DATE_TRUNC('hour', CAST(:end_ts AS timestamptz)) AS end_hour
+        )"""
+    else:
+        # Остання година по кожній підстанції — один index-only seek на підстанцію
+        anchor_cte = f"""
+        bounds AS (
+            SELECT DATE_TRUNC('hour', MAX(latest.last_ts)) AS end_hour
+            FROM Substations s
+            CROSS JOIN LATERAL (
+                SELECT MAX(lh.ts_hour) AS last_ts
+                FROM LoadHourly lh
+                WHERE lh.substation_id = s.substation_id
+            ) latest
+            WHERE {sub_filter}
+        )"""
+
+    window_cte = """
+        win AS (
+            SELECT end_hour - make_interval(hours => :span) AS lo,
+                   end_hour + INTERVAL '1 hour'              AS hi
+            FROM bounds
+        )""" if bounded else """
+        win AS (
+            SELECT end_hour + INTERVAL '1 hour' AS hi
+            FROM bounds
+        )"""
+    lower = "AND lh.ts_hour >= (SELECT lo FROM win)" if bounded else ""
 
+    if not is_all:
         sql = f"""
+        WITH {anchor_cte},{window_cte}
         SELECT
-            SUM(lm.actual_load_mw) AS actual_load_mw,
-            AVG(lm.temperature_c) AS temperature_c,
-            AVG(lm.h2_ppm) AS h2_ppm,
-            AVG(lm.health_score) AS health_score,
-            AVG(COALESCE(wr.temperature, 15.0)) AS air_temp,
-            DATE_TRUNC('hour', lm.timestamp) AS timestamp
-        FROM LoadMeasurements lm
-        JOIN Substations s ON lm.substation_id = s.substation_id
-        JOIN Regions r ON s.region_id = r.region_id
-        LEFT JOIN WeatherReports wr
-               ON DATE_TRUNC('hour', wr.timestamp) = DATE_TRUNC('hour', lm.timestamp)
-               AND wr.region_id = r.region_id
+            SUM(lh.load_sum_mw) AS actual_load_mw,
+            AVG(lh.oil_temp_avg) AS temperature_c,
+            AVG(lh.h2_ppm_avg) AS h2_ppm,
+            AVG(lh.health_avg) AS health_score,
+            AVG(COALESCE(lh.air_temp, 15.0)) AS air_temp,
+            lh.ts_hour AS timestamp
+        FROM LoadHourly lh
+        JOIN Substations s ON lh.substation_id = s.substation_id
         WHERE {sub_filter}
-        GROUP BY 6 ORDER BY timestamp DESC LIMIT :limit OFFSET :offset
+          {lower}
+          AND lh.ts_hour <  (SELECT hi FROM win)
+        GROUP BY lh.ts_hour ORDER BY timestamp DESC LIMIT :limit OFFSET :offset
         """
     else:
-        sql = """
-        SELECT SUM(avg_load) AS actual_load_mw, AVG(avg_temp) AS temperature_c,
-               AVG(avg_h2) AS h2_ppm, AVG(avg_health) AS health_score,
-               AVG(avg_air) AS air_temp, ts
-        FROM (
-            SELECT DATE_TRUNC('hour', lm.timestamp) AS ts, lm.substation_id,
-                   AVG(lm.actual_load_mw) AS avg_load, AVG(lm.temperature_c) AS avg_temp,
-                   AVG(lm.h2_ppm) AS avg_h2, AVG(lm.health_score) AS avg_health,
-                   AVG(COALESCE(wr.temperature, 15.0)) AS avg_air
-            FROM LoadMeasurements lm
-            LEFT JOIN WeatherReports wr
-                ON DATE_TRUNC('hour', wr.timestamp) = DATE_TRUNC('hour', lm.timestamp)
-            GROUP BY 1, 2
-        ) sub_agg GROUP BY ts ORDER BY ts DESC LIMIT :limit OFFSET :offset
+        sql = f"""
+        WITH {anchor_cte},{window_cte}
+        SELECT SUM(lh.load_avg_mw) AS actual_load_mw, AVG(lh.oil_temp_avg) AS temperature_c,
+               AVG(lh.h2_ppm_avg) AS h2_ppm, AVG(lh.health_avg) AS health_score,
+               AVG(COALESCE(lh.air_temp, 15.0)) AS air_temp, lh.ts_hour AS ts
+        FROM LoadHourly lh
+        WHERE lh.ts_hour <  (SELECT hi FROM win)
+          {lower}
+        GROUP BY lh.ts_hour ORDER BY ts DESC LIMIT :limit OFFSET :offset
         """
 
     return sql, params
 
 
+def _is_all_substations(substation_name) -> bool:
+    """Чи означає ідентифікатор агрегат по всій мережі."""
+    if not substation_name:
+        return True
+    if isinstance(substation_name, (list, tuple)):
+        return any(x in _ALL_INDICATORS for x in substation_name)
+    return substation_name in _ALL_INDICATORS
+
+
 def get_latest_window(
     substation_name: Optional[str],
     source_type: str = "Live",
     version: str = "v3",
     offset_hours: int = 0,
-    window_size: int = DEFAULT_WINDOW_SIZE
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    end_ts: Optional[pd.Timestamp] = None
 ) -> Tuple[Optional[np.ndarray], Optional[Dict[str, float]], Optional[pd.Timestamp], Optional[List[str]]]:
     """Fetches and prepares the most recent data window for forecasting.
 
@@ -200,18 +264,14 @@ def get_latest_window(
         substation_name: Substation identifier (None for global).
         source_type: 'Live' (DB) or 'CSV' (Kaggle).
         version: Model version for feature selection.
-        offset_hours: Rolling offset for backtesting.
+        offset_hours: Rolling offset for backtesting (data rows/hours skipped before the window end).
         window_size: Number of hours to look back.
+        end_ts: Explicit window end (Live only); defaults to the latest measured hour.
 
     Returns:
         Tuple: (Input array, Last observed constants, Last timestamp, Feature names).
     """
-    all_indicators = {"Усі підстанції", "Всі об'єкти", "Всі", "All", "Усі"}
-    is_all = (
-        not substation_name
-        or (isinstance(substation_name, list) and any(x in all_indicators for x in substation_name))
-        or substation_name in all_indicators
-    )
+    is_all = _is_all_substations(substation_name)
     if is_all:
         substation_name = None
 
@@ -220,9 +280,13 @@ def get_latest_window(
         return _fetch_window_csv(substation_name, version, offset_hours, window_size)
 
     # Branch B: Live DB
-    sql, params = _build_live_sql(substation_name, is_all, window_size, offset_hours)
-
-    df = run_query(sql, params)
+    # Спершу — обмежений діапазон; якщо пропуски в даних довші за запас,
+    # повторюємо без нижньої межі (як повтор без start у _fetch_window_csv).
+    for bounded in (True, False):
+        sql, params = _build_live_sql(substation_name, is_all, window_size, offset_hours, end_ts, bounded)
+        df = run_query(sql, params)
+        if len(df) >= window_size:
+            break
     if df.empty or len(df) < window_size:
         return None, None, None, None
 
@@ -236,3 +300,54 @@ def get_latest_window(
         df.ffill().bfill(inplace=True)
 
     return _prepare_features(df, version, last_ts_col="ts")
+
+
+def get_window_watermarks(
+    substation_names: List[Any],
+    source_type: str = "Live",
+) -> Dict[Any, Optional[pd.Timestamp]]:
+    """Returns the last hour each forecast input window would end at, without fetching the windows.
+
+    Це та сама година, від якої get_latest_window відраховує вікно (offset_hours=0),
+    тож зміна водяного знака означає появу нової години даних.
+
+    Args:
+        substation_names: Identifiers as accepted by get_latest_window (str, list or "all" marker).
+        source_type: 'Live' (DB) or 'CSV' (Kaggle).
+
+    Returns:
+        {identifier: last hour or None}; list identifiers are keyed as tuples.
+    """
+    keys = [tuple(n) if isinstance(n, list) else n for n in substation_names]
+    result: Dict[Any, Optional[pd.Timestamp]] = {}
+
+    if source_type == "CSV":
+        from src.core.kaggle_loader import kaggle_time_bounds
+        for key in keys:
+            regions = None if _is_all_substations(key) else (list(key) if isinstance(key, tuple) else [key])
+            result[key] = kaggle_time_bounds(regions)[1]
+        return result
+
+    # Live: остання година rollup по кожній підстанції — один index-only seek на підстанцію
+    df = run_query("""
+        SELECT s.substation_name, DATE_TRUNC('hour', latest.last_ts) AS last_hour
+        FROM Substations s
+        CROSS JOIN LATERAL (
+            SELECT MAX(lh.ts_hour) AS last_ts
+            FROM LoadHourly lh
+            WHERE lh.substation_id = s.substation_id
+        ) latest
+    """)
+    per_sub = {} if df.empty else {
+        name: (None if pd.isna(ts) else pd.Timestamp(ts))
+        for name, ts in zip(df["substation_name"], df["last_hour"])
+    }
+    known = [ts for ts in per_sub.values() if ts is not None]
+    for key in keys:
+        if _is_all_substations(key):
+            result[key] = max(known) if known else None
+        else:
+            members = [per_sub.get(n) for n in (key if isinstance(key, tuple) else [key])]
+            members = [ts for ts in members if ts is not None]
+            result[key] = max(members) if members else None
+    return result
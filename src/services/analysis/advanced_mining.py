@@ -138,7 +138,7 @@ def run_classification_prediction():
         CASE WHEN (l.actual_load_mw / s.capacity_mw) > 0.95 THEN 1 ELSE 0 END as is_critical
     FROM LoadMeasurements l
     JOIN Substations s ON l.substation_id = s.substation_id
-    JOIN WeatherReports w ON l.timestamp = w.timestamp AND s.region_id = w.region_id
+    JOIN WeatherReports w ON l.ts_hour = w.ts_hour AND s.region_id = w.region_id
     LIMIT 50000;
     """
     df = get_data(sql)
@@ -16,6 +16,8 @@ from psycopg2.extras import execute_values
 
 from src.core.config import END_DATE, FREQ, LOAD_PROFILES, START_DATE
 from src.core.database import execute_sql_file, get_db_cursor
+from src.core.database.partitions import ensure_partitions
+from src.core.database.rollup import bump_rollup_version, ensure_rollup_schema, refresh_hourly_rollup
 from src.core.logger import setup_logger
 from src.core.physics import (
     calculate_energy_price,
@@ -56,6 +58,9 @@ def _ensure_schema(cursor):
             "WeatherReports, EnergyPricing, LineMeasurements, Alerts CASCADE;"
         )
         cursor.execute(truncate_sql)
+        # Rollup будується з нуля після запису нових рядів
+        ensure_rollup_schema(cursor)
+        cursor.execute("TRUNCATE TABLE LoadHourly, RollupWatermarks;")
 
 
 def _load_static_data(cursor) -> tuple:
@@ -169,6 +174,9 @@ def generate_professional_data():
         # 1. Ініціалізація / очищення схеми
         _ensure_schema(cursor)
 
+        # 1.1 Місячні партиції на весь період симуляції (+ наперед)
+        ensure_partitions(cursor, start=START_DATE.date())
+
         # 2. Завантаження довідників
         substations, generators, lines, regions, sub_profiles = _load_static_data(cursor)
 
@@ -180,5 +188,11 @@ def generate_professional_data():
         # 4. Пакетний запис у БД
         _batch_insert(cursor, data_weather, data_prices, data_loads, data_generation, data_lines, data_alerts)
 
+        # 5. Погодинний rollup для аналітики
+        refresh_hourly_rollup(cursor, full=True)
+
+    # Версія LoadHourly скидається лише після commit (вихід з get_db_cursor)
+    bump_rollup_version()
+
     logger.info(f"✅ Успішно! Згенеровано {len(data_loads)} записів навантаження.")
     return sub_profiles, dict.fromkeys(regions, 10.0)
@@ -3,97 +3,242 @@
 ======================================================
 Модуль для інтеграції зовнішніх історичних датасетів у систему Atlas.
 Ключові можливості:
-1. Automated CSV Parsing: зчитування та стандартизація часових рядів з великих файлів.
-2. Data Cleansing & Sorting: конвертація типів, обробка пропусків та сортування.
-3. Isolated Storage Architecture: завантаження даних у таблицю RealLoadMeasurements.
-4. Batch Processing: швидка пакетна вставка десятків тисяч записів через psycopg2.
+1. Streaming CSV Parsing: будь-які data/*_hourly.csv читаються порціями, без списку кортежів на весь файл.
+2. COPY Ingestion: порції передаються через COPY FROM STDIN у нежурнальовану (UNLOGGED) staging-таблицю.
+3. Region-keyed Storage: таблиця RealLoadMeasurements з ключем (region_name, timestamp) для всіх регіонів архіву.
+4. Set-based Upsert: один INSERT ... SELECT ... ON CONFLICT DO UPDATE на весь прогін (дублікати DST відкидаються).
+5. Progress Reporting: кількість рядків і швидкість (рядків/с) по кожній порції та фазі.
 Служить містком для валідації ШІ-моделей на основі реальних світових показників.
 """
+import argparse
+import glob
+import io
 import os
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # ATLAS_PASSPORT: docs/system/map/import_real_data.md
 import pandas as pd
 import psycopg2
 from dotenv import load_dotenv
-from psycopg2.extras import execute_values
 
 # Завантажуємо конфігурацію БД
 load_dotenv()
 from src.core.config import DB_CONFIG
+from src.core.kaggle_loader import DATA_DIR, KAGGLE_MAPPING, _prefix
 
+CHUNK_ROWS = int(os.getenv("REAL_IMPORT_CHUNK_ROWS", "100000"))
+STAGING_TABLE = "RealLoadStaging"
+_ADVISORY_LOCK_KEY = 7_420_019  # Один імпорт одночасно: staging-таблиця спільна
 
-def import_real_data(csv_path="AEP_hourly.csv"):
+REAL_LOAD_DDL = [
     """
-    Зчитує реальні дані з CSV (формат: Datetime, AEP_MW)
-    і заливає їх у нову ізольованую таблицю.
-    """
-    print("⏳ Очищення та зчитування CSV...")
+    CREATE TABLE IF NOT EXISTS RealLoadMeasurements (
+        region_name VARCHAR(100) NOT NULL,
+        timestamp TIMESTAMPTZ NOT NULL,
+        actual_load_mw DECIMAL(10, 2) NOT NULL,
+        PRIMARY KEY (region_name, timestamp)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_real_load_ts ON RealLoadMeasurements (timestamp);",
+    f"""
+    CREATE UNLOGGED TABLE IF NOT EXISTS {STAGING_TABLE} (
+        region_name TEXT NOT NULL,
+        seq BIGINT NOT NULL,
+        timestamp TIMESTAMP NOT NULL,
+        actual_load_mw DOUBLE PRECISION
+    );
+    """,
+]
+
+# Стара схема (лише AEP, UNIQUE(timestamp)) → ключ (region_name, timestamp)
+_LEGACY_UPGRADE = [
+    f"ALTER TABLE RealLoadMeasurements ADD COLUMN region_name VARCHAR(100) NOT NULL DEFAULT '{KAGGLE_MAPPING['AEP']}';",
+    "ALTER TABLE RealLoadMeasurements ALTER COLUMN region_name DROP DEFAULT;",
+    "ALTER TABLE RealLoadMeasurements DROP CONSTRAINT IF EXISTS realloadmeasurements_timestamp_key;",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_real_load_region_ts ON RealLoadMeasurements (region_name, timestamp);",
+]
+
+# Kaggle-мітки без зони трактуються як UTC; з дублікатів (перехід DST) лишається перший рядок файлу
+_MERGE_SQL = f"""
+    INSERT INTO RealLoadMeasurements (region_name, timestamp, actual_load_mw)
+    SELECT DISTINCT ON (region_name, timestamp)
+        region_name, timestamp AT TIME ZONE 'UTC', ROUND(actual_load_mw::numeric, 2)
+    FROM {STAGING_TABLE}
+    WHERE actual_load_mw IS NOT NULL
+    ORDER BY region_name, timestamp, seq
+    ON CONFLICT (region_name, timestamp) DO UPDATE
+        SET actual_load_mw = EXCLUDED.actual_load_mw
+        WHERE RealLoadMeasurements.actual_load_mw IS DISTINCT FROM EXCLUDED.actual_load_mw;
+"""
 
-    if not os.path.exists(csv_path):
-        print(f"❌ Файл {csv_path} не знайдено!")
-        return
 
-    # Читаємо датасет: pandas сам визначить типи
-    df = pd.read_csv(csv_path)
+def region_name_for(csv_path: str) -> str:
+    """Розгорнута назва регіону за префіксом файлу (AEP_hourly.csv → KAGGLE_MAPPING['AEP'])."""
+    prefix = _prefix(csv_path)
+    return KAGGLE_MAPPING.get(prefix.upper(), prefix)
 
-    # Конвертуємо час у правильний формат і сортуємо в хронологічному порядку
-    df["Datetime"] = pd.to_datetime(df["Datetime"])
-    df = df.sort_values("Datetime")
 
-    # Видаляємо дублікати (якщо є) щоб уникнути помилок
-    df = df.drop_duplicates(subset=["Datetime"])
+def iter_copy_chunks(csv_path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[io.StringIO, int]]:
+    """
+    Читає Kaggle CSV (Datetime, <PREFIX>_MW) порціями та перетворює кожну
+    на CSV-буфер для COPY: region_name, seq, timestamp, actual_load_mw.
 
-    print(f"✅ Зчитано {len(df)} записів. Підключення до бази...")
+    Час не розбирається в Python — рядок передається як є, його парсить PostgreSQL.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    load_col = next((c for c in header if str(c).upper().endswith("_MW")), None)
+    if "Datetime" not in header or load_col is None:
+        raise ValueError(f"{os.path.basename(csv_path)}: очікуються колонки Datetime та *_MW")
+
+    region = region_name_for(csv_path)
+    seq = 0
+    reader = pd.read_csv(
+        csv_path,
+        usecols=["Datetime", load_col],
+        dtype={"Datetime": str, load_col: "float64"},
+        chunksize=chunk_rows,
+    )
+    for chunk in reader:
+        n = len(chunk)
+        out = pd.DataFrame({
+            "region_name": region,
+            "seq": range(seq, seq + n),
+            "timestamp": chunk["Datetime"].to_numpy(),
+            "actual_load_mw": chunk[load_col].to_numpy(),
+        })
+        seq += n
+        buffer = io.StringIO()
+        out.to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+        yield buffer, n
+
+
+def _has_column(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+        (table.lower(), column),
+    )
+    return cursor.fetchone() is not None
+
+
+def ensure_real_load_schema(cursor) -> None:
+    """Створює/оновлює RealLoadMeasurements та staging-таблицю (ідемпотентно)."""
+    legacy = _has_column(cursor, "RealLoadMeasurements", "timestamp") and not _has_column(
+        cursor, "RealLoadMeasurements", "region_name"
+    )
+    if legacy:
+        for q in _LEGACY_UPGRADE:
+            cursor.execute(q)
+    for q in REAL_LOAD_DDL:
+        cursor.execute(q)
+
+
+def ingest_real_data(
+    csv_paths: Iterable[str],
+    conn=None,
+    chunk_rows: int = CHUNK_ROWS,
+    report: Callable[[str], None] = print,
+) -> Dict[str, float]:
+    """
+    Завантажує Kaggle CSV у RealLoadMeasurements: COPY у staging → один upsert.
 
-    try:
+    Увесь прогін — одна транзакція під advisory-lock: або всі файли, або нічого.
+
+    Args:
+        csv_paths: Шляхи до *_hourly.csv.
+        conn: Відкрите psycopg2-з'єднання (None — власне за DB_CONFIG).
+        chunk_rows: Рядків CSV на одну порцію COPY.
+        report: Функція виводу прогресу.
+
+    Returns:
+        Статистика: staged, merged, copy_s, merge_s, rows_per_s.
+    """
+    csv_paths = list(csv_paths)
+    own_conn = conn is None
+    if own_conn:
         conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-
-        # 1. СТВОРЕННЯ ТАБЛИЦІ (якщо немає)
-        # Синтетичні дані (LoadMeasurements) ми НЕ чіпаємо!
-        print("🏗️ Перевірка таблиці RealLoadMeasurements...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS RealLoadMeasurements (
-                id BIGINT PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
-                timestamp TIMESTAMPTZ NOT NULL UNIQUE,
-                actual_load_mw DECIMAL(10, 2) NOT NULL
-            );
-            CREATE INDEX IF NOT EXISTS idx_real_load_ts ON RealLoadMeasurements(timestamp);
-        """)
-
-        # Можемо очистити реальні дані перед новим заливанням (опціонально)
-        # cursor.execute("TRUNCATE TABLE RealLoadMeasurements;")
-
-        # 2. ПІДГОТОВКА ДАНИХ ДЛЯ ІНСЕРТУ
-        # psycopg2.extras.execute_values очікує список кортежів (list of tuples)
-        data_tuples = list(
-            df[["Datetime", "AEP_MW"]].itertuples(index=False, name=None)
-        )
-
-        # 3. ВСТАВКА
-        print("💾 Масовий запис даних (Batch Insert)... Це може зайняти хвилину-дві.")
-
-        # ON CONFLICT DO NOTHING дозволяє безпечно перезапускати скрипт без помилок про дублікати
-        query = """
-            INSERT INTO RealLoadMeasurements (timestamp, actual_load_mw) 
-            VALUES %s 
-            ON CONFLICT (timestamp) DO NOTHING;
-        """
-
-        execute_values(cursor, query, data_tuples)
 
+    stats = {"staged": 0, "merged": 0, "copy_s": 0.0, "merge_s": 0.0, "rows_per_s": 0.0}
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_ADVISORY_LOCK_KEY,))
+            ensure_real_load_schema(cursor)
+            cursor.execute(f"TRUNCATE {STAGING_TABLE};")
+
+            started = time.perf_counter()
+            for csv_path in csv_paths:
+                region = region_name_for(csv_path)
+                for buffer, n in iter_copy_chunks(csv_path, chunk_rows):
+                    cursor.copy_expert(
+                        f"COPY {STAGING_TABLE} (region_name, seq, timestamp, actual_load_mw) "
+                        "FROM STDIN WITH (FORMAT csv)",
+                        buffer,
+                    )
+                    stats["staged"] += n
+                    elapsed = time.perf_counter() - started
+                    report(f"📥 {region}: +{n} (всього {stats['staged']}, {stats['staged'] / max(elapsed, 1e-9):,.0f} рядків/с)")
+            stats["copy_s"] = time.perf_counter() - started
+
+            report("🔀 Злиття staging → RealLoadMeasurements...")
+            started = time.perf_counter()
+            cursor.execute(_MERGE_SQL)
+            stats["merged"] = max(cursor.rowcount, 0)
+            cursor.execute(f"TRUNCATE {STAGING_TABLE};")
+            stats["merge_s"] = time.perf_counter() - started
         conn.commit()
-        print("🎉 Імпорт успішно завершено! Дані готові до використання в ML та UI.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+    total_s = stats["copy_s"] + stats["merge_s"]
+    stats["rows_per_s"] = stats["staged"] / total_s if total_s else 0.0
+    report(
+        f"🎉 Імпорт завершено: {stats['staged']} рядків за {total_s:.1f} с "
+        f"({stats['rows_per_s']:,.0f} рядків/с), змінено {stats['merged']}."
+    )
+    return stats
+
+
+def resolve_csv_paths(patterns: Optional[List[str]] = None, data_dir: str = DATA_DIR) -> List[str]:
+    """Файли для імпорту: явні шляхи/маски або всі data/*_hourly.csv."""
+    if not patterns:
+        return sorted(glob.glob(os.path.join(data_dir, "*_hourly.csv")))
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or sorted(glob.glob(os.path.join(data_dir, pattern)))
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
 
+def import_real_data(csv_path=None):
+    """
+    Зчитує реальні дані з CSV (формат: Datetime, <PREFIX>_MW) і заливає їх
+    в ізольовану таблицю RealLoadMeasurements. None — увесь архів data/*_hourly.csv.
+    """
+    csv_paths = resolve_csv_paths([csv_path] if csv_path else None)
+    if not csv_paths:
+        print(f"❌ Файл {csv_path or os.path.join(DATA_DIR, '*_hourly.csv')} не знайдено!")
+        return None
+    print(f"⏳ Імпорт {len(csv_paths)} файлів: {', '.join(os.path.basename(p) for p in csv_paths)}")
+    try:
+        return ingest_real_data(csv_paths)
     except Exception as e:
-        if conn:
-            conn.rollback()
         print(f"❌ Помилка бази даних: {e}")
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
+        return None
 
 
 if __name__ == "__main__":
-    import_real_data()
+    parser = argparse.ArgumentParser(description="Bulk-імпорт Kaggle *_hourly.csv у RealLoadMeasurements (COPY + upsert)")
+    parser.add_argument("files", nargs="*", help="Шляхи або маски (за замовчуванням — усі data/*_hourly.csv)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Рядків на одну порцію COPY")
+    args = parser.parse_args()
+
+    paths = resolve_csv_paths(args.files)
+    if not paths:
+        print("❌ Файли для імпорту не знайдено!")
+    else:
+        ingest_real_data(paths, chunk_rows=args.chunk_rows)
@@ -7,9 +7,16 @@
 1. Digital Twin Expansion: розширення таблиць фізичними параметрами (напруга, частота, H2).
 2. Idempotent Updates: використання конструкцій IF NOT EXISTS для безпечних оновлень.
 3. ML Compatibility: синхронізація схеми телеметрії з вимогами моделей V2 та V3.
+4. Time Partitioning: конвертація таблиць вимірювань у щомісячні RANGE-партиції з BRIN-індексами.
+5. Hour Join Key: збережена колонка ts_hour (LoadMeasurements, WeatherReports) з індексами.
+6. Hourly Rollup: створення та початкове заповнення таблиці LoadHourly.
+7. Precomputed Forecasts: таблиця Forecasts для фонового воркера прогнозів.
 Забезпечує актуальність структури даних при розширенні функціоналу системи.
 """
-from src.core.database import execute_update
+from src.core.database import execute_update, get_db_cursor
+from src.core.database.partitions import PARTITIONED_TABLES, convert_to_partitioned, maintain_partitions
+from src.core.database.forecasts import FORECASTS_DDL
+from src.core.database.rollup import ROLLUP_DDL, refresh_hourly_rollup
 
 
 def migrate():
@@ -28,6 +35,50 @@ def migrate():
         success = execute_update(q)
         print(f"Executed: {q} -> {'SUCCESS' if success else 'FAILED'}")
 
+    print("Running DB Migration: Monthly partitioning of measurement tables...")
+    for table in PARTITIONED_TABLES:
+        try:
+            with get_db_cursor() as (_, cursor):
+                converted = convert_to_partitioned(cursor, table)
+            print(f"Partitioning {table} -> {'CONVERTED' if converted else 'ALREADY PARTITIONED'}")
+        except Exception as e:
+            print(f"Partitioning {table} -> FAILED ({e})")
+
+    try:
+        created, retired = maintain_partitions()
+        print(f"Partition maintenance -> SUCCESS ({created} created, {len(retired)} retired)")
+    except Exception as e:
+        print(f"Partition maintenance -> FAILED ({e})")
+
+    print("Running DB Migration: ts_hour join key for weather alignment...")
+    hour_queries = [
+        "ALTER TABLE LoadMeasurements ADD COLUMN IF NOT EXISTS ts_hour TIMESTAMPTZ "
+        "GENERATED ALWAYS AS (date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') STORED;",
+        "ALTER TABLE WeatherReports ADD COLUMN IF NOT EXISTS ts_hour TIMESTAMPTZ "
+        "GENERATED ALWAYS AS (date_trunc('hour', timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') STORED;",
+        "CREATE INDEX IF NOT EXISTS idx_load_sub_hour ON LoadMeasurements (substation_id, ts_hour);",
+        "CREATE INDEX IF NOT EXISTS idx_weather_region_hour ON WeatherReports (region_id, ts_hour);",
+    ]
+    for q in hour_queries:
+        success = execute_update(q)
+        print(f"Executed: {q} -> {'SUCCESS' if success else 'FAILED'}")
+
+    print("Running DB Migration: Hourly rollup (LoadHourly)...")
+    for q in ROLLUP_DDL:
+        success = execute_update(q)
+        print(f"Executed: {' '.join(q.split())[:60]}... -> {'SUCCESS' if success else 'FAILED'}")
+
+    try:
+        rows = refresh_hourly_rollup(full=True)
+        print(f"Rollup backfill -> SUCCESS ({rows} hourly rows)")
+    except Exception as e:
+        print(f"Rollup backfill -> FAILED ({e})")
+
+    print("Running DB Migration: Precomputed forecasts (Forecasts)...")
+    for q in FORECASTS_DDL:
+        success = execute_update(q)
+        print(f"Executed: {' '.join(q.split())[:60]}... -> {'SUCCESS' if success else 'FAILED'}")
+
 
 if __name__ == "__main__":
     migrate()
@@ -17,6 +17,8 @@ from datetime import datetime
 from typing import Optional
 
 from src.core.database import get_db_cursor
+from src.core.database.partitions import maintain_partitions
+from src.core.database.rollup import bump_rollup_version, refresh_hourly_rollup
 from src.core.logger import setup_logger
 from src.core.physics import calculate_substation_load, calculate_weather
 from src.services.simulation.generator_constants import BASE_CAPACITY_MAP
@@ -106,6 +108,16 @@ def _process_sensor_tick(substations, sub_profiles, previous_factors, current_he
         conn.commit()
         logger.info(f"[{now.strftime('%H:%M:%S')}] ✅ Всі {len(substations)} записів збережено.")
 
+        # Інкрементально дозбираємо поточну годину в LoadHourly
+        try:
+            refresh_hourly_rollup(cursor)
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"⚠️ Rollup не оновлено: {e}")
+
+    # Версія LoadHourly скидається лише після commit rollup (вихід з get_db_cursor)
+    bump_rollup_version()
+
 
 def run_realtime_sensors(sub_profiles: Optional[dict] = None, current_temps: Optional[dict] = None):
     """
@@ -121,6 +133,7 @@ def run_realtime_sensors(sub_profiles: Optional[dict] = None, current_temps: Opt
     substations, sub_profiles, previous_factors, current_health, current_temps = result
 
     last_weather_hour = -1
+    last_partition_day = None
     weather_map = {}
 
     try:
@@ -133,6 +146,14 @@ def run_realtime_sensors(sub_profiles: Optional[dict] = None, current_temps: Opt
                 weather_map = calculate_weather(now, current_temps)
                 last_weather_hour = current_hour
 
+            # Раз на добу: партиції наперед + retention
+            if now.date() != last_partition_day:
+                try:
+                    maintain_partitions()
+                except Exception as e:
+                    logger.warning(f"⚠️ Обслуговування партицій не вдалося: {e}")
+                last_partition_day = now.date()
+
             logger.info(f"[{now.strftime('%H:%M:%S')}] ⏳ Цикл (Година: {current_hour}:00)...")
             _process_sensor_tick(substations, sub_profiles, previous_factors, current_health, weather_map, now, is_weekend)
             time.sleep(5)
@@ -0,0 +1,57 @@
+# ATLAS_PASSPORT: docs/system/map/ui_query_diagnostics.md
+"""
+ПАНЕЛЬ ДІАГНОСТИКИ ЗАПИТІВ (Query Diagnostics Panel)
+===================================================
+Компактний огляд профілю запитів до БД для пошуку "гарячих" місць під реальним навантаженням.
+Забезпечує:
+1. Hot Queries: топ відбитків SQL за сумарним часом (виклики, p50/p95, рядки, обсяг, кеш).
+2. Pool & Cache: стан пулу з'єднань та кешу результатів.
+3. Slow Plans: збережені EXPLAIN (ANALYZE, BUFFERS) повільних запитів.
+4. JSON Export: завантаження повного знімка профілю.
+"""
+import pandas as pd
+import streamlit as st
+
+from src.core.database import PROFILER, dump_query_profile, get_query_profile
+
+_TABLE_COLUMNS = [
+    "fingerprint", "kind", "calls", "p50_ms", "p95_ms", "max_ms", "total_ms",
+    "rows", "bytes", "cache_hits", "cache_misses", "retries", "errors", "sql",
+]
+
+
+def render_query_diagnostics(container=st.sidebar, limit: int = 15):
+    """Рендерить панель профілю запитів у вказаному контейнері (за замовчуванням — сайдбар)."""
+    with container.expander("🩺 Query Profile"):
+        if not PROFILER.enabled:
+            st.caption("Профілювання вимкнено (QUERY_PROFILING=0).")
+            return
+
+        profile = get_query_profile(limit)
+        queries = profile["queries"]
+        if not queries:
+            st.caption("Запитів ще не зафіксовано.")
+        else:
+            df = pd.DataFrame(queries)[_TABLE_COLUMNS]
+            df["kb"] = (df.pop("bytes") / 1024).round(1)
+            st.dataframe(df, hide_index=True, use_container_width=True)
+
+        cache = profile["result_cache"]
+        st.caption(f"Cache: {cache.get('memory_entries', 0)} entries, {cache.get('memory_mb', 0)} MB")
+        for name, pool in profile["pool"].items():
+            st.caption(
+                f"Pool '{name}': {pool['in_use']}/{pool['max_size']} in use, "
+                f"avg wait {pool['avg_wait_ms']} ms, timeouts {pool['timeouts']}"
+            )
+
+        for q in queries:
+            if q["plan"] is not None:
+                st.markdown(f"**🐢 {q['fingerprint']}** · {q['p95_ms']} ms p95")
+                st.json(q["plan"], expanded=False)
+
+        st.download_button(
+            "⬇️ JSON", dump_query_profile(path=None),
+            file_name="query_profile.json", mime="application/json",
+        )
+        if st.button("♻️ Скинути профіль", key="reset_query_profile"):
+            PROFILER.reset()
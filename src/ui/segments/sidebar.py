@@ -53,6 +53,8 @@ def render_sidebar(data):
     heartbeat_path.touch() # Оновлюємо час модифікації файлу
 
     if st.sidebar.button("🔄 Оновити дані", type="primary"):
+        from src.core.database.loader import invalidate_dashboard_data
+        invalidate_dashboard_data(full=True)
         st.cache_data.clear()
         st.rerun()
 
@@ -256,6 +258,8 @@ def render_sidebar(data):
                 try:
                     generate_professional_data()
                     st.success("✅ Базу відновлено!")
+                    from src.core.database.loader import invalidate_dashboard_data
+                    invalidate_dashboard_data(full=True)
                     st.cache_data.clear()
                     st.rerun()
                 except Exception as e:
@@ -271,9 +275,28 @@ def render_sidebar(data):
     st.sidebar.write(f"RAM Usage: :{color}[**{usage:.1f} MB**]")
     st.sidebar.caption(f"Status: {status} (Limit: 512MB)")
 
+    from src.core.database.shared_store import shared_store_stats
+    for store in shared_store_stats().values():
+        if store["version"] is not None:
+            st.sidebar.caption(
+                f"Shared data v{store['version']}: {store['mb']} MB, "
+                f"{sum(store['leases'].values())} sessions"
+            )
+
+    from src.ml.forecast_cache import forecast_cache_stats
+    forecast_stats = forecast_cache_stats()
+    if forecast_stats["hits"] or forecast_stats["misses"]:
+        st.sidebar.caption(
+            f"Forecast cache: {forecast_stats['hits']} hits / {forecast_stats['misses']} misses "
+            f"({forecast_stats['hit_rate']:.0%}), {forecast_stats['compute_s']} s inference"
+        )
+
     if top_objs:
         with st.sidebar.expander("🔍 Top Objects"):
             for name, size in top_objs:
                 st.caption(f"{name}: {size:.1f} MB")
 
+    from src.ui.components.query_diagnostics import render_query_diagnostics
+    render_query_diagnostics()
+
     return selected_region, date_range, data_source, selected_substation
@@ -21,6 +21,7 @@ from src.services.data.db_services import (
     update_alert_status,
 )
 from src.core import database as db
+from src.core.database.loader import invalidate_dashboard_data
 
 
 def render(df_alerts):
@@ -74,6 +75,7 @@ def render(df_alerts):
             if success:
                 st.toast("✅ Додано! Перевірте таблицю нижче.", icon="📅")
                 st.cache_data.clear()
+                invalidate_dashboard_data()
                 if "boot_data" in st.session_state: del st.session_state["boot_data"]
                 if "active_data" in st.session_state: del st.session_state["active_data"]
                 time.sleep(0.5)
@@ -89,6 +91,7 @@ def render(df_alerts):
             cleanup_old_alerts(keep_last=10)
             st.toast("База очищена!", icon="🗑️")
             st.cache_data.clear()
+            invalidate_dashboard_data()
             if "boot_data" in st.session_state: del st.session_state["boot_data"]
             if "active_data" in st.session_state: del st.session_state["active_data"]
             time.sleep(0.5)
@@ -194,5 +197,6 @@ def save_changes(changes, df):
 
     st.session_state.alerts_feedback = ("Статус оновлено!", "✅", "toast")
     st.cache_data.clear()
+    invalidate_dashboard_data()
     if "boot_data" in st.session_state: del st.session_state["boot_data"]
     if "active_data" in st.session_state: del st.session_state["active_data"]
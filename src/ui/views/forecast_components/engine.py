@@ -53,9 +53,8 @@ def get_stations_to_process(sub_name, src_type):
     
     if sub_name == "Усі підстанції":
         if src_type == "CSV":
-            from src.core.kaggle_loader import load_kaggle_data
-            k_df = load_kaggle_data()
-            return k_df["substation_name"].unique().tolist() if not k_df.empty else []
+            from src.core.kaggle_loader import kaggle_regions
+            return kaggle_regions()
         else:
             sub_df = db.run_query("SELECT substation_name FROM Substations ORDER BY substation_name")
             return sub_df["substation_name"].tolist() if not sub_df.empty else []
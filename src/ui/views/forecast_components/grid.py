@@ -7,12 +7,13 @@
 2. Dynamic Layout Orchestration: інтелектуальний розподіл графіків по колонках інтерфейсу.
 3. Multi-context Rendering: підтримка як поодиноких прогнозів, так і мульти-модельних порівнянь (V1-V3).
 4. Smart Legend Management: оптимізація відображення легенд графіків для економії екранного простору.
+5. Batched Inference: усі об'єкти сітки прогнозуються одним пакетом на версію моделі (24 ONNX-виклики замість 24 × N).
 Забезпечує диспетчеру швидкий огляд всієї енергосистеми через "дзеркало" прогнозів.
 """
 # ATLAS_PASSPORT: docs/system/map/grid.md
 import streamlit as st
 from src.utils.ui_helpers import safe_plotly_render
-from src.ml.forecast_controller import cached_ai_forecast as _cached_ai_forecast
+from src.ml.forecast_controller import cached_ai_forecast_batch as _cached_ai_forecast_batch
 from src.ml.forecast_controller import get_cached_history as _get_history
 from src.ui.components.charts import _generate_forecast_figure, _generate_multi_forecast_figure
 
@@ -24,16 +25,23 @@ def render_substation_grid(stations, src_type, version, scenario, is_multi_model
     st.divider()
     st.markdown("#### 🏢 Деталізація по об'єктах")
     g_cols = st.columns(2)
+
+    # Один пакетний прогноз на версію для всіх об'єктів сітки
+    versions = ["v1", "v2", "v3"] if is_multi_model else [version]
+    batches = {
+        v: _cached_ai_forecast_batch(
+            hours_ahead=24, substation_names=tuple(stations),
+            source_type=src_type, version=v, scenario=scenario
+        )
+        for v in versions
+    }
     
     for i, station in enumerate(stations):
         with g_cols[i % 2]:
             if is_multi_model:
                 multi_s = {}
-                for v in ["v1", "v2", "v3"]:
-                    res_s = _cached_ai_forecast(
-                        hours_ahead=24, substation_name=station, 
-                        source_type=src_type, version=v, scenario=scenario
-                    )
+                for v in versions:
+                    res_s = batches[v].get(station)
                     if res_s: multi_s[v] = res_s[0]
                 
                 df_h_s = _get_history(station, src_type)
@@ -41,10 +49,7 @@ def render_substation_grid(stations, src_type, version, scenario, is_multi_model
                 fig_s.update_layout(height=400, showlegend=(i == 0))
                 safe_plotly_render(fig_s, key=f"grid_fc_multi_re_{station}")
             else:
-                res_s = _cached_ai_forecast(
-                    hours_ahead=24, substation_name=station, 
-                    source_type=src_type, version=version, scenario=scenario
-                )
+                res_s = batches[version].get(station)
                 if res_s:
                     df_f, _ = res_s
                     df_h = _get_history(station, src_type)
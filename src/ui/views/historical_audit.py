@@ -21,10 +21,7 @@ from src.core.database.archive import (
     get_archive_bounds as _get_archive_bounds,
 )
 from src.core.database.archive import (
-    load_archive_data as _load_archive_data,
-)
-from src.core.database.archive import (
-    load_rhythm_data as _load_rhythm_data,
+    load_archive_bundle as _load_archive_bundle,
 )
 from src.ui.components.charts import render_dual_axis_chart
 
@@ -89,7 +86,7 @@ def render(
 
     # Завантаження та агрегація даних
     with st.spinner("Виконання агрегаційного запиту..."):
-        df = _load_archive_data(start_date, end_date, active_target)
+        df, df_rhythm = _load_archive_bundle(start_date, end_date, active_target)
 
     if df.empty:
         st.warning(
@@ -167,7 +164,6 @@ def render(
     st.caption(
         "Наочна демонстрація `day_multiplier`: у будній день заводи працюють, у вихідні — навантаження падає."
     )
-    df_rhythm = _load_rhythm_data(start_date, end_date, active_target)
     if not df_rhythm.empty:
         from src.ui.components.charts import render_rhythm_chart
         safe_plotly_render(render_rhythm_chart(df_rhythm))
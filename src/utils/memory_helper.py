@@ -78,6 +78,8 @@ def auto_gc(threshold_mb: float = AUTO_GC_THRESHOLD_MB) -> bool:
             f"Очищення кешу та збір сміття..."
         )
         st.cache_data.clear()
+        from src.core.database import RESULT_CACHE
+        RESULT_CACHE.clear_memory()
         gc.collect()
         logger.info(f"✅ AUTO-GC: Після очищення: {get_memory_usage():.0f} MB")
         return True
@@ -164,3 +164,48 @@ class TestFilterEdgeCases:
         
         # Should return all data
         assert len(result) == len(sample_dataframe)
+
+
+class TestIndexedTimeSlicing:
+    """Тести індексованої нарізки за часом (searchsorted + коди Category)."""
+
+    @staticmethod
+    def _reference(df, region, dates, substation):
+        """Еталон: попередня реалізація через dt.date та порівняння рядків."""
+        out = df.copy()
+        if region != DataKeys.ALL_REGIONS:
+            out = out[out['region_name'] == region]
+        if substation != "Усі підстанції":
+            out = out[out['substation_name'].isin(substation if isinstance(substation, list) else [substation])]
+        mask = (out['timestamp'].dt.date >= dates[0]) & (out['timestamp'].dt.date <= dates[1])
+        return out.loc[mask]
+
+    @pytest.mark.parametrize("descending", [False, True])
+    def test_sorted_categorical_tz_frame_matches_reference(self, descending):
+        """Тест: відсортований (у т.ч. за спаданням) tz-aware кадр з Category дає той самий результат."""
+        n = 500
+        df = pd.DataFrame({
+            'timestamp': pd.date_range("2024-03-28", periods=n, freq="37min", tz="Europe/Kyiv"),
+            'region_name': pd.Categorical(['Київ', 'Львів'] * (n // 2)),
+            'substation_name': pd.Categorical(['Київ ТЕС', 'Львів ТЕС', 'Бурштин ТЕС', 'Київ ТЕС'] * (n // 4)),
+            'load': range(n),
+        })
+        if descending:
+            df = df.iloc[::-1].reset_index(drop=True)
+
+        dates = (date(2024, 3, 30), date(2024, 3, 31))
+        for region, substation in [(DataKeys.ALL_REGIONS, "Усі підстанції"), ("Київ", "Київ ТЕС"), ("Львів", ["Бурштин ТЕС", "Відсутня"])]:
+            result = filter_dataframe(df, region=region, dates=dates, dataset_name="load", substation=substation)
+            pd.testing.assert_frame_equal(result, self._reference(df, region, dates, substation))
+
+    def test_read_only_shared_frame_yields_writable_copy(self, sample_dataframe):
+        """Тест: кадр зі спільного знімка (read-only) фільтрується без помилок, результат — власна копія."""
+        from src.core.database.shared_store import freeze_frame
+
+        shared = freeze_frame(sample_dataframe)
+        dates = (date(2024, 1, 1), date(2024, 1, 1))
+        for _ in range(2):  # Другий прохід — із закешованим напрямом сортування
+            result = filter_dataframe(shared.copy(deep=False), region="Київ", dates=dates, dataset_name="load")
+            assert len(result) == 24
+        result.loc[0, 'load'] = 999
+        assert shared.loc[0, 'load'] != 999
@@ -10,6 +10,8 @@
 Забезпечує надійність "фундаменту" даних для всієї аналітичної платформи.
 """
 import pytest
+import pandas as pd
+import numpy as np
 from sqlalchemy import text
 
 def test_db_connection(db_engine):
@@ -44,3 +46,999 @@ def test_load_measurements_stats(db_session):
     if res[0] > 0:
         sample = db_session.execute(text("SELECT actual_load_mw FROM LoadMeasurements LIMIT 1")).fetchone()
         assert sample[0] is not None
+
+
+# ───────────────────────────────────────────────────────────────
+# CONNECTION POOL (без реальної БД)
+# ───────────────────────────────────────────────────────────────
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        if self.conn.broken:
+            raise RuntimeError("server closed the connection")
+
+
+class _FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def get_transaction_status(self):
+        return 0  # TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool:
+    """Unit-тести для src.core.database.pool.ConnectionPool."""
+
+    def _pool(self, **kwargs):
+        from src.core.database.pool import ConnectionPool
+        created = []
+
+        def connect(**_):
+            conn = _FakeConn()
+            created.append(conn)
+            return conn
+
+        return ConnectionPool({}, connect_fn=connect, **kwargs), created
+
+    def test_connection_is_reused(self):
+        """Тест: повернуте з'єднання видається повторно без нового connect."""
+        pool, created = self._pool(max_size=2)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        assert pool.getconn() is conn
+        assert len(created) == 1
+
+    def test_pool_is_bounded(self):
+        """Тест: при вичерпанні пулу getconn кидає PoolTimeoutError."""
+        from src.core.database.pool import PoolTimeoutError
+        pool, _ = self._pool(max_size=1)
+        pool.getconn()
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn(timeout=0.05)
+        assert pool.stats()["timeouts"] == 1
+
+    def test_broken_connection_replaced_on_checkout(self):
+        """Тест: health check відкидає зламане з'єднання і створює нове."""
+        pool, created = self._pool(max_size=1)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.broken = True
+
+        fresh = pool.getconn()
+        assert fresh is not conn
+        assert conn.closed
+        assert pool.stats()["failed_health_checks"] == 1
+
+    def test_stats_track_usage(self):
+        """Тест: статистика відображає in_use / idle."""
+        pool, _ = self._pool(max_size=3)
+        a, b = pool.getconn(), pool.getconn()
+        pool.putconn(a)
+        stats = pool.stats()
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 1
+        assert stats["checkouts"] == 2
+        pool.putconn(b, discard=True)
+        assert pool.stats()["discarded"] == 1
+
+    def test_backoff_delay_is_capped(self):
+        """Тест: джитерована затримка не перевищує cap."""
+        from src.core.database.pool import backoff_delay
+        for attempt in range(10):
+            assert 0 <= backoff_delay(attempt, base=0.5, cap=2.0) <= 2.0
+
+
+class TestCopyReader:
+    """Unit-тести розбору CSV-виводу COPY (без реальної БД)."""
+
+    def test_csv_to_frame_types(self):
+        """Тест: типи колонок та NULL/порожні рядки розбираються як у pd.read_sql."""
+        import io
+        import pandas as pd
+        from src.core.database.copy_reader import csv_to_frame
+
+        raw = (
+            b"timestamp,region_name,actual_load_mw,description,is_active\n"
+            b"2024-01-01 00:00:00+02,\"\xd0\x9a\xd0\xb8\xd1\x97\xd0\xb2\",101.5,\"\",t\n"
+            b"2024-01-01 01:00:00+02,\"a, b\",,,f\n"
+        )
+        df = csv_to_frame(io.BytesIO(raw), session_tz="Europe/Kyiv")
+
+        assert isinstance(df["timestamp"].dtype, pd.DatetimeTZDtype)
+        assert df["timestamp"].dt.hour.tolist() == [0, 1]
+        assert df["region_name"].tolist() == ["Київ", "a, b"]
+        assert pd.isna(df.loc[1, "actual_load_mw"])
+        assert df.loc[0, "description"] == ""
+        assert pd.isna(df.loc[1, "description"])
+        assert df["is_active"].tolist() == [True, False]
+
+    def test_catalog_types_match_chunked_plan(self):
+        """Тест: з cursor.description типи беруться з каталогу, а не вгадуються Arrow."""
+        import io
+        from src.core.database.copy_reader import csv_to_frame
+        from src.core.database.dtype_plan import DtypePlan
+
+        description = [
+            ("code", 1043), ("note", 25), ("flag", 25), ("region_name", 1043),
+            ("load_mw", 701), ("units", 23), ("is_active", 16),
+        ]
+        raw = (
+            b"code,note,flag,region_name,load_mw,units,is_active\n"
+            b"007,,t,A,1.5,,t\n"
+            b"010,,f,B,2.5,3,\n"
+        )
+        plan = DtypePlan.from_description(description)
+        df = csv_to_frame(io.BytesIO(raw), description=description, plan=plan)
+
+        assert df["code"].tolist() == ["007", "010"]
+        assert df["note"].dtype == object and df["note"].isna().all()
+        assert df["flag"].tolist() == ["t", "f"]
+        assert df["region_name"].dtype == "category"
+        assert df["load_mw"].dtype == "float32"
+        assert df["units"].dtype == "float32"  # int4 з NULL — як у chunked-шляху
+        assert df["is_active"].dtype == object
+
+    def test_read_sql_copy_streams_through_pipe(self):
+        """Тест: COPY пише порціями у pipe, план береться з реєстру, помилка COPY не губиться."""
+        import pytest
+        from src.core.database.copy_reader import read_sql_copy
+        from src.core.database.dtype_plan import PlanRegistry
+
+        class FakeCursor:
+            description = [("substation_name", 1043), ("hour", 23)]
+
+            def __init__(self, rows, fail=False):
+                self.rows, self.fail, self.executed = rows, fail, []
+                self.connection = type("C", (), {"encoding": "UTF8"})()
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def mogrify(self, sql, params):
+                return sql.encode()
+
+            def execute(self, sql):
+                self.executed.append(sql)
+
+            def copy_expert(self, sql, sink):
+                self.executed.append(sql)
+                sink.write(b"substation_name,hour\n")
+                for i in range(self.rows):
+                    sink.write(f"S{i % 3},{i}\n".encode())
+                if self.fail:
+                    raise RuntimeError("COPY aborted")
+
+        class FakeConn:
+            def __init__(self, cursor):
+                self._cursor = cursor
+                self.info = type("I", (), {"parameter_status": staticmethod(lambda name: "UTC")})()
+
+            def cursor(self):
+                return self._cursor
+
+        plans = PlanRegistry()
+        cursor = FakeCursor(rows=50_000)
+        df = read_sql_copy("SELECT substation_name, hour FROM LoadHourly", None, FakeConn(cursor), plans)
+
+        assert len(df) == 50_000 and len(plans) == 1
+        assert df["substation_name"].dtype == "category"
+        assert df["hour"].dtype == "int32"
+        assert "LIMIT 0" in cursor.executed[0] and cursor.executed[1].startswith("COPY (")
+
+        with pytest.raises(RuntimeError, match="COPY aborted"):
+            read_sql_copy("SELECT substation_name, hour FROM LoadHourly", None, FakeConn(FakeCursor(10, fail=True)))
+
+
+class TestResultCache:
+    """Unit-тести дворівневого кешу результатів run_query."""
+
+    def test_referenced_tables(self):
+        """Тест: таблиці витягуються з FROM/JOIN у нижньому регістрі."""
+        from src.core.database.result_cache import referenced_tables
+        sql = "SELECT * FROM LoadMeasurements lm JOIN Substations s ON lm.substation_id = s.substation_id"
+        assert referenced_tables(sql) == ("loadmeasurements", "substations")
+
+    def test_memory_and_disk_hit(self, tmp_path):
+        """Тест: результат повертається з RAM, а після очищення RAM — з Parquet."""
+        from src.core.database.result_cache import ResultCache
+        cache = ResultCache(cache_dir=str(tmp_path), max_memory_mb=10, max_disk_mb=10)
+        df = pd.DataFrame({"a": [1.0, 2.0], "b": ["x", "y"]})
+
+        cache.put("k", "v1", df)
+        assert cache.get("k", "v1").equals(df)
+        cache.clear_memory()
+        assert cache.get("k", "v1").equals(df)
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_version_change_invalidates(self, tmp_path):
+        """Тест: нова версія даних означає промах, але stale-запис доступний офлайн."""
+        from src.core.database.result_cache import ResultCache
+        cache = ResultCache(cache_dir=str(tmp_path))
+        df = pd.DataFrame({"a": [1, 2, 3]})
+        cache.put("k", "v1", df)
+
+        assert cache.get("k", "v2") is None
+        assert cache.get_stale("k").equals(df)
+
+    def test_cached_frame_is_isolated(self, tmp_path):
+        """Тест: модифікація повернутого DataFrame не псує кеш."""
+        from src.core.database.result_cache import ResultCache
+        cache = ResultCache(cache_dir=str(tmp_path))
+        df = pd.DataFrame({"a": [1.0, 2.0]})
+        cache.put("k", "v1", df)
+        df.loc[0, "a"] = 999.0
+
+        hit = cache.get("k", "v1")
+        hit.loc[1, "a"] = 999.0
+        assert cache.get("k", "v1")["a"].tolist() == [1.0, 2.0]
+
+    def test_disk_eviction_by_size(self, tmp_path):
+        """Тест: дисковий рівень витісняє найстаріші файли при перевищенні ліміту."""
+        import numpy as np
+        from src.core.database.result_cache import ResultCache
+        cache = ResultCache(cache_dir=str(tmp_path), max_memory_mb=0, max_disk_mb=0.05)
+        for i in range(5):
+            cache.put(f"k{i}", "v", pd.DataFrame({"a": np.random.rand(5000)}))
+        files = list(tmp_path.glob("query_*.parquet"))
+        assert 0 < len(files) < 5
+        assert (tmp_path / "query_k4.parquet").exists()
+
+    def test_version_tracker_counts_local_writes(self):
+        """Тест: локальний execute_update змінює версію без нової проби БД."""
+        from src.core.database.result_cache import DataVersionTracker
+        calls = []
+
+        def probe(tables):
+            calls.append(tables)
+            return {t: 10 for t in tables}
+
+        tracker = DataVersionTracker(probe, ttl_s=60)
+        v1 = tracker.version(("alerts",))
+        assert tracker.version(("alerts",)) == v1
+        assert len(calls) == 1
+
+        tracker.bump(("alerts",))
+        assert tracker.version(("alerts",)) != v1
+
+    def test_version_changes_with_database_identity(self):
+        """Тест: той самий лічильник після рестарту сервера чи іншої БД дає іншу версію."""
+        from src.core.database.result_cache import DB_IDENTITY_KEY, DataVersionTracker
+        state = {"identity": "atlas:10.0.0.1:5432:2024-01-01 00:00", "mode": "local"}
+
+        def probe(tables):
+            return {**{t: 10 for t in tables}, DB_IDENTITY_KEY: state["identity"]}
+
+        tracker = DataVersionTracker(probe, ttl_s=0, scope_fn=lambda: state["mode"])
+        before = tracker.version(("alerts",))
+
+        state["identity"] = "atlas:10.0.0.1:5432:2024-02-01 00:00"  # Рестарт: лічильники з нуля до 10
+        after_restart = tracker.version(("alerts",))
+        assert after_restart != before
+
+        state["mode"] = "cloud"
+        assert tracker.version(("alerts",)) not in (before, after_restart)
+
+    def test_probe_sums_leaf_partition_writes(self, monkeypatch):
+        """Тест: записи симулятора в листові партиції змінюють версію батьківської таблиці."""
+        import src.core.database as db
+
+        leaves = {"loadmeasurements_2024_01": 0, "loadmeasurements_default": 0}
+
+        class _Result:
+            def __init__(self, rows):
+                self.rows = rows
+
+            def fetchall(self):
+                return self.rows
+
+            def one(self):
+                return self.rows[0]
+
+        class _Conn:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, stmt, params=None):
+                if "pg_partition_tree" in str(stmt):
+                    # Батьківська таблиця має нульові лічильники — рядки лише на партиціях
+                    return _Result([("loadmeasurements", 0)] + [("loadmeasurements", n) for n in leaves.values()])
+                return _Result([("atlas", "127.0.0.1", 5432, "2024-01-01", None)])
+
+        class _Engine:
+            def connect(self):
+                return _Conn()
+
+        monkeypatch.setattr(db, "get_engine", lambda: _Engine())
+        tracker = db.DataVersionTracker(db._probe_table_versions, ttl_s=0)
+
+        before = tracker.version(("loadmeasurements",))
+        leaves["loadmeasurements_2024_01"] += 12  # Симулятор пише через get_db_cursor, без bump
+        after = tracker.version(("loadmeasurements",))
+
+        assert db._probe_table_versions(("loadmeasurements",))["loadmeasurements"] == 12
+        assert after != before
+
+
+class TestConcurrentExecutor:
+    """Unit-тести паралельного виконавця запитів."""
+
+    def test_tasks_run_in_parallel(self):
+        """Тест: загальний час ≈ найповільніша задача, а не сума."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from src.core.database.executor import iter_concurrent
+
+        tasks = {f"q{i}": (lambda i=i: time.sleep(0.2) or i) for i in range(4)}
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = {name: (res, err) for name, res, _, err in iter_concurrent(tasks, pool)}
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.6
+        assert results == {f"q{i}": (i, None) for i in range(4)}
+
+    def test_errors_are_reported_per_task(self):
+        """Тест: помилка однієї задачі не зупиняє інші."""
+        from src.core.database.executor import iter_concurrent
+
+        def boom():
+            raise ValueError("bad query")
+
+        out = {name: err for name, _, _, err in iter_concurrent({"ok": lambda: 1, "bad": boom})}
+        assert out["ok"] is None
+        assert isinstance(out["bad"], ValueError)
+
+    def test_submit_with_context_returns_future(self):
+        """Тест: фонова задача виконується у переданому пулі та повертає Future."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from src.core.database.executor import submit_with_context
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="bg") as pool:
+            future = submit_with_context(lambda: threading.current_thread().name, pool)
+            assert future.result(timeout=5).startswith("bg")
+
+
+class TestDtypePlan:
+    """Unit-тести планів типів для memory_diet та построкового читання."""
+
+    def test_plan_from_description_maps_pg_types(self):
+        """Тест: OID PostgreSQL перетворюються на очікувані цільові типи."""
+        from src.core.database.dtype_plan import DtypePlan
+
+        description = [
+            ("substation_id", 23), ("cnt", 20), ("load", 1700),
+            ("timestamp", 1184), ("region_name", 25), ("note", 25),
+        ]
+        plan = DtypePlan.from_description(description, session_tz="UTC")
+
+        assert plan.casts == {"substation_id": "int32", "cnt": "int64", "load": "float32"}
+        assert plan.tz_columns == ("timestamp",)
+        assert plan.categorical == ("region_name",)
+        assert plan.downcast_ints == ("cnt",)
+
+    def test_chunks_share_dtypes_and_concat_without_upcast(self):
+        """Тест: NULL у пізнішому chunk не перетворює колонку на object після concat."""
+        from src.core.database.dtype_plan import DtypePlan
+
+        plan = DtypePlan.from_description(
+            [("id", 23), ("load", 701), ("region_name", 25)], session_tz="UTC"
+        )
+        first = plan.apply(pd.DataFrame({"id": [1, 2], "load": [1.5, 2.5], "region_name": ["A", "B"]}))
+        second = plan.apply(pd.DataFrame({"id": [3, None], "load": [3.5, None], "region_name": ["C", "A"]}))
+        df = plan.concat([first, second])
+
+        assert df["id"].dtype == np.float32
+        assert df["load"].dtype == np.float32
+        assert isinstance(df["region_name"].dtype, pd.CategoricalDtype)
+        assert set(df["region_name"].cat.categories) == {"A", "B", "C"}
+        # План уточнено: наступні виконання одразу читають id як float32
+        assert plan.casts["id"] == "float32"
+
+    def test_timestamptz_chunks_normalised_to_session_zone(self):
+        """Тест: різні UTC-зсуви (літній/зимовий час) дають один tz-aware dtype."""
+        import datetime as dt
+
+        from src.core.database.dtype_plan import DtypePlan
+
+        plan = DtypePlan.from_description([("timestamp", 1184)], session_tz="Europe/Kyiv")
+        summer = dt.datetime(2024, 7, 1, 12, tzinfo=dt.timezone(dt.timedelta(hours=3)))
+        winter = dt.datetime(2024, 12, 1, 12, tzinfo=dt.timezone(dt.timedelta(hours=2)))
+        df = plan.concat([pd.DataFrame({"timestamp": [summer]}), pd.DataFrame({"timestamp": [winter]})])
+
+        assert isinstance(df["timestamp"].dtype, pd.DatetimeTZDtype)
+        assert df["timestamp"].dt.hour.tolist() == [12, 12]
+
+    def test_memory_diet_keeps_legacy_targets(self):
+        """Тест: memory_diet дає ті самі типи, що й попередня реалізація."""
+        from src.core.database import memory_diet
+
+        df = memory_diet(pd.DataFrame({
+            "small": np.array([1, 2, 3], dtype=np.int64),
+            "big": np.array([1, 2, 100_000], dtype=np.int64),
+            "value": np.array([0.5, 1.5, 2.5]),
+            "status": ["ok", "ok", "warn"],
+            "label": ["x", "y", "z"],
+            "ts": pd.date_range("2024-01-01", periods=3, freq="h"),
+        }))
+
+        assert df["small"].dtype == np.int16
+        assert df["big"].dtype == np.int32
+        assert df["value"].dtype == np.float32
+        assert isinstance(df["status"].dtype, pd.CategoricalDtype)
+        assert df["label"].dtype == object
+        assert df["ts"].dtype == "datetime64[s]"
+
+
+class _ScriptedCursor:
+    """Курсор, що записує SQL і повертає заздалегідь задані fetchone()."""
+
+    def __init__(self, fetches):
+        self.executed = []
+        self._fetches = list(fetches)
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+        if sql.lstrip().startswith("INSERT INTO LoadHourly"):
+            self.rowcount = 12
+
+    def fetchone(self):
+        return self._fetches.pop(0)
+
+
+class TestHourlyRollup:
+    """Unit-тести інкрементального оновлення LoadHourly."""
+
+    def test_incremental_refresh_starts_from_watermark(self):
+        """Тест: оновлення читає сирі дані лише від водяного знака та зсуває його."""
+        import datetime as dt
+
+        from src.core.database.rollup import refresh_hourly_rollup
+
+        wm = dt.datetime(2024, 5, 1, 10, tzinfo=dt.timezone.utc)
+        new_wm = wm + dt.timedelta(hours=2)
+        cursor = _ScriptedCursor([(True,), (wm,), (new_wm,)])
+
+        assert refresh_hourly_rollup(cursor) == 12
+        sql = [s for s, _ in cursor.executed]
+        assert not any(s.startswith("TRUNCATE") for s in sql)
+        insert_params = next(p for s, p in cursor.executed if s.startswith("INSERT INTO LoadHourly"))
+        assert insert_params == {"since": wm}
+        assert cursor.executed[-1][1] == ("load_hourly", new_wm)
+
+    def test_full_refresh_truncates_and_busy_lock_skips(self):
+        """Тест: full=True перебудовує з нуля; зайнятий advisory lock — пропуск."""
+        from src.core.database.rollup import _MIN_TS, refresh_hourly_rollup
+
+        cursor = _ScriptedCursor([(True,), (None,)])
+        refresh_hourly_rollup(cursor, full=True)
+        assert any(s.startswith("TRUNCATE TABLE LoadHourly") for s, _ in cursor.executed)
+        insert_params = next(p for s, p in cursor.executed if s.startswith("INSERT INTO LoadHourly"))
+        assert insert_params == {"since": _MIN_TS}
+
+        busy = _ScriptedCursor([(False,)])
+        assert refresh_hourly_rollup(busy) == -1
+        assert len(busy.executed) == 1
+
+    def test_version_bump_waits_for_commit(self, monkeypatch):
+        """Тест: версія LoadHourly скидається лише після commit власної транзакції, а не всередині чужої."""
+        from contextlib import contextmanager
+
+        import src.core.database as database
+        from src.core.database.rollup import refresh_hourly_rollup
+
+        events = []
+        monkeypatch.setattr(database.DATA_VERSIONS, "bump", lambda tables: events.append(("bump", tuple(tables))))
+
+        refresh_hourly_rollup(_ScriptedCursor([(True,), (None,), (None,)]))
+        assert events == [], "З чужим курсором bump — справа викликача після commit"
+
+        @contextmanager
+        def fake_db_cursor():
+            yield None, _ScriptedCursor([(True,), (None,), (None,)])
+            events.append(("commit",))
+
+        monkeypatch.setattr(database, "get_db_cursor", fake_db_cursor)
+        refresh_hourly_rollup()
+        assert events == [("commit",), ("bump", ("loadhourly",))]
+
+
+class TestPartitionManager:
+    """Unit-тести менеджера місячних партицій."""
+
+    def test_month_arithmetic_and_names(self):
+        """Тест: зсув місяців через межу року та формат назв партицій."""
+        import datetime as dt
+
+        from src.core.database.partitions import add_months, partition_month, partition_name
+
+        assert add_months(dt.date(2024, 11, 1), 3) == dt.date(2025, 2, 1)
+        assert add_months(dt.date(2024, 1, 1), -1) == dt.date(2023, 12, 1)
+        assert partition_name("LoadMeasurements", dt.date(2024, 5, 1)) == "loadmeasurements_p202405"
+        assert partition_month("loadmeasurements_p202405") == dt.date(2024, 5, 1)
+        assert partition_month("loadmeasurements_default") is None
+
+    def test_expired_partitions_respects_retention(self):
+        """Тест: прострочені лише місяці, що повністю вийшли за вікно зберігання."""
+        import datetime as dt
+
+        from src.core.database.partitions import expired_partitions
+
+        names = [
+            "loadmeasurements_default", "loadmeasurements_p202401",
+            "loadmeasurements_p202402", "loadmeasurements_p202403",
+        ]
+        today = dt.date(2024, 5, 15)
+        assert expired_partitions(names, today, 0) == []
+        # Вікно 2 місяці: межа 2024-03-01 — січень і лютий прострочені
+        assert expired_partitions(names, today, 2) == ["loadmeasurements_p202401", "loadmeasurements_p202402"]
+
+    def test_create_partition_rescues_default_rows(self):
+        """Тест: рядки з DEFAULT-партиції переносяться, а нова партиція приєднується через ATTACH."""
+        import datetime as dt
+
+        from src.core.database.partitions import create_partition
+
+        class Cursor:
+            def __init__(self):
+                self.sql = []
+
+            def execute(self, sql, params=None):
+                self.sql.append(" ".join(sql.split()))
+
+            def fetchall(self):
+                return [("loadmeasurements_default",)]
+
+            def fetchone(self):
+                return (True,)
+
+        cursor = Cursor()
+        assert create_partition(cursor, "LoadMeasurements", dt.date(2024, 5, 1)) is True
+        assert any(s.startswith("CREATE TABLE loadmeasurements_p202405 (LIKE") for s in cursor.sql)
+        assert any("DELETE FROM loadmeasurements_default" in s for s in cursor.sql)
+        assert cursor.sql[-1].startswith("ALTER TABLE loadmeasurements ATTACH PARTITION loadmeasurements_p202405")
+
+
+class TestQueryProfiler:
+    def test_fingerprint_collapses_literals_params_and_in_lists(self):
+        """Тест: запити, що відрізняються лише літералами та параметрами, мають один відбиток."""
+        from src.core.database.profiler import fingerprint, normalize_sql
+
+        a = "SELECT * FROM LoadMeasurements WHERE substation_id = :sub AND region IN (1, 2, 3) -- hot"
+        b = "select * from LoadMeasurements\n WHERE substation_id = 42 AND region IN ('a','b')"
+        assert fingerprint(a) == fingerprint(b.replace("select * from", "SELECT * FROM"))
+        assert normalize_sql(a) == "SELECT * FROM LoadMeasurements WHERE substation_id = ? AND region IN (?)"
+        # Приведення типу ::int не плутається з параметром
+        assert "::int" in normalize_sql("SELECT x::int FROM t WHERE y = :y")
+
+    def test_record_aggregates_latency_and_cache_counters(self):
+        """Тест: накопичуються виклики, перцентилі, рядки, байти та влучання кешу."""
+        from src.core.database.profiler import QueryProfiler
+
+        profiler = QueryProfiler(enabled=True)
+        for i in range(1, 11):
+            profiler.record("SELECT 1 FROM t WHERE id = :id", i / 1000, rows=5, nbytes=100, cache="miss")
+        profiler.record("SELECT 1 FROM t WHERE id = 7", 0.0, rows=5, cache="hit")
+        profiler.record("UPDATE t SET x = 1", 0.2, kind="update", error=True, retries=1)
+
+        snap = profiler.snapshot()
+        assert [s["kind"] for s in snap] == ["update", "select"]  # сортування за total_ms
+        select = snap[1]
+        assert select["calls"] == 11 and select["rows"] == 55 and select["bytes"] == 1000
+        assert select["cache_hits"] == 1 and select["cache_misses"] == 10
+        assert select["max_ms"] == pytest.approx(10.0)
+        assert 5.0 <= select["p50_ms"] <= 6.0
+        assert snap[0]["errors"] == 1 and snap[0]["retries"] == 1
+
+    def test_should_explain_respects_threshold_and_cooldown(self):
+        """Тест: план знімається лише для повільних запитів і не частіше за cooldown."""
+        from src.core.database.profiler import QueryProfiler
+
+        assert QueryProfiler(enabled=True).should_explain("x", 10.0) is False  # поріг вимкнено
+
+        profiler = QueryProfiler(enabled=True, explain_threshold_ms=100, explain_cooldown_s=3600)
+        fp = profiler.record("SELECT * FROM t", 0.5)
+        assert profiler.should_explain(fp, 0.05) is False
+        assert profiler.should_explain(fp, 0.5) is True
+        profiler.store_plan(fp, [{"Plan": {"Node Type": "Seq Scan"}}], 0.5)
+        assert profiler.should_explain(fp, 0.5) is False
+        assert profiler.snapshot()[0]["plan"][0]["Plan"]["Node Type"] == "Seq Scan"
+
+    def test_dump_json_writes_snapshot_with_extra_sections(self, tmp_path):
+        """Тест: JSON-дамп містить запити та додаткові секції і записується у файл."""
+        import json
+
+        from src.core.database.profiler import QueryProfiler
+
+        profiler = QueryProfiler(enabled=True)
+        profiler.record("SELECT 1", 0.01, rows=1)
+        path = tmp_path / "logs" / "profile.json"
+        text_dump = profiler.dump_json(str(path), extra={"pool": {"local": {"in_use": 0}}})
+
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        assert payload == json.loads(text_dump)
+        assert payload["queries"][0]["calls"] == 1
+        assert payload["pool"]["local"]["in_use"] == 0
+
+        profiler.reset()
+        assert profiler.snapshot() == []
+
+
+class TestParallelBoot:
+    def test_boot_steps_run_concurrently_and_progress_is_monotonic(self, monkeypatch):
+        """Тест: етапи бута виконуються паралельно, прогрес зростає, дані всіх етапів зібрано."""
+        import time
+
+        from src.core.database import loader
+
+        def fake_fetch(step_key):
+            time.sleep(0.2)
+            return {step_key: pd.DataFrame({"x": [1]})}
+
+        monkeypatch.setattr(loader, "fetch_granular_data", fake_fetch)
+
+        started = time.perf_counter()
+        events = list(loader.get_active_boot_data_generator())
+        wall = time.perf_counter() - started
+
+        progress = [p for _, p, _ in events]
+        assert progress[0] == 10 and progress[-1] == 100
+        assert progress == sorted(progress)
+        assert len(events) == len(loader.BOOT_STEPS) + 2
+        assert set(events[-1][2]) == set(loader.BOOT_STEPS)
+        # Послідовно було б ≥ 1.2 с
+        assert wall < 0.2 * len(loader.BOOT_STEPS) * 0.75
+
+
+class TestDeltaLoader:
+    @staticmethod
+    def _frame(hours, names):
+        ts = pd.Timestamp.now(tz="UTC").floor("h")
+        return pd.DataFrame({
+            "timestamp": [ts - pd.Timedelta(hours=h) for h in hours],
+            "substation_name": pd.Categorical(names),
+            "actual_load_mw": np.arange(len(hours), dtype=np.float32),
+        })
+
+    def test_refresh_appends_only_new_rows_and_trims_window(self):
+        """Тест: після повного завантаження запитується лише дельта від водяного знака, старий край обрізається."""
+        from src.core.database.delta_loader import DeltaDataset, DeltaStore
+
+        calls = []
+        full = self._frame([24 * 40, 3, 2], ["A", "B", "A"])  # перший рядок поза 30-денним вікном
+        delta = self._frame([1, 0], ["C", "A"])
+
+        def fetch(sql, params, bulk=False, cache=True):
+            calls.append((sql, params, cache))
+            return full if sql == "FULL" else delta
+
+        spec = DeltaDataset("load", "FULL", "DELTA", ascending=True, window=pd.Timedelta(days=30))
+        store = DeltaStore(fetch, datasets=(spec,), full_refresh_s=3600, max_delta_rows=100)
+
+        store.refresh()
+        frames = store.refresh()
+
+        assert [c[0] for c in calls] == ["FULL", "DELTA"]
+        assert calls[1][1]["since"] == full["timestamp"].max()
+        assert calls[1][2] is False  # Дельта читається повз кеш результатів
+        df = frames["load"]
+        assert len(df) == 4  # 3 - 1 обрізаний + 2 нові
+        assert df["timestamp"].is_monotonic_increasing
+        assert isinstance(df["substation_name"].dtype, pd.CategoricalDtype)
+        assert set(df["substation_name"].cat.categories) == {"A", "B", "C"}
+        assert store.watermarks()["load"] == delta["timestamp"].max()
+
+    def test_descending_dataset_prepends_and_caps_rows(self):
+        """Тест: для набору з LIMIT нові рядки додаються на початок, а кількість обмежується max_rows."""
+        from src.core.database.delta_loader import DeltaDataset, DeltaStore
+
+        full = self._frame([2, 3, 4], ["A", "A", "A"])
+        delta = self._frame([0, 1], ["A", "A"])
+        spec = DeltaDataset("gen", "FULL", "DELTA", ascending=False, max_rows=3)
+        store = DeltaStore(lambda sql, params, bulk=False, cache=True: full if sql == "FULL" else delta,
+                           datasets=(spec,), full_refresh_s=3600)
+
+        store.refresh()
+        df = store.refresh()["gen"]
+        assert len(df) == 3
+        assert df["timestamp"].is_monotonic_decreasing
+        assert df["timestamp"].iloc[0] == delta["timestamp"].max()
+
+    def test_oversized_delta_falls_back_to_full_reload(self):
+        """Тест: дельта, що досягла ліміту, замінюється повним перечитуванням."""
+        from src.core.database.delta_loader import DeltaDataset, DeltaStore
+
+        calls = []
+        full = self._frame([2, 1], ["A", "A"])
+        delta = self._frame([0, 0], ["A", "A"])
+
+        def fetch(sql, params, bulk=False, cache=True):
+            calls.append(sql)
+            return full if sql == "FULL" else delta
+
+        spec = DeltaDataset("lines", "FULL", "DELTA", ascending=False, max_rows=10)
+        store = DeltaStore(fetch, datasets=(spec,), full_refresh_s=3600, max_delta_rows=2)
+        store.refresh()
+        store.refresh()
+        assert calls == ["FULL", "DELTA", "FULL"]
+
+    def test_uncached_query_sees_new_rows_with_same_key(self, monkeypatch, tmp_path):
+        """Тест: run_query(cache=False) щоразу йде в БД, навіть якщо версія даних не змінилася."""
+        import contextlib
+        import src.core.database as db
+        from src.core.database.result_cache import ResultCache
+
+        rows = iter([pd.DataFrame({"n": [0]}), pd.DataFrame({"n": [1]}), pd.DataFrame({"n": [2]})])
+
+        class _Engine:
+            def connect(self):
+                return contextlib.nullcontext(object())
+
+        class _FrozenVersions:
+            def version(self, tables, time_bucket_s=None):
+                return "frozen"
+
+        monkeypatch.setattr(db, "get_engine", lambda: _Engine())
+        monkeypatch.setattr(db, "_read_planned", lambda conn, sql, params: next(rows))
+        monkeypatch.setattr(db, "DATA_VERSIONS", _FrozenVersions())
+        monkeypatch.setattr(db, "RESULT_CACHE", ResultCache(cache_dir=str(tmp_path)))
+
+        sql = "SELECT 1 AS n FROM LoadMeasurements WHERE timestamp > :since"
+        assert db.run_query(sql, {"since": 1}, cache=False)["n"].iloc[0] == 0
+        assert db.run_query(sql, {"since": 1}, cache=False)["n"].iloc[0] == 1
+        assert not list(tmp_path.glob("query_*.parquet"))
+
+
+class TestSharedDataStore:
+    def test_views_share_memory_and_reject_writes(self):
+        """Тест: сесії отримують view без копіювання даних, а запис у спільні масиви заборонено."""
+        from src.core.database.shared_store import SharedDataStore
+
+        frame = pd.DataFrame({"load": np.arange(100, dtype=np.float32), "name": pd.Categorical(["A", "B"] * 50)})
+        store = SharedDataStore("test", lambda: {"load": frame}, max_age_s=3600)
+
+        a, b = store.acquire(), store.acquire()
+        va, vb = a.snapshot.view()["load"], b.snapshot.view()["load"]
+        assert va is not vb
+        assert np.shares_memory(va["load"].to_numpy(), vb["load"].to_numpy())
+
+        va["extra"] = 1  # нова колонка — лише у view цієї сесії
+        assert "extra" not in vb.columns
+        with pytest.raises(ValueError):
+            va.loc[0, "load"] = -1.0
+        assert store.stats()["leases"] == {1: 2}
+
+    def test_retired_snapshot_dropped_after_last_lease(self):
+        """Тест: старий знімок живе, доки його орендують, і зникає після звільнення останньої оренди."""
+        from src.core.database.shared_store import SharedDataStore
+
+        counter = iter(range(100))
+        store = SharedDataStore("test", lambda: {"n": pd.DataFrame({"v": [next(counter)]})}, max_age_s=3600)
+
+        old = store.acquire()
+        store.invalidate()
+        new = store.acquire()
+        assert (old.version, new.version) == (1, 2)
+        assert store.stats()["live_snapshots"] == 2
+
+        old.release()
+        assert store.stats()["live_snapshots"] == 1
+        del new  # звільнення через збирання сміття оренди
+        import gc
+        gc.collect()
+        assert store.stats()["leases"] == {}
+        assert store.stats()["live_snapshots"] == 1  # поточний знімок лишається
+
+    def test_single_refresher_under_concurrency(self):
+        """Тест: паралельні сесії при першому завантаженні викликають loader лише один раз."""
+        import threading
+        import time
+
+        from src.core.database.shared_store import SharedDataStore
+
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"load": pd.DataFrame({"v": [1.0]})}
+
+        store = SharedDataStore("test", loader, max_age_s=3600)
+        leases = []
+        threads = [threading.Thread(target=lambda: leases.append(store.acquire())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert {lease.version for lease in leases} == {1}
+
+
+class TestWarmStartSnapshot:
+    @staticmethod
+    def _frames():
+        ts = pd.date_range("2024-05-01", periods=4, freq="h", tz="UTC")
+        return {
+            "load": pd.DataFrame({
+                "timestamp": ts,
+                "substation_name": pd.Categorical(["A", "B", "A", "B"]),
+                "actual_load_mw": np.array([1, 2, 3, 4], dtype=np.float32),
+            }),
+            "alerts": pd.DataFrame({"timestamp": ts[:2], "status": ["NEW", "ACK"]}),
+            "telemetry": pd.DataFrame({"x": [1]}),  # не входить у знімок
+        }
+
+    def test_round_trip_preserves_dtypes_and_watermarks(self, tmp_path):
+        """Тест: знімок відновлює кадри з dtypes, а маніфест містить max(timestamp) кожного набору."""
+        from src.core.database.warm_start import load_snapshot, save_snapshot
+
+        frames = self._frames()
+        manifest = save_snapshot(frames, "local", root=str(tmp_path))
+        assert set(manifest["datasets"]) == {"load", "alerts"}
+
+        loaded, watermarks, _ = load_snapshot("local", root=str(tmp_path))
+        pd.testing.assert_frame_equal(loaded["load"], frames["load"])
+        assert isinstance(loaded["load"]["substation_name"].dtype, pd.CategoricalDtype)
+        assert watermarks["load"] == frames["load"]["timestamp"].max()
+        assert watermarks["alerts"] == frames["alerts"]["timestamp"].max()
+        assert load_snapshot("cloud", root=str(tmp_path)) is None
+
+    def test_new_version_replaces_old_files(self, tmp_path):
+        """Тест: нова версія знімка прибирає файли попередньої, застарілий знімок ігнорується."""
+        import os
+
+        from src.core.database.warm_start import load_snapshot, save_snapshot
+
+        save_snapshot(self._frames(), "local", root=str(tmp_path))
+        manifest = save_snapshot(self._frames(), "local", root=str(tmp_path))
+        assert manifest["version"] == 2
+        files = sorted(f for f in os.listdir(tmp_path / "local") if f.endswith(".parquet"))
+        assert files == ["alerts.v2.parquet", "load.v2.parquet"]
+        assert load_snapshot("local", root=str(tmp_path), max_age_s=-1) is None
+
+    def test_seeded_delta_store_skips_full_reload(self):
+        """Тест: засіяний зі знімка DeltaStore одразу запитує лише дельту від водяного знака."""
+        from src.core.database.delta_loader import DeltaDataset, DeltaStore
+
+        frames = self._frames()
+        calls = []
+
+        def fetch(sql, params, bulk=False, cache=True):
+            calls.append((sql, params))
+            return frames["load"].iloc[:0]
+
+        spec = DeltaDataset("load", "FULL", "DELTA", ascending=True)
+        store = DeltaStore(fetch, datasets=(spec,), full_refresh_s=3600)
+        store.seed({"load": frames["load"]}, {"load": frames["load"]["timestamp"].max()})
+        assert len(store.refresh()["load"]) == 4
+        assert [c[0] for c in calls] == ["DELTA"]
+
+    def test_failed_submit_releases_save_lock(self, monkeypatch, tmp_path):
+        """Тест: якщо запис не вдалося запланувати, lock звільняється і наступна спроба не блокується."""
+        import src.core.database.executor as executor
+        import src.core.database.warm_start as warm_start
+
+        class _ClosedPool:
+            def submit(self, fn):
+                raise RuntimeError("cannot schedule new futures after shutdown")
+
+        monkeypatch.setattr(warm_start, "_LAST_SAVE", {})
+        monkeypatch.setattr(executor, "get_executor", lambda: _ClosedPool())
+        assert warm_start.maybe_save_snapshot(self._frames(), "local", root=str(tmp_path)) is False
+        assert not warm_start._SAVE_LOCK.locked()
+        assert "local" not in warm_start._LAST_SAVE
+
+        class _InlinePool:
+            def submit(self, fn):
+                fn()
+
+        monkeypatch.setattr(executor, "get_executor", lambda: _InlinePool())
+        assert warm_start.maybe_save_snapshot(self._frames(), "local", root=str(tmp_path)) is True
+        assert warm_start.load_snapshot("local", root=str(tmp_path)) is not None
+
+
+class _CopyConnection:
+    """psycopg2-з'єднання без БД: записує SQL і вміст COPY."""
+
+    def __init__(self, legacy=False):
+        self.executed, self.copied = [], []
+        self.committed = self.rolled_back = False
+        self.rowcount = 0
+        # information_schema: timestamp є, region_name — лише у новій схемі
+        self._columns = [(1,), None] if legacy else [None, None]
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append(" ".join(sql.split()))
+        if sql.lstrip().startswith("INSERT INTO RealLoadMeasurements"):
+            self.rowcount = 5
+
+    def fetchone(self):
+        return self._columns.pop(0)
+
+    def copy_expert(self, sql, buffer):
+        self.copied.append(buffer.read())
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class TestRealDataImport:
+    """Unit-тести bulk-імпорту Kaggle CSV (COPY → staging → upsert) без реальної БД."""
+
+    def _csv(self, tmp_path, prefix="DUQ", rows=7):
+        path = tmp_path / f"{prefix}_hourly.csv"
+        ts = pd.date_range("2018-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M:%S")
+        pd.DataFrame({"Datetime": ts, f"{prefix}_MW": np.arange(rows) + 0.5}).to_csv(path, index=False)
+        return str(path)
+
+    def test_chunks_stream_through_copy_and_merge_once(self, tmp_path):
+        """Тест: порції йдуть через COPY з назвою регіону та наскрізним seq, злиття — один upsert."""
+        from src.core.kaggle_loader import KAGGLE_MAPPING
+        from src.services.data.import_real_data import ingest_real_data
+
+        conn = _CopyConnection()
+        stats = ingest_real_data([self._csv(tmp_path)], conn=conn, chunk_rows=3, report=lambda _: None)
+
+        assert len(conn.copied) == 3 and stats["staged"] == 7 and stats["merged"] == 5
+        first = conn.copied[0].splitlines()[0].split(",")
+        assert first == [KAGGLE_MAPPING["DUQ"], "0", "2018-01-01 00:00:00", "0.5"]
+        assert conn.copied[-1].splitlines()[0].split(",")[1] == "6"
+        merges = [s for s in conn.executed if s.startswith("INSERT INTO RealLoadMeasurements")]
+        assert len(merges) == 1 and "ON CONFLICT (region_name, timestamp) DO UPDATE" in merges[0]
+        assert conn.executed[0].startswith("SELECT pg_advisory_xact_lock")
+        assert conn.committed and not conn.rolled_back
+
+    def test_legacy_schema_upgraded_and_bad_file_rolls_back(self, tmp_path):
+        """Тест: стара AEP-схема отримує region_name; файл без *_MW відкочує транзакцію."""
+        from src.services.data.import_real_data import ingest_real_data
+
+        conn = _CopyConnection(legacy=True)
+        ingest_real_data([self._csv(tmp_path, rows=2)], conn=conn, report=lambda _: None)
+        assert any(s.startswith("ALTER TABLE RealLoadMeasurements ADD COLUMN region_name") for s in conn.executed)
+
+        bad = tmp_path / "BAD_hourly.csv"
+        pd.DataFrame({"Datetime": ["2018-01-01 00:00:00"], "value": [1.0]}).to_csv(bad, index=False)
+        conn = _CopyConnection()
+        with pytest.raises(ValueError):
+            ingest_real_data([str(bad)], conn=conn, report=lambda _: None)
+        assert conn.rolled_back and not conn.committed
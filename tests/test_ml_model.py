@@ -153,3 +153,436 @@ class TestDataPreprocessing:
         hour_24_sin = np.sin(2 * np.pi * 24 / 24)
         
         assert np.isclose(hour_0_sin, hour_24_sin)
+
+
+class _FakeOnnxModel:
+    """Детермінована заміна onnxruntime-сесії: прогноз — зважене середнє вікна."""
+
+    class _Input:
+        name = "input_layer"
+        shape = ["batch", 48, 9]
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_inputs(self):
+        return [self._Input()]
+
+    def run(self, _, feeds):
+        self.calls += 1
+        x = feeds["input_layer"]
+        weights = np.linspace(0.5, 1.5, x.shape[2], dtype=np.float32)
+        return [(x.mean(axis=1) * weights).mean(axis=1, keepdims=True)]
+
+
+class _FakeDirectModel(_FakeOnnxModel):
+    """Модель з вектором горизонту: вихід (batch, 24) — навантаження на 24 години."""
+
+    class _Output:
+        name = "output_0"
+        shape = ["batch", 24]
+
+    def get_outputs(self):
+        return [self._Output()]
+
+    def run(self, _, feeds):
+        self.calls += 1
+        x = feeds["input_layer"]
+        return [x[:, -24:, 0] * 0.5 + 0.1]
+
+
+class TestBatchedForecast:
+    """Тести пакетної рекурентної розгортки (N підстанцій — один model.run на крок)."""
+
+    def test_batch_rollout_matches_per_station_and_runs_once_per_step(self):
+        """Тест: пакет дає ті самі прогнози, що й поодинокі виклики, за hours_ahead викликів моделі."""
+        from src.ml.predict_v2 import _run_onnx_inference, _run_onnx_inference_batch
+
+        rng = np.random.default_rng(0)
+        n, hours = 5, 24
+        windows = rng.random((n, 48, 9))
+        future_ts = [[pd.Timestamp("2024-01-01") + pd.Timedelta(hours=j + i + 1) for i in range(hours)] for j in range(n)]
+        temps = [0.4, None, 0.6, 0.5, None]
+        healths = [0.8, 0.9, None, 0.7, None]
+
+        batch_model = _FakeOnnxModel()
+        batch = _run_onnx_inference_batch(batch_model, windows, hours, future_ts, temps, healths)
+        assert batch.shape == (n, hours, 1)
+        assert batch_model.calls == hours
+
+        single_model = _FakeOnnxModel()
+        for j in range(n):
+            single = np.array(_run_onnx_inference(
+                single_model, windows[j].copy(), 48, 9, hours, future_ts[j], temps[j], healths[j]
+            ))
+            np.testing.assert_allclose(batch[j], single, rtol=1e-6)
+        assert single_model.calls == hours * n
+
+    def test_ring_buffer_io_binding_matches_plain_run(self):
+        """Тест: розгортка з IO binding реальної ONNX-сесії збігається з model.run і не змінює вхідні вікна."""
+        ort = pytest.importorskip("onnxruntime")
+        from src.ml.model_loader import MODEL_REGISTRY
+        from src.ml.predict_v2 import _run_onnx_inference_batch
+
+        session = ort.InferenceSession(MODEL_REGISTRY["v2"])
+
+        class _PlainRun:
+            """Та сама сесія без io_binding — шлях звичайного model.run."""
+            get_inputs = session.get_inputs
+            run = session.run
+
+        windows = np.random.default_rng(1).random((3, 48, 5))
+        original = windows.copy()
+        args = (72, [[pd.Timestamp("2024-01-01")] * 72] * 3, [0.5, None, 0.3], [0.9, None, None])
+        bound = _run_onnx_inference_batch(session, windows, *args)
+        plain = _run_onnx_inference_batch(_PlainRun(), windows, *args)
+
+        np.testing.assert_array_equal(bound, plain)
+        np.testing.assert_array_equal(windows, original)
+
+    def test_direct_horizon_model_runs_once_per_width(self):
+        """Тест: модель з виходом на 24 години дає 24 кроки за один запуск, далі — рекурсія від прогнозу."""
+        from src.ml.predict_v2 import _direct_horizon, _run_onnx_inference_batch
+
+        model = _FakeDirectModel()
+        assert _direct_horizon(model) == 24
+        assert _direct_horizon(_FakeOnnxModel()) == 1
+
+        windows = np.random.default_rng(2).random((2, 48, 1))
+        preds = _run_onnx_inference_batch(model, windows, 30, [[None] * 30] * 2, [None] * 2, [None] * 2)
+        assert model.calls == 2 and preds.shape == (2, 30, 1)
+
+        first = np.clip(windows[:, -24:, 0] * 0.5 + 0.1, 0, 1.1).astype(np.float32)
+        np.testing.assert_allclose(preds[:, :24, 0], first, rtol=1e-6)
+        # Другий запуск бачить перші 24 прогнозовані години у вікні
+        np.testing.assert_allclose(preds[:, 24:, 0], np.clip(first[:, :6] * 0.5 + 0.1, 0, 1.1), rtol=1e-6)
+
+
+class TestForecastCache:
+    """Тести кешу прогнозів за водяним знаком даних."""
+
+    def test_hits_misses_and_uncacheable_results(self):
+        """Тест: повторний ключ — влучання; помилки не кешуються й рахуються знову."""
+        from src.ml.forecast_cache import ForecastCache
+
+        cache = ForecastCache(max_entries=8)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return (pd.DataFrame({"predicted_load_mw": [1.0]}), None)
+
+        first = cache.get_or_compute(("k", "2024-01-01T10:00:00"), compute)
+        second = cache.get_or_compute(("k", "2024-01-01T10:00:00"), compute)
+        assert first is second and len(calls) == 1
+
+        # Нова година даних → новий ключ → нове обчислення
+        cache.get_or_compute(("k", "2024-01-01T11:00:00"), compute)
+        assert len(calls) == 2
+
+        failing = lambda: (pd.DataFrame(), "no data")
+        cache.get_or_compute("bad", failing, cacheable=lambda r: r[1] is None)
+        cache.get_or_compute("bad", failing, cacheable=lambda r: r[1] is None)
+
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 4
+        assert stats["entries"] == 2 and stats["hit_rate"] == 0.2
+
+    def test_lru_eviction(self):
+        """Тест: понад max_entries витісняється найдавніше використаний запис."""
+        from src.ml.forecast_cache import ForecastCache
+
+        cache = ForecastCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_concurrent_requests_compute_once(self):
+        """Тест: одночасні сесії з однаковим ключем запускають інференс один раз."""
+        import threading
+        import time
+        from src.ml.forecast_cache import ForecastCache
+
+        cache = ForecastCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "forecast"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == ["forecast"] * 4 and len(calls) == 1
+
+    def test_result_is_stored_before_gate_is_released(self):
+        """Тест: результат потрапляє в кеш, поки ключ ще позначений як такий, що обчислюється."""
+        from src.ml.forecast_cache import ForecastCache
+
+        seen = []
+
+        class _Probe(ForecastCache):
+            def put(self, key, value):
+                seen.append(key in self._inflight)
+                super().put(key, value)
+
+        cache = _Probe()
+        cache.get_or_compute("k", lambda: "forecast")
+        assert seen == [True] and not cache._inflight
+
+    def test_scenario_key_is_order_independent(self):
+        """Тест: однаковий сценарій з іншим порядком ключів дає той самий ключ кешу."""
+        from src.ml.forecast_cache import scenario_key
+
+        assert scenario_key({"air_temp": 20, "health_score": 90}) == scenario_key({"health_score": 90, "air_temp": 20})
+        assert scenario_key({"air_temp": 20}) != scenario_key({"air_temp": 21})
+
+    def test_artifact_fingerprint_tracks_file_contents(self, tmp_path, monkeypatch):
+        """Тест: відбиток моделі стабільний і змінюється після перезапису артефакту."""
+        import os
+        from src.ml import model_loader
+
+        model_path, scaler_path = tmp_path / "m.onnx", tmp_path / "s.pkl"
+        model_path.write_bytes(b"model-a")
+        scaler_path.write_bytes(b"scaler")
+        monkeypatch.setattr(model_loader, "resolve_artifact_paths", lambda v: (str(model_path), str(scaler_path)))
+
+        first = model_loader.artifact_fingerprint("v1")
+        assert first == model_loader.artifact_fingerprint("v1")
+
+        model_path.write_bytes(b"model-b")
+        os.utime(model_path, ns=(1, 1))
+        assert model_loader.artifact_fingerprint("v1") != first
+
+    def test_load_resources_cache_key_follows_retrain(self, tmp_path, monkeypatch):
+        """Тест: ключ кешу ONNX-сесії містить відбиток — після перезапису моделі сесія не береться зі старого запису."""
+        import os
+        from src.ml import model_loader
+
+        model_path, scaler_path = tmp_path / "m.onnx", tmp_path / "s.pkl"
+        model_path.write_bytes(b"model-a")
+        scaler_path.write_bytes(b"scaler")
+        monkeypatch.setattr(model_loader, "resolve_artifact_paths", lambda v: (str(model_path), str(scaler_path)))
+        keys = []
+        monkeypatch.setattr(model_loader, "_load_resources_cached", lambda version, fingerprint: keys.append((version, fingerprint)) or (None, None))
+
+        model_loader.load_resources("v1")
+        model_loader.load_resources("v1")
+        model_path.write_bytes(b"model-b")
+        os.utime(model_path, ns=(1, 1))
+        model_loader.load_resources("v1")
+
+        assert keys[0] == keys[1] and keys[2] != keys[0]
+        assert keys[2] == ("v1", model_loader.artifact_fingerprint("v1"))
+
+    def test_controller_returns_detached_frames(self, monkeypatch):
+        """Тест: правки UI у кадрі прогнозу не потрапляють у спільний кеш."""
+        import src.ml.forecast_controller as fc
+        from src.ml.forecast_cache import ForecastCache
+
+        monkeypatch.setattr(fc, "FORECAST_CACHE", ForecastCache())
+        monkeypatch.setattr(fc, "get_window_watermarks", lambda names, src: {n: pd.Timestamp("2024-01-01 10:00") for n in names})
+        monkeypatch.setattr(fc, "artifact_fingerprint", lambda v: "fp")
+        monkeypatch.setattr(fc, "get_ai_forecast", lambda **kw: (pd.DataFrame({"predicted_load_mw": [1.0, 2.0]}), None))
+
+        scenario = {"air_temp": 15, "health_score": 100}
+        first, _ = fc.cached_ai_forecast(24, "A", "CSV", "v1", scenario)
+        first["upper_bond"] = 0.0
+        second, _ = fc.cached_ai_forecast(24, "A", "CSV", "v1", scenario)
+        assert "upper_bond" not in second.columns
+        assert fc.FORECAST_CACHE.stats()["hits"] == 1
+
+
+class _FakeForecastCursor:
+    """Мінімальний курсор psycopg2 для прогону воркера без БД."""
+
+    def __init__(self, rollup_hour, forecasts_hour=None, locked=True):
+        self.marks = {"load_hourly": rollup_hour, "forecasts": forecasts_hour}
+        self.locked = locked
+        self.statements = []
+        self.forecasts = []  # Рядки, записані fake execute_values
+        self._last = None
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+        self._last = (sql, params)
+        if "INSERT INTO RollupWatermarks" in sql:
+            self.marks[params[0]] = params[1]
+
+    def fetchone(self):
+        sql, params = self._last
+        if "advisory" in sql:
+            return (self.locked,)
+        mark = self.marks.get(params[0])
+        return (mark,) if mark is not None else None
+
+    def fetchall(self):
+        sql, params = self._last
+        if "FROM Forecasts" in sql:
+            return sorted({(row[0], row[1]) for row in self.forecasts if row[8] == params[0]})
+        return [(1, "ПС Альфа"), (2, "ПС Бета")]
+
+
+def _fake_execute_values(written):
+    """execute_values, що зберігає вставлені рядки у _FakeForecastCursor.forecasts."""
+    def fake(cursor, sql, rows, **kw):
+        written.append((sql, list(rows)))
+        if "DELETE" in sql:
+            cursor.forecasts = [r for r in cursor.forecasts if (r[0], r[1]) not in set(rows)]
+        else:
+            cursor.forecasts.extend(rows)
+    return fake
+
+
+class TestForecastWorker:
+    """Тести фонового прорахунку прогнозів у таблицю Forecasts."""
+
+    HOUR = pd.Timestamp("2024-01-01 10:00", tz="UTC")
+
+    def _forecast(self, start=None, hours=3):
+        start = start or self.HOUR
+        load = np.linspace(100.0, 110.0, hours + 1)
+        return pd.DataFrame({
+            "timestamp": [start + pd.Timedelta(hours=i) for i in range(hours + 1)],
+            "predicted_load_mw": load,
+            "predicted_health_score": np.full(hours + 1, 97.5),
+            "upper_bond": load * 1.13,
+            "lower_bond": load * 0.87,
+            "is_actual_start": [True] + [False] * hours,
+        })
+
+    def test_precompute_writes_all_substations_and_versions(self, monkeypatch):
+        """Тест: нова година rollup → один пакетний прогін на версію, водяний знак — після запису всіх пар."""
+        from src.ml import forecast_worker as fw
+
+        calls, written = [], []
+
+        def fake_batch(names, **kw):
+            calls.append((kw["version"], list(names), kw["temp_shift"], kw["constants"]))
+            return {name: (self._forecast(), None) for name in names}
+
+        monkeypatch.setattr(fw, "get_ai_forecast_batch", fake_batch)
+        monkeypatch.setattr(fw, "execute_values", _fake_execute_values(written))
+
+        cursor = _FakeForecastCursor(self.HOUR)
+        assert fw.precompute_forecasts(cursor, versions=("v1", "v3"), hours_ahead=3) == 16
+        assert [c[0] for c in calls] == ["v1", "v3"]
+        assert calls[0][1] == ["ПС Альфа", "ПС Бета"] and calls[0][2:] == (0.0, {"health": 100})
+
+        (delete_sql, pairs), (insert_sql, rows) = written
+        assert "DELETE FROM Forecasts" in delete_sql and pairs == [(1, "v1"), (1, "v3"), (2, "v1"), (2, "v3")]
+        assert "INSERT INTO Forecasts" in insert_sql and "source_hour" in insert_sql
+        assert [r[3] for r in rows[:4]] == [0, 1, 2, 3]
+        assert rows[0][2] == self.HOUR.to_pydatetime() and rows[0][4] == 100.0 and rows[0][7] == 97.5
+        assert {r[8] for r in rows} == {self.HOUR}
+        assert cursor.marks["forecasts"] == self.HOUR
+
+        # Та сама година — повторного прогону немає
+        assert fw.precompute_forecasts(cursor, versions=("v1",), hours_ahead=3) == 0
+        assert len(calls) == 2
+
+    def test_failed_pairs_are_retried_on_next_poll(self, monkeypatch):
+        """Тест: невдалі пари повторюються наступною перевіркою, успішні не перераховуються."""
+        from src.ml import forecast_worker as fw
+
+        calls, written = [], []
+        outcome = {"ПС Бета": (pd.DataFrame(), "Telemetry unavailable.")}
+
+        def fake_batch(names, **kw):
+            calls.append((kw["version"], list(names)))
+            return {name: outcome.get(name, (self._forecast(), None)) for name in names}
+
+        monkeypatch.setattr(fw, "get_ai_forecast_batch", fake_batch)
+        monkeypatch.setattr(fw, "execute_values", _fake_execute_values(written))
+
+        cursor = _FakeForecastCursor(self.HOUR)
+        assert fw.precompute_forecasts(cursor, versions=("v1", "v3"), hours_ahead=3) == 8
+        assert cursor.marks["forecasts"] is None
+
+        # Наступна перевірка: лише Бета, обидві версії; після успіху година позначається виконаною
+        outcome.clear()
+        assert fw.precompute_forecasts(cursor, versions=("v1", "v3"), hours_ahead=3) == 8
+        assert calls[2:] == [("v1", ["ПС Бета"]), ("v3", ["ПС Бета"])]
+        assert written[-2][1] == [(2, "v1"), (2, "v3")]
+        assert cursor.marks["forecasts"] == self.HOUR
+        assert len(cursor.forecasts) == 16
+
+    def test_failed_pass_does_not_mark_hour_done(self, monkeypatch):
+        """Тест: якщо жоден прогін не записано, година не позначається і наступна перевірка повторює її."""
+        from src.ml import forecast_worker as fw
+
+        calls = []
+
+        def fake_batch(names, **kw):
+            calls.append(kw["version"])
+            return None if kw["version"] == "v1" else {"ПС Альфа": (pd.DataFrame(), "Baseline Fallback (AI offline)")}
+
+        monkeypatch.setattr(fw, "get_ai_forecast_batch", fake_batch)
+        monkeypatch.setattr(fw, "execute_values", lambda *a, **kw: pytest.fail("нічого писати"))
+
+        cursor = _FakeForecastCursor(self.HOUR)
+        assert fw.precompute_forecasts(cursor, versions=("v1", "v2"), hours_ahead=3) == 0
+        assert cursor.marks["forecasts"] is None
+
+        fw.precompute_forecasts(cursor, versions=("v1", "v2"), hours_ahead=3)
+        assert calls == ["v1", "v2", "v1", "v2"]
+
+    def test_precompute_skips_when_locked_by_another_worker(self, monkeypatch):
+        """Тест: зайнятий advisory-lock → -1 без інференсу."""
+        from src.ml import forecast_worker as fw
+
+        monkeypatch.setattr(fw, "get_ai_forecast_batch", lambda *a, **kw: pytest.fail("не має викликатися"))
+        assert fw.precompute_forecasts(_FakeForecastCursor(self.HOUR, locked=False)) == -1
+
+    def test_load_precomputed_rejects_stale_and_short_runs(self, monkeypatch):
+        """Тест: читаються лише прогони від поточної години даних з повним горизонтом."""
+        import src.core.database as db
+        from src.ml import forecast_worker as fw
+
+        def run(name, start, hours):
+            df = self._forecast(start, hours)
+            return pd.DataFrame({
+                "substation_name": name,
+                "horizon_h": range(len(df)),
+                "timestamp": df["timestamp"],
+                "predicted_load_mw": df["predicted_load_mw"].round(2),
+                "lower": df["lower_bond"].round(2),
+                "upper": df["upper_bond"].round(2),
+                "predicted_health_score": df["predicted_health_score"],
+            })
+
+        stored = pd.concat([
+            run("ПС Альфа", self.HOUR, 3),
+            run("ПС Бета", self.HOUR - pd.Timedelta(hours=1), 3),  # Застарілий прогін
+            run("ПС Гамма", self.HOUR, 2),  # Коротший горизонт
+        ], ignore_index=True)
+        monkeypatch.setattr(db, "run_query", lambda sql, params=None, **kw: stored)
+
+        marks = {name: self.HOUR.tz_convert("Europe/Kyiv") for name in ("ПС Альфа", "ПС Бета", "ПС Гамма")}
+        result = fw.load_precomputed_forecasts(list(marks), "v3", 3, marks)
+
+        assert list(result) == ["ПС Альфа"]
+        df = result["ПС Альфа"]
+        # Той самий набір колонок, що й у обчисленого прогнозу
+        assert list(df.columns) == list(self._forecast().columns)
+        assert list(df["is_actual_start"]) == [True, False, False, False]
+        assert df["predicted_health_score"].iloc[1] == pytest.approx(97.5)
+        assert df["predicted_load_mw"].iloc[-1] == pytest.approx(110.0)
+
+    def test_precomputed_scenario_matches_neutral_tab_scenario(self):
+        """Тест: прогони воркера відповідають нейтральному сценарію вкладки прогнозів."""
+        from src.ml.forecast_controller import _scenario_overrides
+        from src.ml.forecast_worker import is_precomputed_scenario
+
+        assert is_precomputed_scenario(*_scenario_overrides({"air_temp": 15, "h2_ppm": 5, "health_score": 100}))
+        assert not is_precomputed_scenario(*_scenario_overrides({"air_temp": 25, "health_score": 100}))
+        assert not is_precomputed_scenario(*_scenario_overrides({"air_temp": 15, "health_score": 80}))
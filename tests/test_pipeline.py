@@ -57,3 +57,139 @@ def test_vectorizer_v3_features_count():
     expected_count = 9
     # Ознаки: load, temp, h2, health, air, h_sin, h_cos, d_sin, d_cos
     assert expected_count == 9
+
+def test_live_window_sql_is_keyset_bounded():
+    """Перевірка Live-вікна: OFFSET рахує рядки лише всередині діапазону часу, діапазон покриває зсув."""
+    from src.ml.vectorizer import WINDOW_GAP_SLACK_HOURS, _build_live_sql
+
+    for is_all in (False, True):
+        sql, params = _build_live_sql("ПС Київська-Центральна", is_all, window_size=48, offset_hours=240)
+        assert "LIMIT :limit OFFSET :offset" in sql
+        assert "lh.ts_hour >= (SELECT lo FROM win)" in sql
+        assert params["span"] == 240 + 48 + WINDOW_GAP_SLACK_HOURS
+        assert params["offset"] == 240
+
+        sql, params = _build_live_sql("ПС Київська-Центральна", is_all, window_size=48, offset_hours=240, bounded=False)
+        assert "SELECT lo FROM win" not in sql and "span" not in params
+
+    sql, params = _build_live_sql(["A", "B"], False, 24, 0, end_ts=pd.Timestamp("2024-05-01 12:00", tz="UTC"))
+    assert "CAST(:end_ts AS timestamptz)" in sql
+    assert params["sub"] == ["A", "B"]
+    assert params["end_ts"].startswith("2024-05-01T12:00")
+
+def test_live_window_widens_over_data_gaps(monkeypatch):
+    """Перевірка Live-вікна: пропуск довший за запас — повтор без нижньої межі замість (None, ...)."""
+    import src.ml.vectorizer as vectorizer
+
+    hours = pd.date_range("2024-05-01", periods=24, freq="h")[::-1]
+    full = pd.DataFrame({
+        "actual_load_mw": 100.0, "temperature_c": 60.0, "h2_ppm": 10.0,
+        "health_score": 95.0, "air_temp": 15.0, "timestamp": hours,
+    })
+    calls = []
+
+    def fake_run_query(sql, params=None):
+        calls.append(params)
+        # У межах діапазону лише 5 годин — решта до пропуску в даних
+        return full.head(5) if "span" in params else full
+
+    monkeypatch.setattr(vectorizer, "run_query", fake_run_query)
+    values, _, last_ts, _ = vectorizer.get_latest_window("ПС Київська-Центральна", window_size=24)
+
+    assert values is not None and values.shape == (24, 9)
+    assert last_ts == hours[0]
+    assert len(calls) == 2 and "span" in calls[0] and "span" not in calls[1]
+
+def test_kaggle_parquet_cache_invalidation_and_range(tmp_path):
+    """Kaggle CSV кешується у Parquet, перебудовується при зміні файлу та читається лише в потрібному діапазоні."""
+    import os
+    from src.core.kaggle_loader import build_parquet_cache, read_kaggle_file
+
+    csv = tmp_path / "TEST_hourly.csv"
+    ts = pd.date_range("2018-01-01", periods=48, freq="h")
+    pd.DataFrame({"Datetime": ts.strftime("%Y-%m-%d %H:%M:%S"), "TEST_MW": np.arange(48.0)}).iloc[::-1].to_csv(csv, index=False)
+    cache_dir = str(tmp_path / "cache")
+
+    path = build_parquet_cache(str(csv), cache_dir)
+    mtime = os.stat(path).st_mtime_ns
+    assert build_parquet_cache(str(csv), cache_dir) == path
+    assert os.stat(path).st_mtime_ns == mtime, "Незмінений CSV не має перебудовувати кеш"
+
+    df = read_kaggle_file(str(csv), start="2018-01-02 00:00", end="2018-01-02 05:00", cache_dir=cache_dir)
+    assert list(df.columns) == ["timestamp", "actual_load_mw"]
+    assert len(df) == 6 and df["timestamp"].is_monotonic_increasing
+    assert df["actual_load_mw"].dtype == np.float32
+
+    # Дописаний рядок змінює size/mtime → кеш перебудовується
+    with open(csv, "a") as f:
+        f.write("2018-01-03 00:00:00,999.0\n")
+    build_parquet_cache(str(csv), cache_dir)
+    assert read_kaggle_file(str(csv), start="2018-01-03", cache_dir=cache_dir)["actual_load_mw"].tolist() == [999.0]
+
+def test_kaggle_loader_pushes_down_region_time_and_columns(tmp_path, monkeypatch):
+    """load_kaggle_data читає лише файли вибраних регіонів, діапазон часу та потрібні колонки."""
+    from src.core import kaggle_loader
+
+    ts = pd.date_range("2018-01-01", periods=72, freq="h")
+    for prefix, base in (("AEP", 1000.0), ("DUQ", 2000.0)):
+        pd.DataFrame({"Datetime": ts.strftime("%Y-%m-%d %H:%M:%S"), f"{prefix}_MW": base + np.arange(72.0)}) \
+            .to_csv(tmp_path / f"{prefix}_hourly.csv", index=False)
+    monkeypatch.setattr(kaggle_loader, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(kaggle_loader, "PARQUET_CACHE_DIR", str(tmp_path / "cache"))
+
+    aep = kaggle_loader.KAGGLE_MAPPING["AEP"]
+    assert kaggle_loader.kaggle_regions() == [aep, kaggle_loader.KAGGLE_MAPPING["DUQ"]]
+    assert kaggle_loader.kaggle_time_bounds([aep]) == (ts[0], ts[-1])
+
+    df = kaggle_loader.load_kaggle_data([aep], start=ts[-48], end=ts[-25])
+    assert len(df) == 24 and set(df["substation_name"]) == {aep}
+    assert df["timestamp"].min() == ts[-48] and df["actual_load_mw"].min() == 1000.0 + 24
+
+    slim = kaggle_loader.load_kaggle_data(start=ts[-1], columns=["timestamp", "actual_load_mw"])
+    assert list(slim.columns) == ["timestamp", "actual_load_mw"] and len(slim) == 2
+    assert kaggle_loader.load_kaggle_data(["unknown"]).empty
+
+def test_kaggle_parallel_ingest_matches_sequential(tmp_path):
+    """Паралельний розбір CSV у пулі процесів дає ті самі Parquet-кеші, що й послідовний."""
+    from src.core.kaggle_loader import cache_is_fresh, ingest_kaggle_files, read_kaggle_file
+
+    ts = pd.date_range("2018-01-01", periods=96, freq="h")
+    paths = []
+    for i, prefix in enumerate(("AEP", "DUQ", "NI")):
+        path = tmp_path / f"{prefix}_hourly.csv"
+        pd.DataFrame({"Datetime": ts.strftime("%Y-%m-%d %H:%M:%S"), f"{prefix}_MW": i * 100 + np.arange(96.0)}).to_csv(path, index=False)
+        paths.append(str(path))
+
+    seq = ingest_kaggle_files(paths, str(tmp_path / "seq"), parallel=False)
+    par = ingest_kaggle_files(paths, str(tmp_path / "par"), parallel=True, workers=2)
+    assert all(cache_is_fresh(p, str(tmp_path / "par")) for p in paths)
+    for p in paths:
+        pd.testing.assert_frame_equal(
+            read_kaggle_file(p, cache_dir=str(tmp_path / "seq")),
+            read_kaggle_file(p, cache_dir=str(tmp_path / "par")),
+        )
+    assert set(seq) == set(par) == set(paths)
+
+def test_kaggle_mmap_history_matches_parquet(tmp_path):
+    """Memory-mapped вікна повної історії збігаються з читанням Parquet, включно з межами та хвостом."""
+    from src.core import kaggle_history
+    from src.core.kaggle_loader import read_kaggle_file
+
+    csv = tmp_path / "TEST_hourly.csv"
+    ts = pd.date_range("2018-01-01", periods=240, freq="h")
+    pd.DataFrame({"Datetime": ts.strftime("%Y-%m-%d %H:%M:%S"), "TEST_MW": np.arange(240.0)}).to_csv(csv, index=False)
+    cache_dir = str(tmp_path / "cache")
+
+    hours, load = kaggle_history.open_region(str(csv), cache_dir)
+    assert isinstance(hours, np.memmap) and hours.dtype == np.int64 and load.dtype == np.float32
+
+    # Межі поза сіткою годин: start округлюється вгору, end — вниз
+    start, end = pd.Timestamp("2018-01-03 00:30"), pd.Timestamp("2018-01-04 06:59")
+    window = kaggle_history.slice_region(str(csv), start, end, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(window, read_kaggle_file(str(csv), start, end, cache_dir=cache_dir))
+    assert window["timestamp"].iloc[0] == pd.Timestamp("2018-01-03 01:00") and len(window) == 30
+
+    tail = kaggle_history.slice_region(str(csv), end=ts[99], tail_rows=10, cache_dir=cache_dir)
+    assert tail["actual_load_mw"].tolist() == list(np.arange(90.0, 100.0))
+    assert kaggle_history.region_time_bounds(str(csv), cache_dir) == (ts[0], ts[-1])
+    assert kaggle_history.slice_region(str(csv), start=ts[-1] + pd.Timedelta(hours=1), cache_dir=cache_dir).empty